@@ -0,0 +1,46 @@
+from typing import Optional
+
+from fastapi import Request, HTTPException
+
+from app.db.connection import DatabaseService
+from app.rag.reranking.voyage_reranker import VoyageReranker
+from app.rag.retrieval.hierarchical_retrieval import RetrievalConfig
+from app.rag.retrieval.query_processing import QueryProcessor
+from app.rag.retrieval.semantic_cache import SemanticRetrievalCache
+from app.rag.retrieval.vector_store import MmapVectorStore
+
+
+def get_db_service(request: Request) -> DatabaseService:
+    """Gets the database service instance from the application state."""
+    db_service = getattr(request.app.state, "db_service", None)
+    if not db_service or not db_service.is_available():
+        raise HTTPException(status_code=503, detail="Database service is not available.")
+    return db_service
+
+
+def get_query_processor(request: Request) -> QueryProcessor:
+    """Gets the shared query processor (embedding client) from the application state."""
+    query_processor = getattr(request.app.state, "query_processor", None)
+    if not query_processor:
+        raise HTTPException(status_code=503, detail="Query processor is not available.")
+    return query_processor
+
+
+def get_reranker(request: Request) -> Optional[VoyageReranker]:
+    """Gets the shared reranker from the application state (None if reranking is disabled)."""
+    return getattr(request.app.state, "reranker", None)
+
+
+def get_semantic_cache(request: Request) -> Optional[SemanticRetrievalCache]:
+    """Gets the shared semantic retrieval cache from the application state (None if disabled)."""
+    return getattr(request.app.state, "semantic_cache", None)
+
+
+def get_vector_store(request: Request) -> Optional[MmapVectorStore]:
+    """Gets the shared memory-mapped vector store from the application state (None if not used)."""
+    return getattr(request.app.state, "vector_store", None)
+
+
+def get_retrieval_config(request: Request) -> RetrievalConfig:
+    """Gets the hierarchical retrieval configuration from the application state."""
+    return getattr(request.app.state, "retrieval_config", None) or RetrievalConfig()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Chat Time-To-First-Token Measurement
+
+Measures how long users wait before seeing any answer text:
+1. POST /chat - the full JSON reply arrives at once (TTFT = total time)
+2. POST /chat/stream - SSE stream, TTFT is the first token event
+
+Requires the backend to be running (docker compose or uvicorn on port 8080).
+
+Usage:
+  python measure_ttft.py
+  python measure_ttft.py --question "What is attention?" --runs 5
+  python measure_ttft.py --url http://localhost:8080
+"""
+
+import json
+import time
+import argparse
+import asyncio
+import statistics
+from typing import Dict, List
+
+import httpx
+
+
+async def measure_blocking(client: httpx.AsyncClient, url: str, question: str) -> Dict[str, float]:
+    """Time the non-streaming /chat endpoint"""
+    start = time.perf_counter()
+    response = await client.post(f"{url}/chat", json={"message": question})
+    response.raise_for_status()
+    total = time.perf_counter() - start
+    return {"ttft": total, "total": total}
+
+
+async def measure_streaming(client: httpx.AsyncClient, url: str, question: str) -> Dict[str, float]:
+    """Time the SSE /chat/stream endpoint"""
+    start = time.perf_counter()
+    ttft = None
+    event_type = None
+
+    async with client.stream("POST", f"{url}/chat/stream", json={"message": question}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event_type = line[len("event:") :].strip()
+            elif line.startswith("data:") and event_type == "token" and ttft is None:
+                ttft = time.perf_counter() - start
+            elif line.startswith("data:") and event_type == "error":
+                raise RuntimeError(json.loads(line[len("data:") :])["detail"])
+
+    total = time.perf_counter() - start
+    return {"ttft": ttft if ttft is not None else total, "total": total}
+
+
+def print_row(label: str, runs: List[Dict[str, float]]) -> None:
+    ttft = statistics.median(run["ttft"] for run in runs)
+    total = statistics.median(run["total"] for run in runs)
+    print(f"   {label:<14} TTFT: {ttft:6.2f}s | total: {total:6.2f}s (median of {len(runs)})")
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Measure time-to-first-token of /chat vs /chat/stream",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--url", default="http://localhost:8080", help="Backend base URL")
+    parser.add_argument(
+        "--question", default="What is the transformer architecture?", help="Question to ask"
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Runs per endpoint")
+    args = parser.parse_args()
+
+    print("🚀 CHAT TIME-TO-FIRST-TOKEN")
+    print("=" * 60)
+    print(f"❓ {args.question}\n")
+
+    async with httpx.AsyncClient(timeout=120.0) as client:
+        blocking = [await measure_blocking(client, args.url, args.question) for _ in range(args.runs)]
+        streaming = [await measure_streaming(client, args.url, args.question) for _ in range(args.runs)]
+
+    print_row("/chat", blocking)
+    print_row("/chat/stream", streaming)
+
+    speedup = statistics.median(r["ttft"] for r in blocking) / statistics.median(
+        r["ttft"] for r in streaming
+    )
+    print(f"\n⚡ First token {speedup:.1f}x sooner with streaming")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
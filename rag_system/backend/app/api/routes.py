@@ -1,10 +1,30 @@
+import json
+import time
 import logging
+from contextlib import nullcontext
+from typing import AsyncIterator, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from app.agents.replier import replier_agent
-from app.rag.retrieval.hierarchical_retrieval import HierarchicalRetrieval
+from app.api.dependencies import (
+    get_db_service,
+    get_query_processor,
+    get_reranker,
+    get_retrieval_config,
+    get_semantic_cache,
+    get_vector_store,
+)
+from app.rag.reranking.voyage_reranker import VoyageReranker
+from app.rag.retrieval.hierarchical_retrieval import (
+    HierarchicalRetrieval,
+    RetrievalConfig,
+)
+from app.rag.retrieval.multi_query import MultiQueryRetrieval
 from app.rag.retrieval.query_processing import QueryProcessor
+from app.rag.retrieval.semantic_cache import SemanticRetrievalCache
+from app.rag.retrieval.vector_store import MmapVectorStore
 from app.db.connection import DatabaseService
 
 router = APIRouter()
@@ -27,55 +47,116 @@ class MessageEvent(BaseModel):
     context: dict = None
 
 
-async def process_message_event(event: MessageEvent):
-    logger.info(f"Processing event: {event.event_type} with message: {event.message}")
+async def build_prompt_with_context(
+    event: MessageEvent,
+    db_service: DatabaseService,
+    query_processor: QueryProcessor,
+    reranker: Optional[VoyageReranker],
+    retrieval_config: RetrievalConfig,
+    semantic_cache: Optional[SemanticRetrievalCache] = None,
+    vector_store: Optional[MmapVectorStore] = None,
+) -> Tuple[str, dict]:
+    """
+    Run hierarchical retrieval for the event message and build the replier prompt
 
-    # Hybrid retrieval - get relevant chunks for the user message
-    db_service = DatabaseService()
-    await db_service.initialize()
+    Returns:
+        Tuple of (combined prompt, retrieval info for the response metadata)
+    """
+    retrieval_info = {"chunks_found": 0, "total_documents_searched": 0}
 
+    # Hybrid retrieval - get relevant chunks for the user message
     try:
-        async with db_service.get_connection() as conn:
-            # Initialize retrieval components
-            query_processor = QueryProcessor(embedding_provider="openai")
-            retrieval_engine = HierarchicalRetrieval(
-                db_connection=conn,
-                stage1_similarity_threshold=0.3,
-                stage1_document_limit=10,
-                stage2_chunk_limit=5,
+        if retrieval_config.multi_query_variations > 1:
+            # Variations are embedded in one batch, then retrieved concurrently
+            expansion = await query_processor.expand_query_async(
+                event.message, retrieval_config.multi_query_variations
             )
-
-            # Process the user query
-            processed_query = query_processor.process_query(event.message)
+            processed_queries = await query_processor.process_queries_async(
+                expansion["query_variations"]
+            )
+            retrieval_result = await MultiQueryRetrieval(
+                db_service,
+                retrieval_config,
+                reranker=reranker,
+                semantic_cache=semantic_cache,
+                vector_store=vector_store,
+            ).search(processed_queries)
+        else:
+            # Process the user query before taking a connection from the pool
+            processed_query = await query_processor.process_query_async(event.message)
             logger.info(f"Query processed in {processed_query.processing_time:.3f}s")
 
-            # Run hierarchical retrieval
-            retrieval_result = await retrieval_engine.search(
-                processed_query.embedding, processed_query.cleaned_text
-            )
-            logger.info(
-                f"Retrieved {retrieval_result.total_chunks_found} chunks in {retrieval_result.total_time:.3f}s"
+            # The memory-mapped store serves both stages without a pooled connection
+            connection = (
+                nullcontext() if vector_store is not None else db_service.get_connection()
             )
+            async with connection as conn:
+                # Shared components come from the app lifespan; only the engine is per connection
+                retrieval_engine = HierarchicalRetrieval.from_config(
+                    conn,
+                    retrieval_config,
+                    reranker=reranker,
+                    db_service=db_service,
+                    semantic_cache=semantic_cache,
+                    vector_store=vector_store,
+                )
+
+                # Run hierarchical retrieval
+                retrieval_result = await retrieval_engine.search(
+                    processed_query.embedding, processed_query.cleaned_text
+                )
+        logger.info(
+            f"Retrieved {retrieval_result.total_chunks_found} chunks in {retrieval_result.total_time:.3f}s"
+        )
 
-            # Format retrieved chunks as string
-            chunks_text = ""
-            if retrieval_result.chunks:
-                for i, chunk in enumerate(retrieval_result.chunks, 1):
-                    chunks_text += f"\n--- Fragment {i} (Document: {chunk['document_title']}) ---\n"
-                    chunks_text += chunk["content"]
-                    chunks_text += "\n"
-            else:
-                chunks_text = "No relevant information was found in the analysis."
+        retrieval_info = {
+            "chunks_found": len(retrieval_result.chunks),
+            "total_documents_searched": retrieval_result.total_documents_searched,
+            "semantic_cache_hit": retrieval_result.semantic_cache_similarity is not None,
+        }
+        if retrieval_result.query_variations is not None:
+            retrieval_info["query_variations"] = retrieval_result.query_variations
 
-            # Create combined prompt
-            combined_prompt = f"User question: '{event.message}'\n\nRelevant information from the analysis:{chunks_text}"
+        # Format retrieved chunks as string
+        chunks_text = ""
+        if retrieval_result.chunks:
+            for i, chunk in enumerate(retrieval_result.chunks, 1):
+                chunks_text += f"\n--- Fragment {i} (Document: {chunk['document_title']}) ---\n"
+                chunks_text += chunk["content"]
+                chunks_text += "\n"
+        else:
+            chunks_text = "No relevant information was found in the analysis."
+
+        # Create combined prompt
+        combined_prompt = f"User question: '{event.message}'\n\nRelevant information from the analysis:{chunks_text}"
 
     except Exception as e:
         logger.error(f"Retrieval failed: {e}")
         combined_prompt = f"User question: '{event.message}'\n\nRelevant information from the analysis: Could not access analysis information due to a technical error."
 
-    finally:
-        await db_service.close()
+    return combined_prompt, retrieval_info
+
+
+async def process_message_event(
+    event: MessageEvent,
+    db_service: DatabaseService,
+    query_processor: QueryProcessor,
+    reranker: Optional[VoyageReranker],
+    retrieval_config: RetrievalConfig,
+    semantic_cache: Optional[SemanticRetrievalCache] = None,
+    vector_store: Optional[MmapVectorStore] = None,
+):
+    logger.info(f"Processing event: {event.event_type} with message: {event.message}")
+
+    combined_prompt, retrieval_info = await build_prompt_with_context(
+        event,
+        db_service,
+        query_processor,
+        reranker,
+        retrieval_config,
+        semantic_cache,
+        vector_store,
+    )
 
     # Pass the combined prompt to the replier agent
     replier_response = await replier_agent.run(user_prompt=combined_prompt)
@@ -86,55 +167,189 @@ async def process_message_event(event: MessageEvent):
         "event_metadata": {
             "event_type": "chat_response",
             "original_event": event.model_dump(),
-            "retrieval_info": {
-                "chunks_found": len(retrieval_result.chunks)
-                if "retrieval_result" in locals()
-                else 0,
-                "total_documents_searched": getattr(
-                    retrieval_result, "total_documents_searched", 0
-                )
-                if "retrieval_result" in locals()
-                else 0,
-            },
+            "retrieval_info": retrieval_info,
+        },
+    }
+
+
+def format_sse(event_type: str, data: dict) -> str:
+    """Format a Server-Sent Event"""
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_message_event(
+    event: MessageEvent,
+    db_service: DatabaseService,
+    query_processor: QueryProcessor,
+    reranker: Optional[VoyageReranker],
+    retrieval_config: RetrievalConfig,
+    semantic_cache: Optional[SemanticRetrievalCache] = None,
+    vector_store: Optional[MmapVectorStore] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream the reply to a message event as Server-Sent Events
+
+    Events:
+        retrieval: retrieval info, sent as soon as retrieval completes
+        token: {"delta": "..."} for each piece of generated text
+        done: timings, including time_to_first_token
+        error: sent instead of done if generation fails
+    """
+    logger.info(f"Streaming event: {event.event_type} with message: {event.message}")
+    start_time = time.perf_counter()
+
+    combined_prompt, retrieval_info = await build_prompt_with_context(
+        event,
+        db_service,
+        query_processor,
+        reranker,
+        retrieval_config,
+        semantic_cache,
+        vector_store,
+    )
+    retrieval_time = time.perf_counter() - start_time
+    yield format_sse(
+        "retrieval", {**retrieval_info, "retrieval_time": retrieval_time}
+    )
+
+    time_to_first_token = None
+    try:
+        async with replier_agent.run_stream(user_prompt=combined_prompt) as result:
+            # No debounce: forward each delta as soon as the model produces it
+            async for delta in result.stream_text(delta=True, debounce_by=None):
+                if time_to_first_token is None:
+                    time_to_first_token = time.perf_counter() - start_time
+                    logger.info(f"Time to first token: {time_to_first_token:.3f}s")
+                yield format_sse("token", {"delta": delta})
+    except Exception as e:
+        logger.error(f"Streaming reply failed: {e}")
+        yield format_sse("error", {"detail": "Reply generation failed"})
+        return
+
+    total_time = time.perf_counter() - start_time
+    logger.info(f"Streamed reply in {total_time:.3f}s")
+    yield format_sse(
+        "done",
+        {
+            "retrieval_time": retrieval_time,
+            "time_to_first_token": time_to_first_token,
+            "total_time": total_time,
         },
+    )
+
+
+def build_message_event(body: dict) -> MessageEvent:
+    """Build a MessageEvent from a /chat request body"""
+    # Handle both formats for flexibility
+    if "messages" in body:
+        messages = body["messages"]
+        last_user_message = ""
+        for msg in reversed(messages):
+            if msg.get("role") == "user":
+                content = msg.get("content", "")
+                # Handle assistant-ui format where content is array of objects
+                if isinstance(content, list) and len(content) > 0:
+                    for item in content:
+                        if item.get("type") == "text":
+                            last_user_message = item.get("text", "")
+                            break
+                elif isinstance(content, str):
+                    last_user_message = content
+                break
+    else:
+        last_user_message = body.get("message", "hi")
+        messages = []
+
+    if not last_user_message:
+        last_user_message = "hi"
+
+    return MessageEvent(
+        message=last_user_message, context={"full_conversation": messages}
+    )
+
+
+@router.get("/health")
+async def health(
+    db_service: DatabaseService = Depends(get_db_service),
+    query_processor: QueryProcessor = Depends(get_query_processor),
+    semantic_cache: Optional[SemanticRetrievalCache] = Depends(get_semantic_cache),
+    vector_store: Optional[MmapVectorStore] = Depends(get_vector_store),
+):
+    return {
+        "status": "ok",
+        "database": db_service.is_available(),
+        "pool": db_service.get_pool_stats(),
+        "embedding_cache": query_processor.embedder.get_cache_stats(),
+        "embedding_batcher": (
+            query_processor.embedding_batcher.get_stats()
+            if query_processor.embedding_batcher
+            else None
+        ),
+        "semantic_cache": semantic_cache.get_stats() if semantic_cache else None,
+        "vector_store": vector_store.get_stats() if vector_store else None,
     }
 
 
 @router.post("/chat")
-async def chat(request: Request):
+async def chat(
+    request: Request,
+    db_service: DatabaseService = Depends(get_db_service),
+    query_processor: QueryProcessor = Depends(get_query_processor),
+    reranker: Optional[VoyageReranker] = Depends(get_reranker),
+    retrieval_config: RetrievalConfig = Depends(get_retrieval_config),
+    semantic_cache: Optional[SemanticRetrievalCache] = Depends(get_semantic_cache),
+    vector_store: Optional[MmapVectorStore] = Depends(get_vector_store),
+):
     try:
         body = await request.json()
         logger.info(f"Received request body: {body}")
 
-        # Handle both formats for flexibility
-        if "messages" in body:
-            messages = body["messages"]
-            last_user_message = ""
-            for msg in reversed(messages):
-                if msg.get("role") == "user":
-                    content = msg.get("content", "")
-                    # Handle assistant-ui format where content is array of objects
-                    if isinstance(content, list) and len(content) > 0:
-                        for item in content:
-                            if item.get("type") == "text":
-                                last_user_message = item.get("text", "")
-                                break
-                    elif isinstance(content, str):
-                        last_user_message = content
-                    break
-        else:
-            last_user_message = body.get("message", "hi")
-            messages = []
-
-        if not last_user_message:
-            last_user_message = "hi"
+        event = build_message_event(body)
 
-        event = MessageEvent(
-            message=last_user_message, context={"full_conversation": messages}
+        response = await process_message_event(
+            event,
+            db_service,
+            query_processor,
+            reranker,
+            retrieval_config,
+            semantic_cache,
+            vector_store,
         )
-
-        response = await process_message_event(event)
         return response
     except Exception as e:
         logger.error(f"Error processing chat request: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: Request,
+    db_service: DatabaseService = Depends(get_db_service),
+    query_processor: QueryProcessor = Depends(get_query_processor),
+    reranker: Optional[VoyageReranker] = Depends(get_reranker),
+    retrieval_config: RetrievalConfig = Depends(get_retrieval_config),
+    semantic_cache: Optional[SemanticRetrievalCache] = Depends(get_semantic_cache),
+    vector_store: Optional[MmapVectorStore] = Depends(get_vector_store),
+):
+    try:
+        body = await request.json()
+        logger.info(f"Received streaming request body: {body}")
+        event = build_message_event(body)
+    except Exception as e:
+        logger.error(f"Error parsing chat stream request: {str(e)}")
+        raise HTTPException(status_code=400, detail="Invalid request body")
+
+    return StreamingResponse(
+        stream_message_event(
+            event,
+            db_service,
+            query_processor,
+            reranker,
+            retrieval_config,
+            semantic_cache,
+            vector_store,
+        ),
+        media_type="text/event-stream",
+        # Disable proxy buffering so tokens reach the client immediately
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,8 +1,10 @@
 # app/services/database_service.py
 import os
+import inspect
 import logging
+from psycopg import AsyncConnection, sql
 from psycopg_pool import AsyncConnectionPool
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Callable, Dict, List, Optional, Any
 from contextlib import asynccontextmanager
 
 logger = logging.getLogger(__name__)
@@ -20,6 +22,7 @@ class DatabaseService:
 
     def __init__(self):
         self._pool: Optional[AsyncConnectionPool] = None
+        self._conninfo: Optional[str] = None
         self._initialized = False
 
     async def initialize(self, max_size: int = 5):
@@ -45,6 +48,8 @@ class DatabaseService:
             # Build connection string
             CONNECTION_STRING = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DATABASE}?sslmode={POSTGRES_SSLMODE}"
 
+            self._conninfo = CONNECTION_STRING
+
             # Create the connection pool
             self._pool = AsyncConnectionPool(
                 CONNECTION_STRING, min_size=1, max_size=max_size, open=False
@@ -78,6 +83,31 @@ class DatabaseService:
             logger.error(f"Failed to get connection from pool: {e}")
             raise
 
+    async def listen(
+        self, channel: str, on_listen: Optional[Callable[[], Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield payloads of NOTIFY messages sent on a channel.
+
+        Uses a dedicated autocommit connection outside the pool, since a
+        listening connection stays open for as long as the iterator runs.
+        on_listen (a function or coroutine function) is called once LISTEN is
+        active: notifications sent before that (e.g. while a dropped listener
+        reconnects) are never delivered.
+        """
+        if not self._conninfo:
+            raise ConnectionError("Database pool is not initialized.")
+
+        async with await AsyncConnection.connect(self._conninfo, autocommit=True) as conn:
+            await conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+            logger.info(f"👂 Listening on channel {channel}")
+            if on_listen:
+                result = on_listen()
+                if inspect.isawaitable(result):
+                    await result
+            async for notify in conn.notifies():
+                yield notify.payload
+
     @staticmethod
     async def test_connection(conn) -> bool:
         """Test database connection"""
@@ -0,0 +1,13 @@
+-- Document metadata used to pre-filter retrieval (DocumentFilter)
+-- type: free-form document kind (e.g. 'report', 'transcript')
+-- date: publication / reporting date
+-- tags: JSON array of strings, matched with containment (tags @> '["finance"]')
+ALTER TABLE documents
+    ADD COLUMN type text,
+    ADD COLUMN date date,
+    ADD COLUMN tags jsonb NOT NULL DEFAULT '[]'::jsonb;
+
+CREATE INDEX idx_documents_type ON documents (type);
+CREATE INDEX idx_documents_date ON documents (date);
+-- jsonb_path_ops supports @> only, with a smaller index than the default opclass
+CREATE INDEX idx_documents_tags ON documents USING gin (tags jsonb_path_ops);
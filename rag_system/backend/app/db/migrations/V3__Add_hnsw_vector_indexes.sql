@@ -0,0 +1,19 @@
+-- Add HNSW indexes for approximate nearest neighbour search on embeddings
+-- Using vector_cosine_ops so the indexes serve the <=> (cosine distance) operator
+-- m and ef_construction are build-time parameters; ef_search is set per query
+-- (see VectorIndexRepository.set_search_options)
+
+-- HNSW index for document summary embeddings (stage 1 document filtering)
+CREATE INDEX idx_documents_summary_embedding_hnsw
+ON documents USING hnsw (summary_embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- HNSW index for chunk embeddings (stage 2 chunk retrieval)
+CREATE INDEX idx_document_chunks_embedding_hnsw
+ON document_chunks USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- B-tree index on the foreign key so per-document chunk lookups and
+-- selective document_id = ANY(...) filters can avoid a sequential scan
+CREATE INDEX idx_document_chunks_document_id
+ON document_chunks (document_id);
@@ -0,0 +1,14 @@
+-- Add chunk position and metadata columns to document_chunks
+-- chunk_index is the 0-based position of the chunk within its document
+ALTER TABLE document_chunks
+    ADD COLUMN chunk_index integer,
+    ADD COLUMN metadata jsonb;
+
+-- Backfill positions for existing chunks (ids were assigned in chunk order)
+UPDATE document_chunks dc
+SET chunk_index = ordered.position
+FROM (
+    SELECT id, row_number() OVER (PARTITION BY document_id ORDER BY id) - 1 AS position
+    FROM document_chunks
+) ordered
+WHERE dc.id = ordered.id;
@@ -0,0 +1,23 @@
+-- Composite index for neighbour window lookups
+-- (document_id = ? AND chunk_index BETWEEN ? AND ?) used by context expansion
+CREATE INDEX idx_document_chunks_document_id_chunk_index
+ON document_chunks (document_id, chunk_index);
+
+-- Number any chunks inserted without a position, after the document's
+-- already indexed chunks (in id order)
+UPDATE document_chunks dc
+SET chunk_index = ordered.position
+FROM (
+    SELECT
+        c.id,
+        COALESCE(m.max_index, -1)
+            + row_number() OVER (PARTITION BY c.document_id ORDER BY c.id) AS position
+    FROM document_chunks c
+    LEFT JOIN (
+        SELECT document_id, MAX(chunk_index) AS max_index
+        FROM document_chunks
+        GROUP BY document_id
+    ) m ON m.document_id = c.document_id
+    WHERE c.chunk_index IS NULL
+) ordered
+WHERE dc.id = ordered.id;
@@ -0,0 +1,52 @@
+-- Notify listeners (e.g. the rerank cache) when chunk contents change or chunks are deleted
+-- Payload: comma-separated chunk ids, at most 500 per notification so payloads
+-- stay below the 8000 byte NOTIFY limit. Statement-level triggers with transition
+-- tables send one batch per statement instead of one notification per row.
+CREATE OR REPLACE FUNCTION notify_document_chunks_changed()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    payload text;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        FOR payload IN
+            SELECT string_agg(id::text, ',')
+            FROM (
+                SELECT id, (row_number() OVER (ORDER BY id) - 1) / 500 AS batch
+                FROM old_rows
+            ) changed
+            GROUP BY batch
+        LOOP
+            PERFORM pg_notify('document_chunks_changed', payload);
+        END LOOP;
+    ELSE
+        -- Only content changes invalidate rerank scores (not chunk_index / metadata)
+        FOR payload IN
+            SELECT string_agg(id::text, ',')
+            FROM (
+                SELECT o.id, (row_number() OVER (ORDER BY o.id) - 1) / 500 AS batch
+                FROM old_rows o
+                JOIN new_rows n ON n.id = o.id
+                WHERE o.content IS DISTINCT FROM n.content
+            ) changed
+            GROUP BY batch
+        LOOP
+            PERFORM pg_notify('document_chunks_changed', payload);
+        END LOOP;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER document_chunks_changed_on_update
+AFTER UPDATE ON document_chunks
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_document_chunks_changed();
+
+CREATE TRIGGER document_chunks_changed_on_delete
+AFTER DELETE ON document_chunks
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_document_chunks_changed();
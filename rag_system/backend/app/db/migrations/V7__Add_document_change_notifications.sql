@@ -0,0 +1,23 @@
+-- Notify listeners (e.g. the semantic retrieval cache) whenever documents or
+-- chunks are inserted, updated or deleted. Payload: the changed table's name.
+-- Statement-level, and NOTIFY folds identical payloads within a transaction,
+-- so a bulk ingest sends at most one notification per table per transaction.
+CREATE OR REPLACE FUNCTION notify_documents_changed()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM pg_notify('documents_changed', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER documents_changed_on_documents
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON documents
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_documents_changed();
+
+CREATE TRIGGER documents_changed_on_chunks
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON document_chunks
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_documents_changed();
@@ -0,0 +1,10 @@
+-- Quantized HNSW indexes on chunk embeddings (pgvector >= 0.7) are opt-in
+-- Each index is a second graph every chunk insert has to maintain, so none is
+-- created here. VectorIndexRepository.apply_vector_search_mode (or
+-- app/rag/retrieval/examples/apply_vector_search_mode.py) builds the one for the
+-- configured RETRIEVAL_VECTOR_SEARCH_MODE as an expression index, keeping the
+-- full-precision vector(1536) column used to re-score the shortlist:
+--   halfvec: ((embedding::halfvec(1536)) halfvec_cosine_ops), 2 bytes per dimension
+--   binary:  ((binary_quantize(embedding)::bit(1536)) bit_hamming_ops), 1 bit per dimension
+-- Re-scoring reads the heap vectors, so in these modes the float32 chunk index
+-- from V3 can be dropped as well (--drop-full-indexes).
@@ -0,0 +1,11 @@
+-- Matryoshka shortlist HNSW indexes (vector_search_mode = 'matryoshka') are opt-in
+-- text-embedding-3 models are trained so the leading dimensions of an embedding
+-- are a usable lower-dimensional embedding. The matryoshka mode shortlists stage 1
+-- and stage 2 on the first 256 of the 1536 dimensions (1/6 of the graph's vector
+-- data) and re-scores with the full embeddings. Cosine distance does not depend on
+-- vector length, so the truncated vectors need no normalization.
+-- Nothing is created here: VectorIndexRepository.apply_vector_search_mode (or
+-- app/rag/retrieval/examples/apply_vector_search_mode.py --mode matryoshka) builds
+--   ((subvector(embedding, 1, 256)::vector(256)) vector_cosine_ops) on document_chunks
+--   ((subvector(summary_embedding, 1, 256)::vector(256)) vector_cosine_ops) on documents
+-- and, with --drop-full-indexes, drops both float32 indexes from V3.
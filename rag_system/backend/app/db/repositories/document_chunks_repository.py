@@ -1,6 +1,7 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from psycopg import AsyncConnection
-import json
+from psycopg.types.json import Jsonb
+from app.db.repositories.document_repository import DocumentFilter
 
 
 class DocumentChunksRepository:
@@ -35,45 +36,64 @@ class DocumentChunksRepository:
             await cur.execute(
                 query, 
                 (content, embedding, document_id, chunk_index, 
-                 json.dumps(metadata) if metadata else None)
+                 Jsonb(metadata) if metadata else None)
             )
             result = await cur.fetchone()
             await self.connection.commit()
         
         return result[0]
     
-    async def create_chunks_batch(self, chunks: List[Dict[str, Any]]) -> List[int]:
+    async def create_chunks_batch(
+        self, chunks: List[Dict[str, Any]], commit: bool = True
+    ) -> List[int]:
         """
         Create multiple chunks in a single transaction.
         
+        All rows are sent in one pipelined executemany (no round trip per chunk)
+        with embeddings passed as binary float arrays instead of text.
+        
         Args:
             chunks: List of dictionaries with keys: content, embedding, document_id
+                and optionally chunk_index and metadata
+            commit: Commit immediately (False leaves the transaction open for the caller)
         
         Returns:
-            List of created chunk ids
+            List of created chunk ids, in the same order as the input chunks
         """
+        if not chunks:
+            return []
+
         query = """
             INSERT INTO document_chunks 
-            (content, embedding, document_id)
-            VALUES (%s, %s, %s)
+            (content, embedding, document_id, chunk_index, metadata)
+            VALUES (%s, %b, %s, %s, %s)
             RETURNING id
         """
         
+        params = [
+            (
+                chunk['content'],
+                chunk['embedding'],
+                chunk['document_id'],
+                chunk.get('chunk_index'),
+                Jsonb(chunk['metadata']) if chunk.get('metadata') else None,
+            )
+            for chunk in chunks
+        ]
+        
         chunk_ids = []
         async with self.connection.cursor() as cur:
-            for chunk in chunks:
-                await cur.execute(
-                    query,
-                    (
-                        chunk['content'],
-                        chunk['embedding'],
-                        chunk['document_id']
-                    )
-                )
+            await cur.executemany(query, params, returning=True)
+            
+            # One result set per input row, in input order
+            while True:
                 result = await cur.fetchone()
                 chunk_ids.append(result[0])
+                if not cur.nextset():
+                    break
             
-            await self.connection.commit()
+            if commit:
+                await self.connection.commit()
         
         return chunk_ids
     
@@ -102,10 +122,10 @@ class DocumentChunksRepository:
     async def get_chunks_by_document_id(self, document_id: int) -> List[Dict[str, Any]]:
         """Get all chunks for a specific document"""
         query = """
-            SELECT id, content, embedding, document_id
+            SELECT id, content, embedding, document_id, chunk_index, metadata
             FROM document_chunks 
             WHERE document_id = %s
-            ORDER BY id ASC
+            ORDER BY chunk_index ASC NULLS LAST, id ASC
         """
         
         async with self.connection.cursor() as cur:
@@ -118,11 +138,57 @@ class DocumentChunksRepository:
                 'id': result[0],
                 'content': result[1],
                 'embedding': result[2],
-                'document_id': result[3]
+                'document_id': result[3],
+                'chunk_index': result[4],
+                'metadata': result[5] or {}
             })
         
         return chunks
     
+    async def get_chunk_windows(self, windows: List[Tuple[int, int, int]]) -> List[Dict[str, Any]]:
+        """
+        Get the chunks of several chunk_index ranges in a single query.
+        
+        Embeddings are not selected, so only chunk text is transferred.
+        
+        Args:
+            windows: List of (document_id, start_index, end_index) ranges, inclusive.
+                Overlapping ranges of the same document return duplicate rows, so
+                callers should merge them first.
+        
+        Returns:
+            List of chunks ordered by document_id, chunk_index
+        """
+        if not windows:
+            return []
+        
+        query = """
+            SELECT dc.id, dc.content, dc.document_id, dc.chunk_index, dc.metadata
+            FROM unnest(%s::bigint[], %s::integer[], %s::integer[])
+                AS w(document_id, start_index, end_index)
+            JOIN document_chunks dc
+              ON dc.document_id = w.document_id
+             AND dc.chunk_index BETWEEN w.start_index AND w.end_index
+            ORDER BY dc.document_id, dc.chunk_index
+        """
+        
+        document_ids, start_indexes, end_indexes = (list(column) for column in zip(*windows))
+        
+        async with self.connection.cursor() as cur:
+            await cur.execute(query, (document_ids, start_indexes, end_indexes))
+            results = await cur.fetchall()
+        
+        return [
+            {
+                'id': result[0],
+                'content': result[1],
+                'document_id': result[2],
+                'chunk_index': result[3],
+                'metadata': result[4] or {}
+            }
+            for result in results
+        ]
+    
     async def search_chunks_by_similarity(self, query_embedding: List[float], 
                                    document_id: Optional[int] = None, 
                                    limit: int = 10) -> List[Dict[str, Any]]:
@@ -168,37 +234,41 @@ class DocumentChunksRepository:
                 'content': result[1],
                 'document_id': result[2],
                 'chunk_index': result[3],
-                'metadata': json.loads(result[4]) if result[4] else {},
+                'metadata': result[4] or {},
                 'similarity_distance': result[5]
             })
         
         return chunks
     
     async def search_chunks_with_document_info(self, query_embedding: List[float], 
-                                       limit: int = 10) -> List[Dict[str, Any]]:
+                                       limit: int = 10,
+                                       filters: Optional[DocumentFilter] = None) -> List[Dict[str, Any]]:
         """
         Search chunks by similarity and include parent document information
         
         Args:
             query_embedding: The query vector to search against
             limit: Maximum number of results to return
+            filters: Metadata predicates the parent documents must match
             
         Returns:
             List of chunks with document info, ordered by similarity
         """
+        filter_sql, filter_params = (filters or DocumentFilter()).to_sql("d")
         query = """
             SELECT 
                 dc.id, dc.content, dc.document_id, dc.chunk_index, dc.metadata,
-                d.title, d.summary, d.authors, d.date, d.type,
+                d.title, d.summary, d.tags, d.date, d.type,
                 (dc.embedding <=> %s::vector) as distance
             FROM document_chunks dc
             JOIN documents d ON dc.document_id = d.id
+            WHERE """ + filter_sql + """
             ORDER BY dc.embedding <=> %s::vector
             LIMIT %s
         """
         
         async with self.connection.cursor() as cur:
-            await cur.execute(query, (query_embedding, query_embedding, limit))
+            await cur.execute(query, (query_embedding, *filter_params, query_embedding, limit))
             results = await cur.fetchall()
         
         chunks = []
@@ -208,10 +278,10 @@ class DocumentChunksRepository:
                 'content': result[1],
                 'document_id': result[2],
                 'chunk_index': result[3],
-                'metadata': json.loads(result[4]) if result[4] else {},
+                'metadata': result[4] or {},
                 'document_title': result[5],
                 'document_summary': result[6],
-                'document_authors': result[7],
+                'document_tags': result[7],
                 'document_date': result[8],
                 'document_type': result[9],
                 'similarity_distance': result[10]
@@ -219,6 +289,73 @@ class DocumentChunksRepository:
         
         return chunks
     
+    async def get_chunk_hashes_by_document_id(self, document_id: int) -> List[Dict[str, Any]]:
+        """
+        Get id, chunk_index and sha256 content hash of every chunk in a document.
+        
+        Hashes are computed in the database so chunk contents and embeddings
+        are not transferred. They match hashlib.sha256(content.encode()).hexdigest().
+        """
+        query = """
+            SELECT id, chunk_index, encode(sha256(convert_to(content, 'UTF8')), 'hex')
+            FROM document_chunks 
+            WHERE document_id = %s
+            ORDER BY chunk_index ASC NULLS LAST, id ASC
+        """
+        
+        async with self.connection.cursor() as cur:
+            await cur.execute(query, (document_id,))
+            results = await cur.fetchall()
+        
+        return [
+            {'id': result[0], 'chunk_index': result[1], 'content_hash': result[2]}
+            for result in results
+        ]
+    
+    async def update_chunk_indexes(self, chunk_indexes: Dict[int, int], commit: bool = True) -> int:
+        """
+        Set chunk_index for many chunks in one statement.
+        
+        Args:
+            chunk_indexes: Mapping of chunk id -> new chunk_index
+            commit: Commit immediately (False leaves the transaction open for the caller)
+        
+        Returns:
+            Number of chunks whose index changed
+        """
+        if not chunk_indexes:
+            return 0
+        
+        query = """
+            UPDATE document_chunks dc
+            SET chunk_index = u.chunk_index
+            FROM unnest(%s::bigint[], %s::integer[]) AS u(id, chunk_index)
+            WHERE dc.id = u.id AND dc.chunk_index IS DISTINCT FROM u.chunk_index
+        """
+        
+        async with self.connection.cursor() as cur:
+            await cur.execute(
+                query, (list(chunk_indexes.keys()), list(chunk_indexes.values()))
+            )
+            updated_count = cur.rowcount
+            if commit:
+                await self.connection.commit()
+            return updated_count
+    
+    async def delete_chunks_by_ids(self, chunk_ids: List[int], commit: bool = True) -> int:
+        """Delete chunks by id. Returns number of deleted chunks."""
+        if not chunk_ids:
+            return 0
+        
+        query = "DELETE FROM document_chunks WHERE id = ANY(%s)"
+        
+        async with self.connection.cursor() as cur:
+            await cur.execute(query, (chunk_ids,))
+            deleted_count = cur.rowcount
+            if commit:
+                await self.connection.commit()
+            return deleted_count
+    
     async def update_chunk_content(self, chunk_id: int, content: str, embedding: List[float]) -> bool:
         """Update chunk content and its embedding"""
         query = """
@@ -260,6 +397,66 @@ class DocumentChunksRepository:
             result = await cur.fetchone()
             return result[0] if result else 0
     
+    # Lower bounds of the chunks-per-document histogram buckets
+    CHUNK_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+    
+    async def get_chunk_statistics(self) -> Dict[str, Any]:
+        """
+        Get document / chunk totals and the chunks-per-document distribution
+        in a single aggregate query.
+        
+        Documents without chunks are included (they count towards the "0" bucket).
+        
+        Returns:
+            Dictionary with totals, min / median / max chunks per document and a
+            histogram mapping bucket labels (e.g. "20-49") to document counts
+        """
+        query = """
+            WITH per_document AS (
+                SELECT d.id, COUNT(dc.id) AS chunk_count
+                FROM documents d
+                LEFT JOIN document_chunks dc ON dc.document_id = d.id
+                GROUP BY d.id
+            ),
+            histogram AS (
+                SELECT width_bucket(chunk_count, %s::integer[]) AS bucket, COUNT(*) AS documents
+                FROM per_document
+                GROUP BY 1
+            )
+            SELECT
+                COUNT(*),
+                COALESCE(SUM(chunk_count), 0),
+                COALESCE(MIN(chunk_count), 0),
+                COALESCE(MAX(chunk_count), 0),
+                COALESCE(percentile_cont(0.5) WITHIN GROUP (ORDER BY chunk_count), 0),
+                (SELECT COALESCE(jsonb_object_agg(bucket, documents), '{}'::jsonb) FROM histogram)
+            FROM per_document
+        """
+        
+        async with self.connection.cursor() as cur:
+            await cur.execute(query, (list(self.CHUNK_COUNT_BUCKETS),))
+            result = await cur.fetchone()
+        
+        # width_bucket returns 0 below the first bound and i for bounds[i-1] <= x < bounds[i]
+        bounds = self.CHUNK_COUNT_BUCKETS
+        labels = ["0"]
+        for lower, upper in zip(bounds, bounds[1:]):
+            labels.append(str(lower) if upper - lower == 1 else f"{lower}-{upper - 1}")
+        labels.append(f"{bounds[-1]}+")
+        
+        bucket_counts = result[5] or {}
+        return {
+            'total_documents': result[0],
+            'total_chunks': result[1],
+            'min_chunks_per_document': result[2],
+            'max_chunks_per_document': result[3],
+            'median_chunks_per_document': float(result[4]),
+            'chunk_count_histogram': {
+                label: bucket_counts.get(str(bucket), 0)
+                for bucket, label in enumerate(labels)
+            }
+        }
+    
     async def get_chunks_paginated(self, offset: int = 0, limit: int = 100, 
                            document_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get chunks with pagination, optionally filtered by document"""
@@ -292,7 +489,7 @@ class DocumentChunksRepository:
                 'content': result[1],
                 'document_id': result[2],
                 'chunk_index': result[3],
-                'metadata': json.loads(result[4]) if result[4] else {}
+                'metadata': result[4] or {}
             })
         
         return chunks
\ No newline at end of file
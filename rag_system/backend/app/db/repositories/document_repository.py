@@ -1,8 +1,48 @@
-from typing import List, Dict, Any, Optional
+from datetime import date
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
 from psycopg import AsyncConnection
 import json
 
 
+@dataclass
+class DocumentFilter:
+    """
+    Metadata predicates on documents (V10 columns); every field that is set must match
+
+    Rendered into SQL with to_sql(), so filtered searches only read matching
+    documents (idx_documents_type / idx_documents_date / idx_documents_tags).
+    """
+
+    types: Optional[List[str]] = None  # type is one of these
+    date_from: Optional[date] = None  # inclusive
+    date_to: Optional[date] = None  # inclusive
+    tags: Optional[List[str]] = None  # document has all of these tags
+
+    def to_sql(self, alias: str) -> Tuple[str, List[Any]]:
+        """
+        SQL predicate on the documents table aliased as `alias`, and its parameters
+
+        Returns ("TRUE", []) when no field is set.
+        """
+        clauses = []
+        params: List[Any] = []
+        if self.types:
+            clauses.append(f"{alias}.type = ANY(%s)")
+            params.append(list(self.types))
+        if self.date_from is not None:
+            clauses.append(f"{alias}.date >= %s")
+            params.append(self.date_from)
+        if self.date_to is not None:
+            clauses.append(f"{alias}.date <= %s")
+            params.append(self.date_to)
+        if self.tags:
+            clauses.append(f"{alias}.tags @> %s::jsonb")
+            params.append(json.dumps(list(self.tags)))
+
+        return (" AND ".join(clauses) or "TRUE"), params
+
+
 class DocumentRepository:
     """Repository for document table operations using psycopg3"""
 
@@ -10,7 +50,14 @@ class DocumentRepository:
         self.connection = connection
 
     async def create_document(
-        self, title: str, summary: str, summary_embedding: List[float]
+        self,
+        title: str,
+        summary: str,
+        summary_embedding: List[float],
+        document_type: Optional[str] = None,
+        document_date: Optional[date] = None,
+        tags: Optional[List[str]] = None,
+        commit: bool = True,
     ) -> int:
         """
         Create a new document record with summary embedding.
@@ -19,27 +66,42 @@ class DocumentRepository:
             title: Document title
             summary: Document summary/description
             summary_embedding: Vector embedding of the summary (1024 dimensions)
+            document_type: Document type metadata (e.g. "report")
+            document_date: Document date metadata
+            tags: Tag metadata
+            commit: Commit immediately (False leaves the transaction open for the caller)
 
         Returns:
             id of the created document
         """
         query = """
-            INSERT INTO documents (title, summary, summary_embedding)
-            VALUES (%s, %s, %s)
+            INSERT INTO documents (title, summary, summary_embedding, type, date, tags)
+            VALUES (%s, %s, %s, %s, %s, %s::jsonb)
             RETURNING id
         """
 
         async with self.connection.cursor() as cur:
-            await cur.execute(query, (title, summary, summary_embedding))
+            await cur.execute(
+                query,
+                (
+                    title,
+                    summary,
+                    summary_embedding,
+                    document_type,
+                    document_date,
+                    json.dumps(tags or []),
+                ),
+            )
             result = await cur.fetchone()
-            await self.connection.commit()
+            if commit:
+                await self.connection.commit()
 
         return result[0]
 
     async def get_document_by_id(self, document_id: int) -> Optional[Dict[str, Any]]:
         """Get document by ID"""
         query = """
-            SELECT id, title, summary, summary_embedding
+            SELECT id, title, summary, summary_embedding, type, date, tags
             FROM documents 
             WHERE id = %s
         """
@@ -54,6 +116,9 @@ class DocumentRepository:
                 "title": result[1],
                 "summary": result[2],
                 "summary_embedding": result[3],
+                "type": result[4],
+                "date": result[5],
+                "tags": result[6],
             }
 
         return None
@@ -97,7 +162,11 @@ class DocumentRepository:
             return cur.rowcount == 1
 
     async def update_document_summary(
-        self, document_id: int, summary: str, summary_embedding: List[float]
+        self,
+        document_id: int,
+        summary: str,
+        summary_embedding: List[float],
+        commit: bool = True,
     ) -> bool:
         """Update document summary and its embedding"""
         query = """
@@ -108,7 +177,31 @@ class DocumentRepository:
 
         async with self.connection.cursor() as cur:
             await cur.execute(query, (summary, summary_embedding, document_id))
-            await self.connection.commit()
+            if commit:
+                await self.connection.commit()
+            return cur.rowcount == 1
+
+    async def update_document_metadata(
+        self,
+        document_id: int,
+        document_type: Optional[str] = None,
+        document_date: Optional[date] = None,
+        tags: Optional[List[str]] = None,
+        commit: bool = True,
+    ) -> bool:
+        """Replace document type, date and tags"""
+        query = """
+            UPDATE documents
+            SET type = %s, date = %s, tags = %s::jsonb
+            WHERE id = %s
+        """
+
+        async with self.connection.cursor() as cur:
+            await cur.execute(
+                query, (document_type, document_date, json.dumps(tags or []), document_id)
+            )
+            if commit:
+                await self.connection.commit()
             return cur.rowcount == 1
 
     async def delete_document(self, document_id: int) -> bool:
@@ -164,6 +257,8 @@ class DocumentRepository:
         query_text: str,
         similarity_threshold: float = 0.5,
         limit: int = 10,
+        shortlist_size: Optional[int] = None,
+        filters: Optional[DocumentFilter] = None,
     ) -> List[Dict[str, Any]]:
         """
         Hybrid search combining embedding similarity and full-text search
@@ -173,10 +268,21 @@ class DocumentRepository:
             query_text: Query text for full-text search
             similarity_threshold: Minimum similarity score (1-distance) to include
             limit: Maximum number of results to return
+            shortlist_size: Only score the nearest documents by the 256-d Matryoshka
+                index (plus keyword matches) with the full vectors (None = score all)
+            filters: Metadata predicates documents must match
 
         Returns:
             List of documents with similarity distances
         """
+        filters = filters or DocumentFilter()
+        if shortlist_size is not None:
+            return await self._search_documents_hybrid_shortlist(
+                query_embedding, query_text, similarity_threshold, limit, shortlist_size, filters
+            )
+
+        filter_sql, filter_params = filters.to_sql("documents")
+
         query = """
             SELECT 
                 id,
@@ -188,6 +294,7 @@ class DocumentRepository:
                 (1 - (summary_embedding <=> %s::vector)) >= %s
                 OR summary &@~ %s
             )
+            AND """ + filter_sql + """
             ORDER BY (summary_embedding <=> %s::vector) ASC
             LIMIT %s
         """
@@ -200,6 +307,7 @@ class DocumentRepository:
                     query_embedding,  # For similarity threshold
                     similarity_threshold,  # Similarity threshold
                     query_text,  # Summary pgroonga pattern
+                    *filter_params,  # Metadata filters
                     query_embedding,  # For final ordering
                     limit,
                 ),
@@ -219,6 +327,82 @@ class DocumentRepository:
 
         return documents
 
+    async def _search_documents_hybrid_shortlist(
+        self,
+        query_embedding: List[float],
+        query_text: str,
+        similarity_threshold: float,
+        limit: int,
+        shortlist_size: int,
+        filters: DocumentFilter,
+    ) -> List[Dict[str, Any]]:
+        """
+        search_documents_hybrid over a shortlist: the nearest documents on the
+        opt-in 256-d summary embedding index (VectorIndexRepository.apply_vector_search_mode)
+        plus the full-text matches, re-scored with the full summary embeddings
+        """
+        shortlist_filter_sql, shortlist_filter_params = filters.to_sql("documents")
+        filter_sql, filter_params = filters.to_sql("d")
+
+        query = """
+            WITH candidates AS (
+                (
+                    SELECT id
+                    FROM documents
+                    WHERE summary_embedding IS NOT NULL
+                      AND """ + shortlist_filter_sql + """
+                    ORDER BY subvector(summary_embedding, 1, 256)::vector(256)
+                        <=> subvector(%s::vector, 1, 256)::vector(256)
+                    LIMIT %s
+                )
+                UNION
+                SELECT id FROM documents WHERE summary &@~ %s
+            )
+            SELECT
+                d.id,
+                d.title,
+                d.summary,
+                (d.summary_embedding <=> %s::vector) as similarity_distance
+            FROM documents d
+            JOIN candidates c ON c.id = d.id
+            WHERE (
+                (1 - (d.summary_embedding <=> %s::vector)) >= %s
+                OR d.summary &@~ %s
+            )
+            AND """ + filter_sql + """
+            ORDER BY (d.summary_embedding <=> %s::vector) ASC
+            LIMIT %s
+        """
+
+        async with self.connection.cursor() as cur:
+            await cur.execute(
+                query,
+                (
+                    *shortlist_filter_params,  # Metadata filters on the shortlist
+                    query_embedding,  # For the 256-d shortlist
+                    shortlist_size,
+                    query_text,  # Keyword candidates
+                    query_embedding,  # For similarity calculation
+                    query_embedding,  # For similarity threshold
+                    similarity_threshold,  # Similarity threshold
+                    query_text,  # Summary pgroonga pattern
+                    *filter_params,  # Metadata filters
+                    query_embedding,  # For final ordering
+                    limit,
+                ),
+            )
+            results = await cur.fetchall()
+
+        return [
+            {
+                "id": result[0],
+                "title": result[1],
+                "summary": result[2],
+                "similarity_distance": result[3],
+            }
+            for result in results
+        ]
+
     async def get_all_documents(
         self, offset: int = 0, limit: int = 100
     ) -> List[Dict[str, Any]]:
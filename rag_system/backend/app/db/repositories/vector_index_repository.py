@@ -0,0 +1,254 @@
+from typing import Dict, List, Optional
+from psycopg import AsyncConnection, sql
+
+
+class VectorIndexRepository:
+    """Repository for pgvector HNSW index settings and maintenance using psycopg3"""
+
+    # index name -> (table, indexed expression, operator class). The float32
+    # indexes are created by V3__Add_hnsw_vector_indexes.sql; the others are
+    # opt-in and built by apply_vector_search_mode
+    HNSW_INDEXES = {
+        "idx_documents_summary_embedding_hnsw": (
+            "documents", "summary_embedding", "vector_cosine_ops"
+        ),
+        "idx_document_chunks_embedding_hnsw": (
+            "document_chunks", "embedding", "vector_cosine_ops"
+        ),
+        "idx_document_chunks_embedding_halfvec_hnsw": (
+            "document_chunks", "(embedding::halfvec(1536))", "halfvec_cosine_ops"
+        ),
+        "idx_document_chunks_embedding_binary_hnsw": (
+            "document_chunks", "(binary_quantize(embedding)::bit(1536))", "bit_hamming_ops"
+        ),
+        "idx_document_chunks_embedding_256_hnsw": (
+            "document_chunks", "(subvector(embedding, 1, 256)::vector(256))", "vector_cosine_ops"
+        ),
+        "idx_documents_summary_embedding_256_hnsw": (
+            "documents", "(subvector(summary_embedding, 1, 256)::vector(256))", "vector_cosine_ops"
+        ),
+    }
+
+    # Vector search mode -> shortlist distance served by the matching quantized
+    # index; {column} is the embedding column, %s the query vector.
+    # "full" searches the vector_cosine_ops index directly.
+    SHORTLIST_DISTANCES = {
+        "halfvec": "{column}::halfvec(1536) <=> %s::halfvec(1536)",
+        "binary": "binary_quantize({column})::bit(1536) <~> binary_quantize(%s::vector)::bit(1536)",
+        # text-embedding-3 vectors are Matryoshka embeddings: the leading dimensions
+        # form a usable lower-dimensional embedding. Cosine distance ignores the
+        # norm, so the truncated vectors need no re-normalization.
+        "matryoshka": "subvector({column}, 1, 256)::vector(256) <=> subvector(%s::vector, 1, 256)::vector(256)",
+    }
+    VECTOR_SEARCH_MODES = ("full", *SHORTLIST_DISTANCES)
+
+    # Vector search mode -> HNSW indexes its searches walk (chunks, document summaries)
+    MODE_INDEXES = {
+        "full": ("idx_document_chunks_embedding_hnsw", "idx_documents_summary_embedding_hnsw"),
+        "halfvec": (
+            "idx_document_chunks_embedding_halfvec_hnsw",
+            "idx_documents_summary_embedding_hnsw",
+        ),
+        "binary": (
+            "idx_document_chunks_embedding_binary_hnsw",
+            "idx_documents_summary_embedding_hnsw",
+        ),
+        "matryoshka": (
+            "idx_document_chunks_embedding_256_hnsw",
+            "idx_documents_summary_embedding_256_hnsw",
+        ),
+    }
+    FULL_INDEXES = MODE_INDEXES["full"]
+
+    ITERATIVE_SCAN_MODES = ("off", "strict_order", "relaxed_order")
+
+    def __init__(self, connection: AsyncConnection):
+        self.connection = connection
+
+    async def set_search_options(
+        self,
+        ef_search: Optional[int] = None,
+        iterative_scan: Optional[str] = None,
+    ) -> None:
+        """
+        Apply HNSW query-time options for the current transaction.
+
+        Args:
+            ef_search: Size of the dynamic candidate list (pgvector default: 40).
+                Higher values trade latency for recall.
+            iterative_scan: "off", "strict_order" or "relaxed_order" (pgvector >= 0.8).
+                Lets filtered queries keep scanning the index until LIMIT is satisfied.
+        """
+        if iterative_scan is not None and iterative_scan not in self.ITERATIVE_SCAN_MODES:
+            available = ", ".join(self.ITERATIVE_SCAN_MODES)
+            raise ValueError(
+                f"Unknown iterative_scan mode '{iterative_scan}'. Available: {available}"
+            )
+
+        async with self.connection.cursor() as cur:
+            if ef_search is not None:
+                await cur.execute(
+                    "SELECT set_config('hnsw.ef_search', %s, true)", (str(ef_search),)
+                )
+            if iterative_scan is not None:
+                await cur.execute(
+                    "SELECT set_config('hnsw.iterative_scan', %s, true)",
+                    (iterative_scan,),
+                )
+
+    async def rebuild_hnsw_indexes(self, m: int = 16, ef_construction: int = 64) -> None:
+        """
+        Rebuild the existing HNSW indexes with new build parameters.
+
+        m (max connections per layer) and ef_construction cannot be changed at
+        query time, so tuning them requires rebuilding the indexes. Opt-in
+        indexes that were never built are not created.
+        """
+        existing = await self.get_existing_indexes()
+        async with self.connection.cursor() as cur:
+            for index_name in existing:
+                await cur.execute(
+                    sql.SQL("DROP INDEX IF EXISTS {}").format(sql.Identifier(index_name))
+                )
+        await self.create_hnsw_indexes(existing, m, ef_construction)
+
+    async def create_hnsw_indexes(
+        self, index_names: List[str], m: int = 16, ef_construction: int = 64
+    ) -> List[str]:
+        """
+        Create HNSW indexes from HNSW_INDEXES that do not exist yet.
+
+        Returns:
+            Names of the indexes that were created
+        """
+        existing = await self.get_existing_indexes()
+        created = []
+        async with self.connection.cursor() as cur:
+            for index_name in index_names:
+                if index_name in existing:
+                    continue
+                table, expression, opclass = self.HNSW_INDEXES[index_name]
+                # Expressions and operator classes are the constants above
+                await cur.execute(
+                    sql.SQL(
+                        "CREATE INDEX {} ON {} USING hnsw ({} {}) "
+                        "WITH (m = {}, ef_construction = {})"
+                    ).format(
+                        sql.Identifier(index_name),
+                        sql.Identifier(table),
+                        sql.SQL(expression),
+                        sql.SQL(opclass),
+                        sql.Literal(m),
+                        sql.Literal(ef_construction),
+                    )
+                )
+                created.append(index_name)
+            await self.connection.commit()
+
+        return created
+
+    async def apply_vector_search_mode(
+        self,
+        mode: str,
+        drop_full_indexes: bool = False,
+        m: int = 16,
+        ef_construction: int = 64,
+    ) -> Dict[str, List[str]]:
+        """
+        Build the HNSW indexes a vector search mode uses and drop the opt-in
+        indexes of the other modes, so inserts only maintain the graphs in use.
+
+        Args:
+            mode: Vector search mode (see VECTOR_SEARCH_MODES)
+            drop_full_indexes: Also drop the float32 indexes the mode does not walk.
+                Quantized modes re-score their shortlist with the float32 column
+                (heap), not its index, so only "full" mode needs them.
+            m: HNSW m for indexes that are created
+            ef_construction: HNSW ef_construction for indexes that are created
+
+        Returns:
+            {"created": [...], "dropped": [...]} index names
+        """
+        required = self._mode_indexes(mode)
+        unused = [
+            index_name
+            for index_name in dict.fromkeys(
+                name for names in self.MODE_INDEXES.values() for name in names
+            )
+            if index_name not in required
+            and (drop_full_indexes or index_name not in self.FULL_INDEXES)
+        ]
+
+        created = await self.create_hnsw_indexes(list(required), m, ef_construction)
+
+        existing = await self.get_existing_indexes()
+        dropped = [index_name for index_name in unused if index_name in existing]
+        async with self.connection.cursor() as cur:
+            for index_name in dropped:
+                await cur.execute(
+                    sql.SQL("DROP INDEX IF EXISTS {}").format(sql.Identifier(index_name))
+                )
+            await self.connection.commit()
+
+        return {"created": created, "dropped": dropped}
+
+    async def get_missing_indexes(self, mode: str) -> List[str]:
+        """HNSW indexes a vector search mode walks that do not exist (exact scans instead)"""
+        required = self._mode_indexes(mode)
+        existing = await self.get_existing_indexes()
+        return [name for name in required if name not in existing]
+
+    def _mode_indexes(self, mode: str) -> tuple:
+        if mode not in self.MODE_INDEXES:
+            available = ", ".join(self.MODE_INDEXES)
+            raise ValueError(f"Unknown vector_search_mode '{mode}'. Available: {available}")
+        return self.MODE_INDEXES[mode]
+
+    async def get_existing_indexes(self) -> List[str]:
+        """Names of the HNSW_INDEXES that exist in the database"""
+        query = "SELECT name FROM unnest(%s::text[]) AS name WHERE to_regclass(name) IS NOT NULL"
+
+        async with self.connection.cursor() as cur:
+            await cur.execute(query, (list(self.HNSW_INDEXES),))
+            results = await cur.fetchall()
+
+        existing = {result[0] for result in results}
+        return [name for name in self.HNSW_INDEXES if name in existing]
+
+    async def get_embedding_storage(self) -> Dict[str, int]:
+        """
+        Get the bytes taken by stored chunk embeddings, and what the same
+        vectors would take as halfvec, bit and 256-d values (heap only, no index)
+        """
+        query = """
+            SELECT
+                COALESCE(SUM(pg_column_size(embedding)), 0),
+                COALESCE(SUM(pg_column_size(embedding::halfvec(1536))), 0),
+                COALESCE(SUM(pg_column_size(binary_quantize(embedding)::bit(1536))), 0),
+                COALESCE(SUM(pg_column_size(subvector(embedding, 1, 256))), 0)
+            FROM document_chunks
+        """
+
+        async with self.connection.cursor() as cur:
+            await cur.execute(query)
+            result = await cur.fetchone()
+
+        return {
+            "full": result[0],
+            "halfvec": result[1],
+            "binary": result[2],
+            "matryoshka": result[3],
+        }
+
+    async def get_index_sizes(self) -> Dict[str, int]:
+        """Get the on-disk size in bytes of each HNSW index (0 if missing)"""
+        query = "SELECT COALESCE(pg_relation_size(to_regclass(%s)), 0)"
+
+        sizes = {}
+        async with self.connection.cursor() as cur:
+            for index_name in self.HNSW_INDEXES:
+                await cur.execute(query, (index_name,))
+                result = await cur.fetchone()
+                sizes[index_name] = result[0] if result else 0
+
+        return sizes
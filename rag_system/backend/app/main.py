@@ -1,4 +1,5 @@
 import os
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
@@ -7,6 +8,15 @@ from dotenv import load_dotenv
 import logfire
 
 from app.api.routes import router
+from app.db.connection import DatabaseService
+from app.db.repositories.vector_index_repository import VectorIndexRepository
+from app.rag.reranking.voyage_reranker import VoyageReranker
+from app.rag.reranking.local_reranker import LocalCrossEncoderReranker
+from app.rag.reranking.rerank_cache import CachedReranker
+from app.rag.retrieval.hierarchical_retrieval import RetrievalConfig
+from app.rag.retrieval.query_processing import QueryProcessor
+from app.rag.retrieval.semantic_cache import SemanticRetrievalCache
+from app.rag.retrieval.vector_store import MmapVectorStore
 
 
 # Configure logging
@@ -21,6 +31,35 @@ API_PORT = int(os.getenv("API_PORT", "8080"))
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 LOGFIRE_TOKEN = os.getenv("LOGFIRE_TOKEN")
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+# "hybrid" (single weighted query) or "rrf" (concurrent vector/keyword legs,
+# holds two pooled connections per retrieval)
+RETRIEVAL_STAGE2_MODE = os.getenv("RETRIEVAL_STAGE2_MODE", "hybrid")
+# "full" (float32 HNSW), "halfvec" / "binary" (quantized HNSW shortlist) or
+# "matryoshka" (256-d HNSW shortlist in stages 1 and 2), shortlists re-scored
+RETRIEVAL_VECTOR_SEARCH_MODE = os.getenv("RETRIEVAL_VECTOR_SEARCH_MODE", "full")
+# "voyage" (Voyage AI API) or "local" (CPU cross-encoder, no network round trip)
+RERANKER_PROVIDER = os.getenv("RERANKER_PROVIDER", "voyage")
+# Rerank result cache (0 entries disables it); set a Redis URL to share it between workers
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "1000"))
+RERANK_CACHE_TTL_SECONDS = float(os.getenv("RERANK_CACHE_TTL_SECONDS", "3600"))
+RERANK_CACHE_REDIS_URL = os.getenv("RERANK_CACHE_REDIS_URL")
+# Semantic retrieval cache for paraphrased questions (0 entries disables it)
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "1000"))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600"))
+# Serve retrieval from a memory-mapped export (export_vector_store.py) instead of Postgres
+VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH")
+# Multi-query expansion (1 = off). Each variation holds a pooled connection while it runs;
+# variations still running after the budget are cancelled. Set a model for LLM rewrites.
+RETRIEVAL_QUERY_VARIATIONS = int(os.getenv("RETRIEVAL_QUERY_VARIATIONS", "1"))
+RETRIEVAL_MULTI_QUERY_BUDGET_SECONDS = float(
+    os.getenv("RETRIEVAL_MULTI_QUERY_BUDGET_SECONDS", "2.0")
+)
+QUERY_EXPANSION_MODEL = os.getenv("QUERY_EXPANSION_MODEL")
+# Micro-batch query embeddings of concurrent requests (0 = embed each query alone)
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "0"))
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
 
 # Simple validation - check what you actually need
 if not OPENAI_API_KEY:
@@ -40,12 +79,105 @@ async def lifespan(app: FastAPI):
     """Manage application lifespan events with proper dependency injection."""
     logger.info(f"🚀 Application starting up in {ENVIRONMENT} environment...")
 
+    # Connection pool shared by all requests for the lifetime of the app
+    db_service = DatabaseService()
+    await db_service.initialize(max_size=DB_POOL_MAX_SIZE)
+    app.state.db_service = db_service
+
+    # Retrieval components are stateless per request, so build them once
+    app.state.query_processor = QueryProcessor(
+        embedding_provider="openai",
+        expansion_model=QUERY_EXPANSION_MODEL,
+        batch_max_wait_ms=EMBEDDING_BATCH_MAX_WAIT_MS,
+        batch_max_size=EMBEDDING_BATCH_MAX_SIZE,
+    )
+    try:
+        if RERANKER_PROVIDER == "local":
+            app.state.reranker = LocalCrossEncoderReranker()
+        else:
+            app.state.reranker = VoyageReranker()
+    except (ValueError, ImportError) as e:
+        logger.warning(f"⚠️  Reranking disabled: {e}")
+        app.state.reranker = None
+
+    # Cache rerank results; chunk updates/deletes invalidate entries via NOTIFY
+    app.state.rerank_cache_listener = None
+    if app.state.reranker and RERANK_CACHE_SIZE > 0:
+        try:
+            app.state.reranker = CachedReranker(
+                app.state.reranker,
+                max_entries=RERANK_CACHE_SIZE,
+                ttl_seconds=RERANK_CACHE_TTL_SECONDS,
+                redis_url=RERANK_CACHE_REDIS_URL,
+            )
+            app.state.rerank_cache_listener = asyncio.create_task(
+                app.state.reranker.listen_for_changes(db_service)
+            )
+        except ImportError as e:
+            logger.warning(f"⚠️  Rerank cache disabled: {e}")
+    # Reuse retrievals for near-duplicate questions; cleared when documents change
+    app.state.semantic_cache = None
+    app.state.semantic_cache_listener = None
+    if SEMANTIC_CACHE_SIZE > 0:
+        app.state.semantic_cache = SemanticRetrievalCache(
+            similarity_threshold=SEMANTIC_CACHE_THRESHOLD,
+            max_entries=SEMANTIC_CACHE_SIZE,
+            ttl_seconds=SEMANTIC_CACHE_TTL_SECONDS,
+        )
+        app.state.semantic_cache_listener = asyncio.create_task(
+            app.state.semantic_cache.listen_for_changes(db_service)
+        )
+
+    # Memory-mapped embeddings shared by all workers through the page cache
+    app.state.vector_store = None
+    if VECTOR_STORE_PATH:
+        vector_store = MmapVectorStore(VECTOR_STORE_PATH)
+        if vector_store.is_available():
+            app.state.vector_store = vector_store
+        else:
+            logger.warning(f"⚠️  No vector store export at {VECTOR_STORE_PATH}, using Postgres")
+
+    app.state.retrieval_config = RetrievalConfig(
+        stage1_similarity_threshold=0.3,
+        stage1_document_limit=10,
+        stage2_chunk_limit=5,
+        stage2_mode=RETRIEVAL_STAGE2_MODE,
+        vector_search_mode=RETRIEVAL_VECTOR_SEARCH_MODE,
+        multi_query_variations=RETRIEVAL_QUERY_VARIATIONS,
+        multi_query_budget_seconds=RETRIEVAL_MULTI_QUERY_BUDGET_SECONDS,
+    )
+
+    # Opt-in HNSW indexes are built by examples/apply_vector_search_mode.py
+    if app.state.vector_store is None:
+        async with db_service.get_connection() as conn:
+            missing = await VectorIndexRepository(conn).get_missing_indexes(
+                RETRIEVAL_VECTOR_SEARCH_MODE
+            )
+        if missing:
+            logger.warning(
+                f"⚠️  {RETRIEVAL_VECTOR_SEARCH_MODE} vector search falls back to exact scans, "
+                f"missing HNSW indexes: {', '.join(missing)} (run apply_vector_search_mode.py)"
+            )
+
     logger.info("✅ Application startup complete.")
     yield
 
     # --- Shutdown ---
     logger.info("🛑 Application shutting down...")
-
+    listeners = [
+        getattr(app.state, name)
+        for name in ("rerank_cache_listener", "semantic_cache_listener")
+        if getattr(app.state, name, None)
+    ]
+    for listener in listeners:
+        listener.cancel()
+    # Let the listeners close their LISTEN connections before the pool goes away
+    await asyncio.gather(*listeners, return_exceptions=True)
+    if app.state.query_processor.embedding_batcher:
+        await app.state.query_processor.embedding_batcher.close()
+    if hasattr(app.state, "db_service") and app.state.db_service:
+        await app.state.db_service.close()
+        logger.info("Database connection pool closed.")
     logger.info("✅ Application shutdown complete.")
 
 
@@ -62,7 +194,7 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
     allow_credentials=True,
-    allow_methods=["POST"],
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
 )
 
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Chunker Scaling Benchmark
+
+Chunks synthetic markdown documents of increasing size (up to 10 MB by
+default) and reports time, throughput and time per MB. A linear-time chunker
+keeps the time per MB roughly constant as the input grows.
+
+Usage:
+  # Default: 1, 2.5, 5 and 10 MB
+  python benchmark_chunker.py
+
+  # Custom sizes (MB) and chunker limits
+  python benchmark_chunker.py --sizes 0.5 1 2 --max-tokens 512 --max-words 200
+
+  # Peak memory of chunk() vs the streaming iter_chunks() on a file on disk
+  python benchmark_chunker.py --memory --sizes 10
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+# Add the backend directory to Python path so we can import from app
+# Find the backend directory by looking for the directory containing 'app'
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = script_dir
+while backend_dir != "/" and not os.path.exists(os.path.join(backend_dir, "app")):
+    backend_dir = os.path.dirname(backend_dir)
+
+if os.path.exists(os.path.join(backend_dir, "app")):
+    sys.path.insert(0, backend_dir)
+else:
+    raise ImportError("Could not find backend directory containing 'app' module")
+
+from app.rag.chunking.markdown_chunker import GFMContextPathChunker, ChunkerOptions
+
+# Same deterministic document generator as the regression check
+sys.path.insert(0, script_dir)
+from chunker_regression import make_synthetic_markdown
+
+
+def measure_memory(chunker: GFMContextPathChunker, size_mb: float) -> None:
+    """Compare peak Python memory of chunk() and iter_chunks() reading from disk"""
+    with tempfile.NamedTemporaryFile("w", suffix=".md", delete=False, encoding="utf-8") as f:
+        f.write(make_synthetic_markdown(int(size_mb * 1024 * 1024)))
+        path = f.name
+
+    try:
+        tracemalloc.start()
+        with open(path, "r", encoding="utf-8") as f:
+            chunk_count = len(chunker.chunk(f.read(), "Synthetic Report"))
+        _, chunk_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        with open(path, "r", encoding="utf-8") as f:
+            # Consume chunks one at a time, like a streaming embed/insert pipeline
+            stream_count = sum(1 for _ in chunker.iter_chunks(f, "Synthetic Report"))
+        _, stream_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.unlink(path)
+
+    print(f"   {size_mb:6.2f} MB file")
+    print(f"   {'chunk()':<14} peak {chunk_peak / 1024 / 1024:8.1f} MB | {chunk_count} chunks")
+    print(f"   {'iter_chunks()':<14} peak {stream_peak / 1024 / 1024:8.1f} MB | {stream_count} chunks")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark chunker scaling on large markdown inputs",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--sizes", type=float, nargs="+", default=[1, 2.5, 5, 10], help="Input sizes in MB"
+    )
+    parser.add_argument("--max-tokens", type=int, default=512, help="max_tokens_per_chunk")
+    parser.add_argument("--max-words", type=int, default=200, help="max_words_per_chunk")
+    parser.add_argument(
+        "--memory", action="store_true", help="Compare peak memory of chunk() and iter_chunks()"
+    )
+    args = parser.parse_args()
+
+    chunker = GFMContextPathChunker(
+        ChunkerOptions(
+            max_tokens_per_chunk=args.max_tokens, max_words_per_chunk=args.max_words
+        )
+    )
+
+    if args.memory:
+        print("🚀 CHUNKER PEAK MEMORY")
+        print("=" * 60)
+        for size_mb in args.sizes:
+            measure_memory(chunker, size_mb)
+        return
+
+    print("🚀 CHUNKER SCALING BENCHMARK")
+    print("=" * 60)
+
+    for size_mb in args.sizes:
+        content = make_synthetic_markdown(int(size_mb * 1024 * 1024))
+        actual_mb = len(content.encode("utf-8")) / (1024 * 1024)
+
+        start = time.perf_counter()
+        chunks = chunker.chunk(content, "Synthetic Report")
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"   {actual_mb:6.2f} MB | {len(chunks):7d} chunks | {elapsed:8.2f}s | "
+            f"{elapsed / actual_mb:6.2f} s/MB | {len(chunks) / elapsed:8.0f} chunks/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Large Chunk Splitter Micro-Benchmark
+
+Times GFMContextPathChunker._split_large_chunk on pathological inputs and
+compares it with the previous per-grapheme splitter (kept inline below):
+1. A 100 KB markdown table row
+2. A long fenced code block
+3. A 100 KB paragraph without sentence punctuation
+4. Emoji / combining-mark heavy text (grapheme-safe cut path)
+
+Usage:
+  python benchmark_splitter.py
+  python benchmark_splitter.py --size-kb 500 --max-tokens 256
+"""
+
+import os
+import sys
+import time
+import argparse
+from typing import Callable, Dict, List
+
+# Add the backend directory to Python path so we can import from app
+# Find the backend directory by looking for the directory containing 'app'
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = script_dir
+while backend_dir != "/" and not os.path.exists(os.path.join(backend_dir, "app")):
+    backend_dir = os.path.dirname(backend_dir)
+
+if os.path.exists(os.path.join(backend_dir, "app")):
+    sys.path.insert(0, backend_dir)
+else:
+    raise ImportError("Could not find backend directory containing 'app' module")
+
+from app.rag.chunking.markdown_chunker import GFMContextPathChunker, ChunkerOptions
+
+
+def legacy_split(chunker: GFMContextPathChunker, text: str) -> List[str]:
+    """Previous splitter: token re-estimation per grapheme plus rfind over the buffer"""
+    chunks = []
+    current_chunk = ""
+    current_tokens = 0
+
+    for grapheme in chunker.split_graphemes(text):
+        grapheme_tokens = chunker.estimate_jina_token_count(grapheme)
+
+        if current_tokens + grapheme_tokens > chunker.options.max_tokens_per_chunk:
+            split_index = len(current_chunk)
+            for break_point in [". ", "? ", "! ", ", ", "; ", " ", "\n"]:
+                last_break = current_chunk.rfind(break_point)
+                if last_break != -1:
+                    split_index = last_break + len(break_point)
+                    break
+
+            if split_index < len(current_chunk):
+                chunks.append(current_chunk[:split_index].strip())
+                current_chunk = current_chunk[split_index:]
+                current_tokens = chunker.estimate_jina_token_count(current_chunk)
+            else:
+                chunks.append(current_chunk.strip())
+                current_chunk = ""
+                current_tokens = 0
+
+        current_chunk += grapheme
+        current_tokens += grapheme_tokens
+
+    if current_chunk:
+        chunks.append(current_chunk.strip())
+
+    return [chunk for chunk in chunks if chunk]
+
+
+def make_inputs(size: int) -> Dict[str, str]:
+    """Pathological inputs of roughly `size` characters"""
+    cell = "quarterly revenue 12.5%"
+    columns = size // (len(cell) + 3)
+    table_row = (
+        "| " + " | ".join(f"Col {c}" for c in range(columns)) + " |\n"
+        "| " + " | ".join("---" for _ in range(columns)) + " |\n"
+        "| " + " | ".join(cell for _ in range(columns)) + " |"
+    )[:size]
+
+    code_line = "result = transform(values[index], weights, bias=0.5)  # step\n"
+    code_block = "```python\n" + code_line * (size // len(code_line)) + "```"
+
+    run_on = ("revenue growth margin segment " * (size // 30))[:size]
+
+    graphemes = ("café́ 👨‍👩‍👧 naïve 👍🏽 résumé " * (size // 30))[:size]
+
+    return {
+        "table row": table_row,
+        "code block": code_block,
+        "run-on paragraph": run_on,
+        "graphemes": graphemes,
+    }
+
+
+def time_call(func: Callable[[], List[str]]) -> tuple:
+    start = time.perf_counter()
+    pieces = func()
+    return time.perf_counter() - start, pieces
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Micro-benchmark the large chunk splitter",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--size-kb", type=int, default=100, help="Input size in KB")
+    parser.add_argument("--max-tokens", type=int, default=512, help="max_tokens_per_chunk")
+    parser.add_argument("--skip-legacy", action="store_true", help="Only time the new splitter")
+    args = parser.parse_args()
+
+    chunker = GFMContextPathChunker(ChunkerOptions(max_tokens_per_chunk=args.max_tokens))
+
+    print("🚀 LARGE CHUNK SPLITTER BENCHMARK")
+    print("=" * 60)
+
+    for name, text in make_inputs(args.size_kb * 1024).items():
+        elapsed, pieces = time_call(lambda: chunker._split_large_chunk(text))
+        max_piece_tokens = max(chunker.estimate_jina_token_count(p) for p in pieces)
+        print(f"\n📄 {name} ({len(text) / 1024:.0f} KB)")
+        print(
+            f"   {'splitter':<8} {elapsed * 1000:9.1f}ms | {len(pieces):5d} pieces | "
+            f"max {max_piece_tokens} tokens/piece"
+        )
+
+        if not args.skip_legacy:
+            legacy_elapsed, legacy_pieces = time_call(lambda: legacy_split(chunker, text))
+            legacy_max = max(chunker.estimate_jina_token_count(p) for p in legacy_pieces)
+            print(
+                f"   {'legacy':<8} {legacy_elapsed * 1000:9.1f}ms | {len(legacy_pieces):5d} pieces | "
+                f"max {legacy_max} tokens/piece"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Chunker Output Regression Check
+
+Chunks the bundled documents in rag/documents (plus a deterministic synthetic
+document covering lists, nested lists, blockquotes, code blocks and wide
+tables) with several ChunkerOptions and compares the result against recorded
+snapshots (chunk count + a short sha256 per chunk). Also checks that the
+streaming iter_chunks() API yields exactly the same chunks as chunk().
+
+Usage:
+  # Compare against snapshots (exit code 1 on any difference)
+  python chunker_regression.py
+
+  # Re-record snapshots after an intentional output change
+  python chunker_regression.py --update
+"""
+
+import io
+import os
+import sys
+import json
+import random
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+# Add the backend directory to Python path so we can import from app
+# Find the backend directory by looking for the directory containing 'app'
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = script_dir
+while backend_dir != "/" and not os.path.exists(os.path.join(backend_dir, "app")):
+    backend_dir = os.path.dirname(backend_dir)
+
+if os.path.exists(os.path.join(backend_dir, "app")):
+    sys.path.insert(0, backend_dir)
+else:
+    raise ImportError("Could not find backend directory containing 'app' module")
+
+from app.rag.chunking.markdown_chunker import GFMContextPathChunker, ChunkerOptions
+
+
+DOCUMENTS_DIR = Path(__file__).parent.parent.parent / "documents"
+SNAPSHOT_PATH = Path(__file__).parent / "chunker_snapshots.json"
+
+# Option sets exercised by the check
+CONFIGS = {
+    "default": ChunkerOptions(),
+    "storage": ChunkerOptions(max_tokens_per_chunk=512, max_words_per_chunk=200),
+    "small": ChunkerOptions(
+        max_tokens_per_chunk=48, max_words_per_chunk=40, max_words_header=8
+    ),
+}
+
+WORDS = (
+    "revenue margin growth quarter segment operating income guidance capital "
+    "cloud services customers retention pipeline forecast liquidity dividend "
+    "headcount expansion region currency impact adjusted earnings"
+).split()
+
+
+def make_synthetic_markdown(target_bytes: int, seed: int = 7) -> str:
+    """
+    Build a deterministic markdown document of roughly target_bytes
+
+    Mixes headings (h1-h4), paragraphs, bullet / ordered / nested lists,
+    blockquotes, fenced code, narrow and wide tables.
+    """
+    rng = random.Random(seed)
+
+    def sentence(min_words: int = 6, max_words: int = 24) -> str:
+        words = rng.choices(WORDS, k=rng.randint(min_words, max_words))
+        return " ".join(words).capitalize() + rng.choice([".", "?", "!", "."])
+
+    def paragraph() -> str:
+        return " ".join(sentence() for _ in range(rng.randint(1, 8)))
+
+    parts: List[str] = []
+    size = 0
+    section = 0
+    while size < target_bytes:
+        section += 1
+        blocks = [f"# Part {section}: {sentence(2, 5)}"]
+        for sub in range(rng.randint(1, 4)):
+            blocks.append(f"{'#' * rng.randint(2, 4)} {sub + 1}. {sentence(1, 6)}")
+            for _ in range(rng.randint(1, 5)):
+                kind = rng.random()
+                if kind < 0.45:
+                    blocks.append(paragraph())
+                elif kind < 0.6:
+                    items = [f"- {sentence()}" for _ in range(rng.randint(2, 30))]
+                    if rng.random() < 0.4:
+                        items.insert(1, f"   - {sentence(2, 8)}")
+                    blocks.append("\n".join(items))
+                elif kind < 0.7:
+                    blocks.append(
+                        "\n".join(
+                            f"{n + 1}. {sentence()}" for n in range(rng.randint(2, 12))
+                        )
+                    )
+                elif kind < 0.78:
+                    blocks.append("> " + paragraph())
+                elif kind < 0.86:
+                    lines = [
+                        f"value_{n} = compute({n}, '{rng.choice(WORDS)}')"
+                        for n in range(rng.randint(2, 40))
+                    ]
+                    blocks.append("```python\n" + "\n".join(lines) + "\n```")
+                else:
+                    columns = rng.choice([3, 4, 12])
+                    header = "| " + " | ".join(f"Col {c}" for c in range(columns)) + " |"
+                    divider = "| " + " | ".join("---" for _ in range(columns)) + " |"
+                    rows = [
+                        "| "
+                        + " | ".join(sentence(1, 10) for _ in range(columns))
+                        + " |"
+                        for _ in range(rng.randint(1, 8))
+                    ]
+                    blocks.append("\n".join([header, divider, *rows]))
+
+        text = "\n\n".join(blocks) + "\n\n"
+        parts.append(text)
+        size += len(text.encode("utf-8"))
+
+    return "".join(parts)
+
+
+def load_inputs() -> Dict[str, tuple]:
+    """name -> (content, title) for every regression input"""
+    inputs = {}
+    for path in sorted(DOCUMENTS_DIR.glob("*.md")):
+        title = path.stem.replace("_", " ").replace("-", " ").title()
+        inputs[path.name] = (path.read_text(encoding="utf-8"), title)
+    inputs["synthetic"] = (make_synthetic_markdown(300_000), "Synthetic Report")
+    return inputs
+
+
+def snapshot(chunks: List[str]) -> Dict[str, object]:
+    return {
+        "count": len(chunks),
+        "hashes": [hashlib.sha256(c.encode("utf-8")).hexdigest()[:16] for c in chunks],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check chunker output against snapshots")
+    parser.add_argument("--update", action="store_true", help="Re-record snapshots")
+    args = parser.parse_args()
+
+    inputs = load_inputs()
+    results = {}
+    streaming_failures = 0
+    for config_name, options in CONFIGS.items():
+        chunker = GFMContextPathChunker(options)
+        results[config_name] = {}
+        for name, (content, title) in inputs.items():
+            chunks = chunker.chunk(content, title)
+            results[config_name][name] = snapshot(chunks)
+
+            streamed = list(chunker.iter_chunks(io.StringIO(content), title))
+            if streamed != chunks:
+                streaming_failures += 1
+                print(
+                    f"❌ {config_name:<8} {name}: iter_chunks yielded {len(streamed)} chunks, "
+                    f"chunk() returned {len(chunks)}"
+                )
+
+    if args.update:
+        with open(SNAPSHOT_PATH, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+        print(f"📝 Snapshots written to {SNAPSHOT_PATH}")
+        return
+
+    with open(SNAPSHOT_PATH, "r", encoding="utf-8") as f:
+        expected = json.load(f)
+
+    failures = streaming_failures
+    for config_name, documents in results.items():
+        for name, actual in documents.items():
+            recorded = expected.get(config_name, {}).get(name)
+            if recorded == actual:
+                print(f"✅ {config_name:<8} {name} ({actual['count']} chunks)")
+                continue
+
+            failures += 1
+            if recorded is None:
+                print(f"❌ {config_name:<8} {name}: no snapshot recorded")
+                continue
+            first_diff = next(
+                (
+                    i
+                    for i, (a, b) in enumerate(zip(actual["hashes"], recorded["hashes"]))
+                    if a != b
+                ),
+                min(actual["count"], recorded["count"]),
+            )
+            print(
+                f"❌ {config_name:<8} {name}: {actual['count']} chunks "
+                f"(expected {recorded['count']}), first difference at chunk {first_diff}"
+            )
+
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures} mismatch(es)")
+        sys.exit(1)
+    print("✅ Chunker output matches snapshots")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import re
 import regex
-from typing import Dict, List, Optional, Any, Tuple
+import unicodedata
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
 
 # Proper markdown parsing with GFM support
@@ -10,6 +11,20 @@ from mdit_py_plugins.footnote import footnote_plugin
 from mdit_py_plugins.deflist import deflist_plugin
 from mdit_py_plugins.tasklists import tasklists_plugin
 
+# Compiled once; word counting runs for every block and chunk
+WORD_PATTERN = regex.compile(r"\b\w+\b", regex.UNICODE)
+GRAPHEME_PATTERN = regex.compile(r"\X")
+
+# Jina embeddings typically have ~0.75 tokens per word
+TOKENS_PER_WORD = 0.75
+
+_MISSING = object()
+
+# Line patterns used to cut a markdown stream into sections at headings
+ATX_HEADING_LINE = re.compile(r"^#{1,6}(?:[ \t]|$)")
+FENCE_OPEN_LINE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+FENCE_CLOSE_LINE = re.compile(r"^ {0,3}(`{3,}|~{3,})[ \t]*$")
+
 
 @dataclass
 class HeaderPath:
@@ -27,6 +42,13 @@ class SectionContext:
 
 @dataclass
 class ChunkContext:
+    """
+    Mutable chunking state, updated in place while walking the tokens
+
+    buffer holds nodes ({"type", "content", "words"}) for the chunk being built;
+    word_count and token_count are the running totals of those nodes.
+    """
+
     header_path: HeaderPath = field(default_factory=HeaderPath)
     section_context: SectionContext = field(default_factory=SectionContext)
     buffer: List[Dict[str, Any]] = field(default_factory=list)
@@ -64,21 +86,22 @@ class GFMContextPathChunker:
         if not text:
             return 0
         # Use regex library for proper Unicode word boundary handling
-        words = regex.findall(r"\b\w+\b", text, regex.UNICODE)
-        return len(words)
+        return len(WORD_PATTERN.findall(text))
+
+    def tokens_from_words(self, word_count: int) -> int:
+        """Estimate Jina token count from an already computed word count"""
+        return int(word_count * TOKENS_PER_WORD)
 
     def estimate_jina_token_count(self, text: str) -> int:
         """Estimate token count for Jina embeddings"""
         if not text:
             return 0
-        word_count = self.count_words(text)
-        # Jina embeddings typically have ~0.75 tokens per word
-        return int(word_count * 0.75)
+        return self.tokens_from_words(self.count_words(text))
 
     def split_graphemes(self, text: str) -> List[str]:
         """Split text into graphemes using Unicode-aware segmentation"""
         # Use regex library for proper grapheme cluster support
-        return regex.findall(r"\X", text)
+        return GRAPHEME_PATTERN.findall(text)
 
     def to_string(self, node: Any) -> str:
         """Extract text content from markdown-it token"""
@@ -138,8 +161,9 @@ class GFMContextPathChunker:
 
     def _get_token_attr(self, token: Any, attr: str, default: Any = None) -> Any:
         """Get attribute from token (handles both Token objects and dicts)"""
-        if hasattr(token, attr):
-            return getattr(token, attr, default)
+        value = getattr(token, attr, _MISSING)
+        if value is not _MISSING:
+            return value
         elif isinstance(token, dict):
             return token.get(attr, default)
         return default
@@ -168,6 +192,83 @@ class GFMContextPathChunker:
             print(f"Error during chunking: {e}")
             return []
 
+    def iter_chunks(
+        self, stream: Union[str, Iterable[str]], page_title: str
+    ) -> Iterator[str]:
+        """
+        Chunk a markdown stream section by section, yielding chunks as they are finalized
+
+        The input is cut into sections at ATX heading lines outside code fences.
+        Every heading finalizes the pending chunk anyway, so with the chunking
+        context carried across sections the output matches chunk() while only
+        one section is parsed and held in memory at a time. (Footnote
+        definitions are an exception: markdown-it moves them to the end of the
+        parsed text, which is now the end of their section.)
+
+        Args:
+            stream: Text file object, iterable of lines, or a string
+            page_title: Document title used as the root of the header path
+
+        Yields:
+            Chunk strings, in document order
+        """
+        if isinstance(stream, str):
+            stream = stream.splitlines(keepends=True)
+
+        context = self._create_initial_context(page_title)
+        for section in self._iter_sections(stream):
+            if not section.strip():
+                continue
+
+            try:
+                tokens = self.md.parse(section)
+                if tokens:
+                    self._process_tokens(tokens, context)
+            except Exception as e:
+                print(f"Error during chunking: {e}")
+                continue
+
+            yield from self._drain_chunks(context)
+
+        self._finalize_chunks(context)
+        yield from self._drain_chunks(context)
+
+    def _iter_sections(self, lines: Iterable[str]) -> Iterator[str]:
+        """Group lines into sections that each start at a heading outside code fences"""
+        section: List[str] = []
+        fence: Optional[str] = None
+
+        for line in lines:
+            if fence is None:
+                if section and ATX_HEADING_LINE.match(line):
+                    yield "".join(section)
+                    section = []
+
+                opening = FENCE_OPEN_LINE.match(line)
+                if opening:
+                    fence = opening.group(1)
+            else:
+                closing = FENCE_CLOSE_LINE.match(line)
+                if (
+                    closing
+                    and closing.group(1)[0] == fence[0]
+                    and len(closing.group(1)) >= len(fence)
+                ):
+                    fence = None
+
+            section.append(line)
+
+        if section:
+            yield "".join(section)
+
+    def _drain_chunks(self, context: ChunkContext) -> Iterator[str]:
+        """Yield and release the chunks finalized so far"""
+        chunks = context.chunks
+        context.chunks = []
+        for chunk in chunks:
+            if chunk and isinstance(chunk, str) and chunk.strip():
+                yield chunk
+
     def chunk_within_token_limit(
         self,
         input_text: str,
@@ -310,12 +411,7 @@ class GFMContextPathChunker:
         self, token: Any, context: ChunkContext
     ) -> ChunkContext:
         """Update section context with sophisticated tracking like TypeScript version"""
-        new_section_context = SectionContext(
-            current_header=context.section_context.current_header,
-            parent_list=context.section_context.parent_list,
-            table_header=context.section_context.table_header,
-            depth=context.section_context.depth,
-        )
+        new_section_context = context.section_context
 
         token_type = self._get_token_attr(token, "type", "")
 
@@ -335,14 +431,7 @@ class GFMContextPathChunker:
         elif token_type in ["bullet_list_close", "ordered_list_close"]:
             new_section_context.parent_list = None
 
-        return ChunkContext(
-            header_path=context.header_path,
-            section_context=new_section_context,
-            buffer=context.buffer,
-            word_count=context.word_count,
-            token_count=context.token_count,
-            chunks=context.chunks,
-        )
+        return context
 
     def _extract_table_header_from_tokens(
         self, table_tokens: List[Any]
@@ -509,36 +598,40 @@ class GFMContextPathChunker:
         self, level: int, heading_text: str, context: ChunkContext
     ) -> ChunkContext:
         """Handle heading with proper path tracking"""
-        clean_context = self._finalize_chunks(context)
+        self._finalize_chunks(context)
 
         # Create new header path
-        new_path = clean_context.header_path.path[: level - 1]
+        new_path = context.header_path.path[: level - 1]
         new_path.append(heading_text)
 
+        heading_words = self.count_words(heading_text)
+
         # Determine if this heading is significant
         is_significant = (
-            self.count_words(heading_text) >= 4
+            heading_words >= 4
             or level == 1
             or "?" in heading_text
             or re.match(r"^\d+[.)]\s", heading_text)
         )
 
-        has_existing_content = len(clean_context.buffer) > 0
+        has_existing_content = len(context.buffer) > 0
         should_create_chunk = has_existing_content or is_significant
 
-        # Create heading node
-        heading_node = {"type": "heading", "level": level, "content": heading_text}
+        context.header_path = HeaderPath(path=new_path, level=level)
+        if should_create_chunk:
+            # Create heading node
+            context.buffer.append(
+                {
+                    "type": "heading",
+                    "level": level,
+                    "content": heading_text,
+                    "words": heading_words,
+                }
+            )
+            context.word_count = heading_words
+            context.token_count = self.tokens_from_words(heading_words)
 
-        return ChunkContext(
-            header_path=HeaderPath(path=new_path, level=level),
-            section_context=clean_context.section_context,
-            buffer=[heading_node] if should_create_chunk else [],
-            word_count=self.count_words(heading_text) if should_create_chunk else 0,
-            token_count=self.estimate_jina_token_count(heading_text)
-            if should_create_chunk
-            else 0,
-            chunks=clean_context.chunks,
-        )
+        return context
 
     def _handle_table(
         self, table_tokens: List[Dict[str, Any]], context: ChunkContext
@@ -549,26 +642,13 @@ class GFMContextPathChunker:
 
         # Update section context with table header
         table_header = self._extract_table_header_from_tokens(table_tokens)
-        updated_context = context
         if table_header:
-            updated_context = ChunkContext(
-                header_path=context.header_path,
-                section_context=SectionContext(
-                    current_header=context.section_context.current_header,
-                    parent_list=context.section_context.parent_list,
-                    table_header=table_header,
-                    depth=context.section_context.depth,
-                ),
-                buffer=context.buffer,
-                word_count=context.word_count,
-                token_count=context.token_count,
-                chunks=context.chunks,
-            )
+            context.section_context.table_header = table_header
 
         # Extract table structure
         table_data = self._parse_table_structure(table_tokens)
         if not table_data:
-            return updated_context
+            return context
 
         headers = table_data.get("headers", [])
         rows = table_data.get("rows", [])
@@ -576,15 +656,22 @@ class GFMContextPathChunker:
         if not headers or not rows:
             # Simple table, treat as block
             table_text = self._tokens_to_markdown(table_tokens)
-            return self._handle_block_content(table_text, "table", updated_context)
+            return self._handle_block_content(table_text, "table", context)
 
         # Check if table is too wide for a single chunk
         max_cells_per_chunk = max(2, len(headers) // 2)
         current_context = context
 
         for row_idx, row in enumerate(rows):
+            # Include header + row as single chunk when it fits
+            table_chunk_text = self._create_table_chunk_text(headers, row)
+            row_words = self.count_words(table_chunk_text)
+
             # Check if this row is too long using proper validation
-            if self._is_table_row_too_long(row, headers):
+            if row and (
+                row_words > self.options.max_words_per_chunk
+                or self.tokens_from_words(row_words) > self.options.max_tokens_per_chunk
+            ):
                 # Split row into chunks
                 cell_chunks = self._split_row_into_chunks(
                     row, headers, max_cells_per_chunk
@@ -607,10 +694,8 @@ class GFMContextPathChunker:
                         table_chunk_text, "table", current_context
                     )
             else:
-                # Include header + row as single chunk
-                table_chunk_text = self._create_table_chunk_text(headers, row)
                 current_context = self._handle_block_content(
-                    table_chunk_text, "table", current_context
+                    table_chunk_text, "table", current_context, words=row_words
                 )
 
         return current_context
@@ -696,14 +781,16 @@ class GFMContextPathChunker:
 
         list_text = self._tokens_to_markdown(list_tokens)
         list_words = self.count_words(list_text)
-        list_tokens_count = self.estimate_jina_token_count(list_text)
+        list_tokens_count = self.tokens_from_words(list_words)
 
         # If the whole list fits, process as single block
         if (
             list_words <= self.options.max_words_per_chunk
             and list_tokens_count <= self.options.max_tokens_per_chunk
         ):
-            return self._handle_block_content(list_text, "list", context)
+            return self._handle_block_content(
+                list_text, "list", context, words=list_words
+            )
 
         # Otherwise, split list into smaller chunks
         list_items = self._extract_list_items(list_tokens)
@@ -758,7 +845,7 @@ class GFMContextPathChunker:
         for item_tokens in list_items:
             item_text = self._tokens_to_markdown(item_tokens)
             item_words = self.count_words(item_text)
-            item_tokens_count = self.estimate_jina_token_count(item_text)
+            item_tokens_count = self.tokens_from_words(item_words)
 
             # Check if adding this item would exceed limits
             if current_chunk_items and (
@@ -936,46 +1023,48 @@ class GFMContextPathChunker:
         return self._handle_block_content(blockquote_text, "blockquote", context)
 
     def _handle_block_content(
-        self, content: str, node_type: str, context: ChunkContext
+        self,
+        content: str,
+        node_type: str,
+        context: ChunkContext,
+        words: Optional[int] = None,
     ) -> ChunkContext:
-        """Generic handler for block-level content"""
+        """
+        Generic handler for block-level content
+
+        Args:
+            words: Word count of content if the caller already computed it
+        """
         if not content or not content.strip():
             return context
 
-        words = self.count_words(content)
-        tokens = self.estimate_jina_token_count(content)
+        if words is None:
+            words = self.count_words(content)
+        tokens = self.tokens_from_words(words)
+        node = {"type": node_type, "content": content, "words": words}
 
         # Check if adding this would exceed limits
         if (
             context.token_count + tokens > self.options.max_tokens_per_chunk
             or context.word_count + words > self.options.max_words_per_chunk
         ):
-            clean_context = self._finalize_chunks(context)
-            return self._finalize_chunks(
-                ChunkContext(
-                    header_path=clean_context.header_path,
-                    section_context=clean_context.section_context,
-                    buffer=[{"type": node_type, "content": content}],
-                    word_count=words,
-                    token_count=tokens,
-                    chunks=clean_context.chunks,
-                )
-            )
+            # The block is emitted as a chunk of its own
+            self._finalize_chunks(context)
+            context.buffer.append(node)
+            context.word_count = words
+            context.token_count = tokens
+            return self._finalize_chunks(context)
 
         # Add to current buffer
-        return ChunkContext(
-            header_path=context.header_path,
-            section_context=context.section_context,
-            buffer=context.buffer + [{"type": node_type, "content": content}],
-            word_count=context.word_count + words,
-            token_count=context.token_count + tokens,
-            chunks=context.chunks,
-        )
+        context.buffer.append(node)
+        context.word_count += words
+        context.token_count += tokens
+        return context
 
     def _is_content_too_large(self, content: str, context: ChunkContext) -> bool:
         """Check if content is too large for current context"""
         words = self.count_words(content)
-        tokens = self.estimate_jina_token_count(content)
+        tokens = self.tokens_from_words(words)
 
         return (
             context.word_count + words > self.options.max_words_per_chunk
@@ -983,51 +1072,45 @@ class GFMContextPathChunker:
         )
 
     def _finalize_chunks(self, context: ChunkContext) -> ChunkContext:
-        """Finalize chunks from the buffer"""
+        """Finalize chunks from the buffer (appends to context.chunks in place)"""
         if not context.buffer:
             return context
 
-        empty_context = ChunkContext(
-            header_path=context.header_path,
-            section_context=context.section_context,
-            buffer=[],
-            word_count=0,
-            token_count=0,
-            chunks=context.chunks,
-        )
+        buffer = context.buffer
+        buffer_words = context.word_count
+        context.buffer = []
+        context.word_count = 0
+        context.token_count = 0
 
         try:
-            chunk = self._create_chunk(context.buffer, context.header_path.path)
+            formatted_path = self._format_header_path(context.header_path.path)
+            chunk = self._create_chunk(
+                buffer, context.header_path.path, formatted_path=formatted_path
+            )
             if not chunk:
-                return empty_context
-
-            chunk_tokens = self.estimate_jina_token_count(chunk)
-            if chunk_tokens > self.options.max_tokens_per_chunk:
-                split_chunks = self._split_large_chunk(chunk)
-                return ChunkContext(
-                    header_path=context.header_path,
-                    section_context=context.section_context,
-                    buffer=[],
-                    word_count=0,
-                    token_count=0,
-                    chunks=context.chunks + split_chunks,
-                )
+                return context
 
-            return ChunkContext(
-                header_path=context.header_path,
-                section_context=context.section_context,
-                buffer=[],
-                word_count=0,
-                token_count=0,
-                chunks=context.chunks + [chunk],
-            )
+            # Chunk words = header path words + cached node words; the "\n\n"
+            # separators and "#" heading prefixes add no words
+            chunk_words = buffer_words
+            if formatted_path:
+                chunk_words += self.count_words(formatted_path)
+
+            if self.tokens_from_words(chunk_words) > self.options.max_tokens_per_chunk:
+                context.chunks.extend(self._split_large_chunk(chunk))
+            else:
+                context.chunks.append(chunk)
 
         except Exception as e:
             print(f"Error finalizing chunks: {e}")
-            return empty_context
+
+        return context
 
     def _create_chunk(
-        self, nodes: List[Dict[str, Any]], header_path: List[str]
+        self,
+        nodes: List[Dict[str, Any]],
+        header_path: List[str],
+        formatted_path: Optional[str] = None,
     ) -> Optional[str]:
         """Create a chunk from nodes with validation"""
         if not nodes:
@@ -1052,7 +1135,8 @@ class GFMContextPathChunker:
             if not content.strip():
                 return None
 
-            formatted_path = self._format_header_path(header_path)
+            if formatted_path is None:
+                formatted_path = self._format_header_path(header_path)
             return f"{formatted_path}\n\n{content}" if formatted_path else content
 
         except Exception as e:
@@ -1110,44 +1194,73 @@ class GFMContextPathChunker:
         return full_path
 
     def _split_large_chunk(self, text: str) -> List[str]:
-        """Split a large chunk into smaller pieces with Unicode awareness"""
-        chunks = []
-        current_chunk = ""
-        current_tokens = 0
+        """
+        Split a large chunk into pieces within max_tokens_per_chunk
+
+        Word offsets are computed once; each piece then takes as many words as
+        the token limit allows and is cut at the best break point in the second
+        half of that window, in a single forward pass over the text.
+        """
+        max_tokens = self.options.max_tokens_per_chunk
+        # Largest word count whose token estimate still fits
+        max_words = max(1, int((max_tokens + 1) / TOKENS_PER_WORD))
+        while max_words > 1 and self.tokens_from_words(max_words) > max_tokens:
+            max_words -= 1
+
+        word_starts = [match.start() for match in WORD_PATTERN.finditer(text)]
+        break_points = [". ", "? ", "! ", ", ", "; ", " ", "\n"]
 
-        # Use proper grapheme segmentation
-        graphemes = self.split_graphemes(text)
+        chunks = []
+        pos = 0
+        word_index = 0
+        while len(word_starts) - word_index > max_words:
+            # The piece must end before the first word that no longer fits
+            limit = word_starts[word_index + max_words]
+            window_start = pos + (limit - pos) // 2
+
+            split_index = limit
+            for break_point in break_points:
+                last_break = text.rfind(break_point, window_start, limit)
+                if last_break != -1:
+                    split_index = last_break + len(break_point)
+                    break
 
-        for grapheme in graphemes:
-            grapheme_tokens = self.estimate_jina_token_count(grapheme)
+            split_index = self._grapheme_safe_index(text, split_index, pos)
+            chunks.append(text[pos:split_index].strip())
 
-            if current_tokens + grapheme_tokens > self.options.max_tokens_per_chunk:
-                split_index = len(current_chunk)
-                break_points = [". ", "? ", "! ", ", ", "; ", " ", "\n"]
+            pos = split_index
+            while word_index < len(word_starts) and word_starts[word_index] < pos:
+                word_index += 1
 
-                # Find a good break point
-                for break_point in break_points:
-                    last_break = current_chunk.rfind(break_point)
-                    if last_break != -1:
-                        split_index = last_break + len(break_point)
-                        break
+        chunks.append(text[pos:].strip())
 
-                if split_index < len(current_chunk):
-                    chunks.append(current_chunk[:split_index].strip())
-                    current_chunk = current_chunk[split_index:]
-                    current_tokens = self.estimate_jina_token_count(current_chunk)
-                else:
-                    chunks.append(current_chunk.strip())
-                    current_chunk = ""
-                    current_tokens = 0
+        return [chunk for chunk in chunks if chunk]
 
-            current_chunk += grapheme
-            current_tokens += grapheme_tokens
+    def _grapheme_safe_index(self, text: str, index: int, lower_bound: int) -> int:
+        """Move a cut index back to a grapheme boundary if it falls inside a cluster"""
+        if index >= len(text) or index <= lower_bound:
+            return index
+
+        # Cheap check first: most cuts land before plain characters
+        char = text[index]
+        previous = text[index - 1]
+        if not (
+            unicodedata.combining(char)
+            or unicodedata.category(char) in ("Mn", "Mc", "Me", "Cf", "Sk")
+            or previous == "\u200d"
+            or "\ud800" <= previous <= "\udfff"
+        ):
+            return index
 
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        # Segment a small window around the cut and snap to the last boundary
+        window_start = max(lower_bound, index - 64)
+        boundary = window_start
+        for match in GRAPHEME_PATTERN.finditer(text, window_start, index + 64):
+            if match.start() > index:
+                break
+            boundary = match.start()
 
-        return [chunk for chunk in chunks if chunk]
+        return boundary if boundary > lower_bound else index
 
     def _is_table_row_too_long(self, row: List[str], headers: List[str]) -> bool:
         """Check if table row is too long (similar to TypeScript version)"""
@@ -1157,7 +1270,7 @@ class GFMContextPathChunker:
         # Create table representation to measure
         row_text = self._create_table_chunk_text(headers, row)
         row_words = self.count_words(row_text)
-        row_tokens = self.estimate_jina_token_count(row_text)
+        row_tokens = self.tokens_from_words(row_words)
 
         return (
             row_words > self.options.max_words_per_chunk
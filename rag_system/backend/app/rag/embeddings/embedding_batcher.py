@@ -0,0 +1,174 @@
+"""
+Micro-batching for query embeddings
+
+Collects texts from concurrent callers and embeds them with a single
+embed_batch_async call:
+- A batch is sent when it reaches max_batch_size or max_wait_ms after its
+  first text arrived, whichever comes first
+- Each caller awaits its own future, resolved from the batch result
+- A failed batch raises the same exception in every caller of that batch
+- In-memory cache hits are returned immediately, without waiting for a batch
+  (persistent store hits are resolved by the batch call)
+"""
+
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Tuple
+
+from app.rag.embeddings.embedding_generator import EmbeddingGenerator, EmbeddingResult
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatcherStats:
+    """Counters for micro-batcher activity"""
+
+    requests: int = 0
+    cache_hits: int = 0
+    batches: int = 0
+    batched_texts: int = 0
+    full_batches: int = 0  # sent because max_batch_size was reached
+    failed_batches: int = 0
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.batched_texts / self.batches if self.batches > 0 else 0.0
+
+
+class EmbeddingMicroBatcher:
+    """
+    Coalesces concurrent single-text embedding requests into batches
+
+    Usage:
+        batcher = EmbeddingMicroBatcher(generator, max_batch_size=32, max_wait_ms=10)
+        result = await batcher.embed("What was revenue in Q3?")
+    """
+
+    def __init__(
+        self,
+        embedder: EmbeddingGenerator,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 10.0,
+        max_concurrent_batches: Optional[int] = None,
+        model: Optional[str] = None,
+    ):
+        """
+        Initialize micro-batcher
+
+        Args:
+            embedder: Generator used for the batched requests
+            max_batch_size: Texts per batch before it is sent without waiting
+            max_wait_ms: Longest a text waits for other texts to join its batch
+            max_concurrent_batches: Batches in flight at once (defaults to the
+                provider's max_concurrency)
+            model: Model to use (optional, uses the embedder's default)
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must not be negative")
+
+        self.embedder = embedder
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.model = model or embedder.default_model
+        self.stats = BatcherStats()
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: set = set()
+        self._semaphore = asyncio.Semaphore(
+            max_concurrent_batches or embedder.provider.max_concurrency
+        )
+
+    async def embed(self, text: str) -> EmbeddingResult:
+        """
+        Embed one text as part of the next batch
+
+        Args:
+            text: Input text to embed
+
+        Returns:
+            EmbeddingResult for this text
+        """
+        self.stats.requests += 1
+
+        cached = self.embedder.get_cached([text], self.model)[0]
+        if cached is not None:
+            self.stats.cache_hits += 1
+            return cached
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self.stats.full_batches += 1
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        # Shield so a cancelled caller does not cancel the batch for the others
+        return await asyncio.shield(future)
+
+    async def close(self) -> None:
+        """Send any waiting texts and wait for batches in flight"""
+        self._flush()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batcher statistics"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "requests": self.stats.requests,
+            "cache_hits": self.stats.cache_hits,
+            "batches": self.stats.batches,
+            "full_batches": self.stats.full_batches,
+            "failed_batches": self.stats.failed_batches,
+            "average_batch_size": round(self.stats.average_batch_size, 2),
+            "waiting": len(self._pending),
+        }
+
+    def _flush(self) -> None:
+        """Send the waiting texts as one batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Embed a batch and resolve every caller's future"""
+        start_time = time.time()
+        texts = [text for text, _ in batch]
+        self.stats.batches += 1
+        self.stats.batched_texts += len(texts)
+
+        try:
+            async with self._semaphore:
+                batch_result = await self.embedder.embed_batch_async(texts, self.model)
+        except Exception as e:
+            self.stats.failed_batches += 1
+            logger.warning(f"Embedding batch of {len(texts)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, batch_result.individual_results):
+            if not future.done():
+                future.set_result(result)
+
+        logger.debug(
+            f"Embedded batch of {len(texts)} in {(time.time() - start_time) * 1000:.1f}ms"
+        )
@@ -0,0 +1,159 @@
+"""
+Bounded in-memory embedding cache
+
+LRU cache for embedding vectors with:
+- Entry count and memory limits
+- Optional time-to-live per entry
+- Compact float32 storage (array('f'), 4 bytes per dimension)
+- Hit / miss / eviction counters
+"""
+
+import sys
+import time
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Tuple
+
+
+# Approximate per-entry bookkeeping cost (key string, tuple, OrderedDict node)
+ENTRY_OVERHEAD_BYTES = 200
+
+
+@dataclass
+class CacheStats:
+    """Counters for embedding cache activity"""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU cache for embeddings bounded by entry count and memory
+
+    Entries are evicted least-recently-used first when either limit is exceeded,
+    and lazily expired on lookup when a TTL is configured.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize embedding cache
+
+        Args:
+            max_entries: Maximum number of cached embeddings
+            max_memory_bytes: Maximum approximate memory used by cached embeddings
+            ttl_seconds: Time-to-live for entries (None = never expire)
+        """
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (float32 vector, tokens_used, expires_at)
+        self._entries: "OrderedDict[str, Tuple[array, int, Optional[float]]]" = (
+            OrderedDict()
+        )
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+    def get(self, key: str, count_miss: bool = True) -> Optional[Tuple[List[float], int]]:
+        """
+        Look up an embedding
+
+        Args:
+            key: Cache key
+            count_miss: Count a miss in the stats (False for a pre-check whose
+                misses are looked up, and counted, again later)
+
+        Returns:
+            (embedding, tokens_used) or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if count_miss:
+                    self.stats.misses += 1
+                return None
+
+            vector, tokens_used, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.stats.expirations += 1
+                if count_miss:
+                    self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return vector.tolist(), tokens_used
+
+    def put(self, key: str, embedding: List[float], tokens_used: int = 0) -> None:
+        """Store an embedding, evicting least-recently-used entries if needed"""
+        vector = array("f", embedding)
+        expires_at = (
+            time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+        )
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (vector, tokens_used, expires_at)
+            self._memory_bytes += self._entry_size(vector)
+
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or self._memory_bytes > self.max_memory_bytes
+            ):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters and usage"""
+        return {
+            "entries": len(self._entries),
+            "memory_bytes": self._memory_bytes,
+            "max_entries": self.max_entries,
+            "max_memory_bytes": self.max_memory_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "evictions": self.stats.evictions,
+            "expirations": self.stats.expirations,
+            "hit_rate": self.stats.hit_rate,
+        }
+
+    def _remove(self, key: str) -> None:
+        vector, _, _ = self._entries.pop(key)
+        self._memory_bytes -= self._entry_size(vector)
+
+    @staticmethod
+    def _entry_size(vector: array) -> int:
+        return sys.getsizeof(vector) + ENTRY_OVERHEAD_BYTES
@@ -9,23 +9,29 @@ Supports multiple embedding providers with unified interface:
 
 Features:
 - Batch processing for multiple inputs
+- Async, concurrent batch embedding with token-aware batch packing
 - Automatic retry logic with exponential backoff
 - Token counting and cost estimation
-- Caching for duplicate inputs
+- Bounded LRU/TTL caching for duplicate inputs (per item, also in batches)
+- Optional persistent on-disk store so unchanged texts are never re-embedded
 - Comprehensive error handling
 """
 
 import time
+import asyncio
 import hashlib
-from typing import List, Union, Optional, Dict, Any
+from typing import List, Union, Optional, Dict, Any, Tuple
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 import logging
 import os
 
+from app.rag.embeddings.embedding_cache import EmbeddingCache
+from app.rag.embeddings.embedding_store import EmbeddingStore
+
 # Optional imports - providers will be disabled if not available
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
 
     OPENAI_AVAILABLE = True
 except ImportError:
@@ -74,6 +80,12 @@ class BatchEmbeddingResult:
 class EmbeddingProvider(ABC):
     """Abstract base class for embedding providers"""
 
+    # Request limits used to pack batches (inputs and estimated tokens per request)
+    max_batch_size: int = 100
+    max_batch_tokens: int = 100_000
+    # How many batch requests may be in flight at once
+    max_concurrency: int = 4
+
     @abstractmethod
     def embed_single(self, text: str, model: str) -> EmbeddingResult:
         """Generate embedding for single text"""
@@ -84,6 +96,12 @@ class EmbeddingProvider(ABC):
         """Generate embeddings for multiple texts"""
         pass
 
+    async def embed_batch_async(
+        self, texts: List[str], model: str
+    ) -> BatchEmbeddingResult:
+        """Generate embeddings for multiple texts without blocking the event loop"""
+        return await asyncio.to_thread(self.embed_batch, texts, model)
+
     @abstractmethod
     def estimate_tokens(self, text: str) -> int:
         """Estimate token count for text"""
@@ -98,6 +116,12 @@ class EmbeddingProvider(ABC):
 class OpenAIEmbeddingProvider(EmbeddingProvider):
     """OpenAI embedding provider"""
 
+    # OpenAI allows 2048 inputs and 300k tokens per embeddings request;
+    # keep headroom because estimate_tokens is a rough character heuristic
+    max_batch_size = 2048
+    max_batch_tokens = 250_000
+    max_concurrency = 8
+
     def __init__(self, api_key: Optional[str] = None):
         if not OPENAI_AVAILABLE:
             raise ImportError("OpenAI package not installed. Run: pip install openai")
@@ -106,6 +130,7 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
         self.client = OpenAI(
             api_key=api_key
         )  # OpenAI() automatically uses OPENAI_API_KEY if api_key is None
+        self.async_client = AsyncOpenAI(api_key=api_key)
         self.name = "openai"
 
         # Model configurations
@@ -146,39 +171,61 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
 
         try:
             response = self.client.embeddings.create(input=texts, model=model)
+            return self._to_batch_result(
+                texts, model, response, time.time() - start_time
+            )
 
-            processing_time = time.time() - start_time
-
-            embeddings = [item.embedding for item in response.data]
+        except Exception as e:
+            raise Exception(f"OpenAI batch embedding failed: {str(e)}")
 
-            # Create individual results
-            individual_results = []
-            for i, text in enumerate(texts):
-                individual_results.append(
-                    EmbeddingResult(
-                        embedding=embeddings[i],
-                        tokens_used=response.usage.total_tokens
-                        // len(texts),  # Approximate
-                        input_text=text,
-                        model=model,
-                        provider=self.name,
-                        processing_time=processing_time / len(texts),  # Approximate
-                    )
-                )
+    async def embed_batch_async(
+        self, texts: List[str], model: str = "text-embedding-3-small"
+    ) -> BatchEmbeddingResult:
+        """Generate embeddings for multiple texts with the async client"""
+        start_time = time.time()
 
-            return BatchEmbeddingResult(
-                embeddings=embeddings,
-                total_tokens=response.usage.total_tokens,
-                inputs=texts,
-                model=model,
-                provider=self.name,
-                processing_time=processing_time,
-                individual_results=individual_results,
+        try:
+            response = await self.async_client.embeddings.create(
+                input=texts, model=model
+            )
+            return self._to_batch_result(
+                texts, model, response, time.time() - start_time
             )
 
         except Exception as e:
             raise Exception(f"OpenAI batch embedding failed: {str(e)}")
 
+    def _to_batch_result(
+        self, texts: List[str], model: str, response: Any, processing_time: float
+    ) -> BatchEmbeddingResult:
+        """Convert an embeddings API response into a BatchEmbeddingResult"""
+        embeddings = [item.embedding for item in response.data]
+
+        # Create individual results
+        individual_results = []
+        for i, text in enumerate(texts):
+            individual_results.append(
+                EmbeddingResult(
+                    embedding=embeddings[i],
+                    tokens_used=response.usage.total_tokens
+                    // len(texts),  # Approximate
+                    input_text=text,
+                    model=model,
+                    provider=self.name,
+                    processing_time=processing_time / len(texts),  # Approximate
+                )
+            )
+
+        return BatchEmbeddingResult(
+            embeddings=embeddings,
+            total_tokens=response.usage.total_tokens,
+            inputs=texts,
+            model=model,
+            provider=self.name,
+            processing_time=processing_time,
+            individual_results=individual_results,
+        )
+
     def estimate_tokens(self, text: str) -> int:
         """Rough token estimation (4 chars ≈ 1 token for English)"""
         return len(text) // 4
@@ -191,6 +238,11 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
 class JinaEmbeddingProvider(EmbeddingProvider):
     """Jina embedding provider"""
 
+    # Conservative request limits for the Jina embeddings API
+    max_batch_size = 2048
+    max_batch_tokens = 64_000
+    max_concurrency = 4
+
     def __init__(self, api_key: Optional[str] = None):
         if not JINA_AVAILABLE:
             raise ImportError(
@@ -301,6 +353,11 @@ class JinaEmbeddingProvider(EmbeddingProvider):
 class LocalEmbeddingProvider(EmbeddingProvider):
     """Local sentence-transformers provider"""
 
+    # A single local model saturates the CPU/GPU, so batches run one at a time
+    max_batch_size = 256
+    max_batch_tokens = 1_000_000
+    max_concurrency = 1
+
     def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
         if not SENTENCE_TRANSFORMERS_AVAILABLE:
             raise ImportError(
@@ -403,12 +460,22 @@ class EmbeddingGenerator:
         enable_caching: bool = True,
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        cache_max_entries: int = 10_000,
+        cache_max_memory_mb: float = 64.0,
+        cache_ttl_seconds: Optional[float] = None,
+        store_path: Optional[str] = None,
     ):
         self.provider_name = provider
         self.enable_caching = enable_caching
         self.max_retries = max_retries
         self.retry_delay = retry_delay
-        self.cache: Dict[str, EmbeddingResult] = {}
+        self.cache = EmbeddingCache(
+            max_entries=cache_max_entries,
+            max_memory_bytes=int(cache_max_memory_mb * 1024 * 1024),
+            ttl_seconds=cache_ttl_seconds,
+        )
+        # Persistent content-addressed store, checked after the in-memory cache
+        self.store = EmbeddingStore(store_path) if store_path else None
 
         # Initialize provider
         if provider == "openai":
@@ -442,8 +509,17 @@ class EmbeddingGenerator:
         # Check cache
         if self.enable_caching:
             cache_key = self._get_cache_key(text, model)
-            if cache_key in self.cache:
-                return self.cache[cache_key]
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return self._cached_result(text, model, cached)
+
+        # Check persistent store
+        if self.store:
+            stored = self.store.get(self.provider_name, model, text)
+            if stored is not None:
+                if self.enable_caching:
+                    self.cache.put(cache_key, *stored)
+                return self._cached_result(text, model, stored)
 
         # Generate embedding with retries
         for attempt in range(self.max_retries):
@@ -452,7 +528,11 @@ class EmbeddingGenerator:
 
                 # Cache result
                 if self.enable_caching:
-                    self.cache[cache_key] = result
+                    self.cache.put(cache_key, result.embedding, result.tokens_used)
+                if self.store:
+                    self.store.put(
+                        self.provider_name, model, text, result.embedding, result.tokens_used
+                    )
 
                 return result
 
@@ -467,12 +547,32 @@ class EmbeddingGenerator:
                 )
                 time.sleep(wait_time)
 
+    async def embed_async(
+        self, text: str, model: Optional[str] = None
+    ) -> EmbeddingResult:
+        """
+        Generate embedding for single text without blocking the event loop
+
+        Args:
+            text: Input text to embed
+            model: Model to use (optional, uses default if not specified)
+
+        Returns:
+            EmbeddingResult with embedding and metadata
+        """
+        batch_result = await self.embed_batch_async([text], model)
+        return batch_result.individual_results[0]
+
     def embed_batch(
         self, texts: List[str], model: Optional[str] = None, batch_size: int = 100
     ) -> BatchEmbeddingResult:
         """
         Generate embeddings for multiple texts with batching
 
+        Cached texts are served from the in-memory cache or the persistent
+        store, and only the remaining unique texts are sent to the provider,
+        packed into requests that respect the provider's token limits.
+
         Args:
             texts: List of input texts
             model: Model to use (optional)
@@ -482,36 +582,236 @@ class EmbeddingGenerator:
             BatchEmbeddingResult with embeddings and metadata
         """
         model = model or self.default_model
+        start_time = time.time()
 
-        if len(texts) <= batch_size:
-            # Single batch
-            return self._embed_batch_with_retry(texts, model)
-        else:
-            # Multiple batches
-            all_embeddings = []
-            all_individual_results = []
-            total_tokens = 0
-            total_time = 0
+        results, pending = self._resolve_cached(texts, model)
+
+        # Embed misses in token-packed batches, one request at a time
+        total_tokens = 0
+        for batch in self._pack_batches(list(pending.keys()), batch_size):
+            batch_result = self._embed_batch_with_retry(batch, model)
+            total_tokens += self._record_batch(batch_result, model, pending, results)
+
+        return BatchEmbeddingResult(
+            embeddings=[result.embedding for result in results],
+            total_tokens=total_tokens,
+            inputs=texts,
+            model=model,
+            provider=self.provider_name,
+            processing_time=time.time() - start_time,
+            individual_results=results,
+        )
+
+    async def embed_batch_async(
+        self,
+        texts: List[str],
+        model: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> BatchEmbeddingResult:
+        """
+        Generate embeddings for multiple texts with concurrent batch requests
+
+        Misses are packed into batches by estimated tokens per the provider's
+        request limits and dispatched concurrently under a semaphore. Results
+        are reassembled in input order.
+
+        Args:
+            texts: List of input texts
+            model: Model to use (optional)
+            batch_size: Maximum inputs per request (defaults to the provider limit)
+            max_concurrency: Maximum requests in flight (defaults to the provider limit)
 
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i : i + batch_size]
-                batch_result = self._embed_batch_with_retry(batch, model)
+        Returns:
+            BatchEmbeddingResult with embeddings and metadata
+        """
+        model = model or self.default_model
+        start_time = time.time()
 
-                all_embeddings.extend(batch_result.embeddings)
-                all_individual_results.extend(batch_result.individual_results)
-                total_tokens += batch_result.total_tokens
-                total_time += batch_result.processing_time
+        results, pending = self._resolve_from_cache(texts, model)
 
-            return BatchEmbeddingResult(
-                embeddings=all_embeddings,
-                total_tokens=total_tokens,
-                inputs=texts,
-                model=model,
-                provider=self.provider_name,
-                processing_time=total_time,
-                individual_results=all_individual_results,
+        # SQLite reads/writes run in a thread so a large batch or a locked
+        # store file does not stall the event loop
+        if self.store and pending:
+            stored = await asyncio.to_thread(
+                self.store.get_many, self.provider_name, model, list(pending.keys())
+            )
+            self._apply_stored(stored, model, pending, results)
+
+        semaphore = asyncio.Semaphore(
+            max_concurrency or self.provider.max_concurrency
+        )
+
+        async def run_batch(batch: List[str]) -> BatchEmbeddingResult:
+            async with semaphore:
+                return await self._embed_batch_with_retry_async(batch, model)
+
+        batches = self._pack_batches(list(pending.keys()), batch_size)
+        batch_results = await asyncio.gather(*(run_batch(batch) for batch in batches))
+
+        total_tokens = 0
+        for batch_result in batch_results:
+            total_tokens += self._record_batch(
+                batch_result, model, pending, results, persist=False
             )
 
+        if self.store and batch_results:
+            await asyncio.to_thread(
+                self.store.put_many,
+                self.provider_name,
+                model,
+                [row for batch_result in batch_results for row in self._store_rows(batch_result)],
+            )
+
+        return BatchEmbeddingResult(
+            embeddings=[result.embedding for result in results],
+            total_tokens=total_tokens,
+            inputs=texts,
+            model=model,
+            provider=self.provider_name,
+            processing_time=time.time() - start_time,
+            individual_results=results,
+        )
+
+    def get_cached(
+        self, texts: List[str], model: Optional[str] = None
+    ) -> List[Optional[EmbeddingResult]]:
+        """
+        Look texts up in the in-memory cache only, without calling the provider
+
+        Misses are not counted in the cache stats, since a caller that embeds
+        them next looks them up again.
+
+        Args:
+            texts: List of input texts
+            model: Model to use (optional, uses default if not specified)
+
+        Returns:
+            EmbeddingResult for each cached text, None for the others
+        """
+        model = model or self.default_model
+        if not self.enable_caching:
+            return [None] * len(texts)
+
+        results: List[Optional[EmbeddingResult]] = []
+        for text in texts:
+            cached = self.cache.get(self._get_cache_key(text, model), count_miss=False)
+            results.append(self._cached_result(text, model, cached) if cached else None)
+        return results
+
+    def _resolve_cached(
+        self, texts: List[str], model: str
+    ) -> Tuple[List[Optional[EmbeddingResult]], Dict[str, List[int]]]:
+        """
+        Serve texts from the in-memory cache and persistent store
+
+        Returns:
+            (results with hits filled in, unique missing text -> input positions)
+        """
+        results, pending = self._resolve_from_cache(texts, model)
+
+        # Resolve remaining texts from the persistent store
+        if self.store and pending:
+            stored = self.store.get_many(self.provider_name, model, list(pending.keys()))
+            self._apply_stored(stored, model, pending, results)
+
+        return results, pending
+
+    def _resolve_from_cache(
+        self, texts: List[str], model: str
+    ) -> Tuple[List[Optional[EmbeddingResult]], Dict[str, List[int]]]:
+        """In-memory cache part of _resolve_cached"""
+        results: List[Optional[EmbeddingResult]] = [None] * len(texts)
+
+        # Resolve cache hits and collect unique misses (text -> positions)
+        pending: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if self.enable_caching:
+                cached = self.cache.get(self._get_cache_key(text, model))
+                if cached is not None:
+                    results[i] = self._cached_result(text, model, cached)
+                    continue
+            pending.setdefault(text, []).append(i)
+
+        return results, pending
+
+    def _apply_stored(
+        self,
+        stored: Dict[str, Tuple[List[float], int]],
+        model: str,
+        pending: Dict[str, List[int]],
+        results: List[Optional[EmbeddingResult]],
+    ) -> None:
+        """Place persistent store hits at their input positions and warm the cache"""
+        for text, hit in stored.items():
+            if self.enable_caching:
+                self.cache.put(self._get_cache_key(text, model), *hit)
+            for position in pending.pop(text):
+                results[position] = self._cached_result(text, model, hit)
+
+    def _record_batch(
+        self,
+        batch_result: BatchEmbeddingResult,
+        model: str,
+        pending: Dict[str, List[int]],
+        results: List[Optional[EmbeddingResult]],
+        persist: bool = True,
+    ) -> int:
+        """
+        Cache a provider batch result and place it at its input positions
+
+        persist=False skips the persistent store write (the async path does it
+        off the event loop)
+        """
+        for text, result in zip(batch_result.inputs, batch_result.individual_results):
+            if self.enable_caching:
+                self.cache.put(
+                    self._get_cache_key(text, model),
+                    result.embedding,
+                    result.tokens_used,
+                )
+            for position in pending[text]:
+                results[position] = result
+
+        if self.store and persist:
+            self.store.put_many(self.provider_name, model, self._store_rows(batch_result))
+
+        return batch_result.total_tokens
+
+    @staticmethod
+    def _store_rows(batch_result: BatchEmbeddingResult) -> List[Tuple[str, List[float], int]]:
+        """(text, embedding, tokens) rows of a batch result for EmbeddingStore.put_many"""
+        return [
+            (text, result.embedding, result.tokens_used)
+            for text, result in zip(batch_result.inputs, batch_result.individual_results)
+        ]
+
+    def _pack_batches(
+        self, texts: List[str], batch_size: Optional[int] = None
+    ) -> List[List[str]]:
+        """Pack texts into batches within the provider's input and token limits"""
+        max_size = min(batch_size or self.provider.max_batch_size, self.provider.max_batch_size)
+        max_tokens = self.provider.max_batch_tokens
+
+        batches = []
+        current: List[str] = []
+        current_tokens = 0
+        for text in texts:
+            tokens = self.estimate_tokens(text)
+            if current and (
+                len(current) >= max_size or current_tokens + tokens > max_tokens
+            ):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(text)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+
+        return batches
+
     def _embed_batch_with_retry(
         self, texts: List[str], model: str
     ) -> BatchEmbeddingResult:
@@ -531,6 +831,39 @@ class EmbeddingGenerator:
                 )
                 time.sleep(wait_time)
 
+    async def _embed_batch_with_retry_async(
+        self, texts: List[str], model: str
+    ) -> BatchEmbeddingResult:
+        """Generate batch embeddings with retry logic, without blocking the event loop"""
+        for attempt in range(self.max_retries):
+            try:
+                return await self.provider.embed_batch_async(texts, model)
+
+            except Exception as e:
+                if attempt == self.max_retries - 1:
+                    raise e
+
+                # Exponential backoff
+                wait_time = self.retry_delay * (2**attempt)
+                logging.warning(
+                    f"Batch embedding attempt {attempt + 1} failed, retrying in {wait_time}s: {str(e)}"
+                )
+                await asyncio.sleep(wait_time)
+
+    def _cached_result(
+        self, text: str, model: str, cached: Tuple[List[float], int]
+    ) -> EmbeddingResult:
+        """Build an EmbeddingResult for a cache hit (no tokens were spent)"""
+        embedding, _ = cached
+        return EmbeddingResult(
+            embedding=embedding,
+            tokens_used=0,
+            input_text=text,
+            model=model,
+            provider=self.provider_name,
+            processing_time=0.0,
+        )
+
     def _get_cache_key(self, text: str, model: str) -> str:
         """Generate cache key for text and model"""
         content = f"{text}_{model}_{self.provider_name}"
@@ -572,3 +905,10 @@ class EmbeddingGenerator:
             "caching_enabled": self.enable_caching,
             "max_retries": self.max_retries,
         }
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters and memory usage of the embedding cache"""
+        stats = {"caching_enabled": self.enable_caching, **self.cache.get_stats()}
+        if self.store:
+            stats["persistent_store"] = self.store.get_stats()
+        return stats
@@ -0,0 +1,190 @@
+"""
+Persistent content-addressed embedding store
+
+SQLite-backed cache of embeddings keyed by (provider, model, sha256(text)) so
+re-ingesting a document only pays for chunks whose text actually changed.
+Vectors are stored as raw float32 blobs.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any, Union
+
+
+class EmbeddingStore:
+    """
+    On-disk embedding cache shared across runs and processes
+
+    Usage:
+        store = EmbeddingStore(".cache/embeddings.sqlite3")
+        found = store.get_many("openai", "text-embedding-3-small", texts)
+        store.put_many("openai", "text-embedding-3-small", [(text, embedding, tokens)])
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS embeddings (
+            provider TEXT NOT NULL,
+            model TEXT NOT NULL,
+            text_hash TEXT NOT NULL,
+            dimensions INTEGER NOT NULL,
+            embedding BLOB NOT NULL,
+            tokens_used INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (provider, model, text_hash)
+        ) WITHOUT ROWID
+    """
+
+    # SQLite limits the number of bound parameters per statement
+    LOOKUP_BATCH_SIZE = 500
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open (or create) an embedding store
+
+        Args:
+            path: SQLite database file path (parent directories are created)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        # WAL lets concurrent ingestion processes read while one writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(self.SCHEMA)
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """Content address of a text"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(
+        self, provider: str, model: str, text: str
+    ) -> Optional[Tuple[List[float], int]]:
+        """Look up a single embedding, returns (embedding, tokens_used) or None"""
+        return self.get_many(provider, model, [text]).get(text)
+
+    def get_many(
+        self, provider: str, model: str, texts: List[str]
+    ) -> Dict[str, Tuple[List[float], int]]:
+        """
+        Look up embeddings for many texts
+
+        Returns:
+            Dict mapping each found text to (embedding, tokens_used)
+        """
+        hashes: Dict[str, List[str]] = {}
+        for text in texts:
+            hashes.setdefault(self.hash_text(text), []).append(text)
+
+        found: Dict[str, Tuple[List[float], int]] = {}
+        hash_list = list(hashes.keys())
+
+        with self._lock:
+            for i in range(0, len(hash_list), self.LOOKUP_BATCH_SIZE):
+                batch = hash_list[i : i + self.LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"""
+                    SELECT text_hash, embedding, tokens_used
+                    FROM embeddings
+                    WHERE provider = ? AND model = ? AND text_hash IN ({placeholders})
+                    """,
+                    (provider, model, *batch),
+                ).fetchall()
+
+                for text_hash, blob, tokens_used in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    embedding = vector.tolist()
+                    for text in hashes[text_hash]:
+                        found[text] = (embedding, tokens_used)
+
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+
+        return found
+
+    def put(
+        self,
+        provider: str,
+        model: str,
+        text: str,
+        embedding: List[float],
+        tokens_used: int = 0,
+    ) -> None:
+        """Store a single embedding"""
+        self.put_many(provider, model, [(text, embedding, tokens_used)])
+
+    def put_many(
+        self,
+        provider: str,
+        model: str,
+        items: List[Tuple[str, List[float], int]],
+    ) -> None:
+        """
+        Store embeddings for many texts
+
+        Args:
+            items: List of (text, embedding, tokens_used)
+        """
+        if not items:
+            return
+
+        now = time.time()
+        rows = [
+            (
+                provider,
+                model,
+                self.hash_text(text),
+                len(embedding),
+                array("f", embedding).tobytes(),
+                tokens_used,
+                now,
+            )
+            for text, embedding, tokens_used in items
+        ]
+
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT OR REPLACE INTO embeddings
+                (provider, model, text_hash, dimensions, embedding, tokens_used, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            self._conn.commit()
+            self.writes += len(rows)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lookup counters and the number of stored embeddings"""
+        with self._lock:
+            stored = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+        total = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "stored_embeddings": stored,
+            "size_bytes": os.path.getsize(self.path) if self.path.exists() else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": self.hits / total if total > 0 else 0.0,
+        }
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection"""
+        with self._lock:
+            self._conn.close()
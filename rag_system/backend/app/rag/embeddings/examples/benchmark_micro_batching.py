@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Query Embedding Micro-Batching Benchmark
+
+Fires one query embedding per simulated client, all at once, and compares:
+1. Direct  - every client calls embed_async (one provider request each)
+2. Batched - clients go through EmbeddingMicroBatcher, which coalesces
+             them into batches of up to --batch-size texts
+
+Reports throughput (queries/s), p50/p95 latency per client and the number
+of provider requests. Every query text is unique, so the embedding cache
+never answers and each run measures the provider.
+
+Usage:
+  # Local sentence-transformers model, 50 and 200 concurrent clients
+  python benchmark_micro_batching.py --provider local --clients 50 200
+
+  # OpenAI, compare max waits
+  python benchmark_micro_batching.py --provider openai --max-wait-ms 5 10 25
+"""
+
+import os
+import sys
+import time
+import uuid
+import argparse
+import asyncio
+import statistics
+from typing import List, Dict, Any
+import dotenv
+
+dotenv.load_dotenv(".env.dev")
+
+# Add the backend directory to Python path so we can import from app
+# Find the backend directory by looking for the directory containing 'app'
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = script_dir
+while backend_dir != "/" and not os.path.exists(os.path.join(backend_dir, "app")):
+    backend_dir = os.path.dirname(backend_dir)
+
+if os.path.exists(os.path.join(backend_dir, "app")):
+    sys.path.insert(0, backend_dir)
+else:
+    raise ImportError("Could not find backend directory containing 'app' module")
+
+from app.rag.embeddings.embedding_generator import EmbeddingGenerator
+from app.rag.embeddings.embedding_batcher import EmbeddingMicroBatcher
+
+QUERY_TEMPLATES = [
+    "What was total revenue in {}?",
+    "How did operating margin change during {}?",
+    "Which risks were reported for {}?",
+    "Summarize the guidance given for {}",
+]
+
+
+def percentile(values: List[float], pct: int) -> float:
+    """Percentile of latencies in milliseconds"""
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100)[pct - 1] * 1000
+
+
+def unique_queries(count: int) -> List[str]:
+    """Query-like texts that never hit the embedding cache"""
+    run_id = uuid.uuid4().hex[:8]
+    return [
+        QUERY_TEMPLATES[i % len(QUERY_TEMPLATES)].format(f"period {run_id}-{i}")
+        for i in range(count)
+    ]
+
+
+async def run_clients(embed, queries: List[str]) -> Dict[str, Any]:
+    """All clients start together; each records its own latency"""
+    latencies: List[float] = []
+
+    async def client(text: str) -> None:
+        start = time.perf_counter()
+        await embed(text)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(text) for text in queries))
+    wall_time = time.perf_counter() - start
+    return {"latencies": latencies, "throughput": len(queries) / wall_time}
+
+
+def print_row(label: str, run_result: Dict[str, Any], requests: int) -> None:
+    print(
+        f"   {label:<16} {run_result['throughput']:8.1f} q/s | "
+        f"p50: {percentile(run_result['latencies'], 50):8.2f}ms | "
+        f"p95: {percentile(run_result['latencies'], 95):8.2f}ms | "
+        f"requests: {requests}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark direct vs micro-batched query embeddings under concurrency",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--provider", default="local", choices=["openai", "jina", "local"], help="Embedding provider"
+    )
+    parser.add_argument("--model", default=None, help="Model (defaults to the provider's)")
+    parser.add_argument(
+        "--clients", type=int, nargs="+", default=[50, 200], help="Concurrent client counts"
+    )
+    parser.add_argument(
+        "--max-wait-ms", type=float, nargs="+", default=[10.0], help="Batcher max waits"
+    )
+    parser.add_argument("--batch-size", type=int, default=32, help="Batcher max batch size")
+    args = parser.parse_args()
+
+    print("🚀 QUERY EMBEDDING MICRO-BATCHING BENCHMARK")
+    print("=" * 60)
+
+    api_key = None
+    if args.provider == "openai":
+        api_key = os.getenv("OPENAI_API_KEY")
+    elif args.provider == "jina":
+        api_key = os.getenv("JINA_API_KEY")
+    generator = EmbeddingGenerator(provider=args.provider, api_key=api_key, model=args.model)
+    print(f"🏷️  {args.provider} / {generator.default_model}")
+
+    # Warm up the model / HTTP client so the first run is not penalised
+    await generator.embed_async(unique_queries(1)[0])
+
+    for clients in args.clients:
+        print(f"\n📊 {clients} concurrent clients")
+
+        direct = await run_clients(generator.embed_async, unique_queries(clients))
+        print_row("direct", direct, clients)
+
+        for max_wait_ms in args.max_wait_ms:
+            batcher = EmbeddingMicroBatcher(
+                generator, max_batch_size=args.batch_size, max_wait_ms=max_wait_ms
+            )
+            batched = await run_clients(batcher.embed, unique_queries(clients))
+            await batcher.close()
+            stats = batcher.get_stats()
+            print_row(f"batched {max_wait_ms:g}ms", batched, stats["batches"])
+            print(
+                f"   {'':<16} avg batch: {stats['average_batch_size']:.1f} | "
+                f"full batches: {stats['full_batches']}/{stats['batches']} | "
+                f"speedup: {batched['throughput'] / direct['throughput']:.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Reranker Latency / Quality Comparison
+
+Runs every query of a small labelled dataset through each reranker and
+reports quality (nDCG@k, MRR) and latency (p50/p95):
+1. No reranking (retrieval order, shuffled deterministically)
+2. LocalCrossEncoderReranker (torch)
+3. LocalCrossEncoderReranker (ONNX int8, with --onnx-file)
+4. VoyageReranker (only with --voyage; the one network-bound option)
+
+Runs offline once the cross-encoder is in the Hugging Face cache (set
+HF_HUB_OFFLINE=1 to make sure nothing is downloaded).
+
+Dataset format (JSONL, one query per line):
+  {"query": "...", "passages": [{"content": "...", "relevant": 1}, ...]}
+
+Usage:
+  # Built-in dataset, torch cross-encoder
+  python compare_rerankers.py
+
+  # Own dataset, ONNX int8 model as well, Voyage for reference
+  python compare_rerankers.py --dataset labelled.jsonl --onnx-file onnx/model_qint8_avx512_vnni.onnx --voyage
+"""
+
+import os
+import sys
+import json
+import math
+import random
+import argparse
+import asyncio
+import statistics
+import dotenv
+from typing import List, Dict, Any
+
+# Load environment variables
+dotenv.load_dotenv(".env.dev")
+
+# Add the backend directory to Python path so we can import from app
+# Find the backend directory by looking for the directory containing 'app'
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = script_dir
+while backend_dir != "/" and not os.path.exists(os.path.join(backend_dir, "app")):
+    backend_dir = os.path.dirname(backend_dir)
+
+if os.path.exists(os.path.join(backend_dir, "app")):
+    sys.path.insert(0, backend_dir)
+else:
+    raise ImportError("Could not find backend directory containing 'app' module")
+
+from app.rag.reranking.local_reranker import LocalCrossEncoderReranker
+
+
+# Built-in labelled queries (relevant = 1 for passages that answer the query)
+BUILTIN_DATASET = [
+    {
+        "query": "What are transformers in machine learning?",
+        "passages": [
+            {"content": "Transformers are a neural network architecture built on self-attention, processing all tokens of a sequence in parallel.", "relevant": 1},
+            {"content": "The transformer architecture was introduced in the paper 'Attention is All You Need' in 2017.", "relevant": 1},
+            {"content": "A power transformer changes the voltage of alternating current between circuits.", "relevant": 0},
+            {"content": "The weather today is sunny with a chance of rain in the afternoon.", "relevant": 0},
+            {"content": "Gradient boosting builds an ensemble of shallow decision trees sequentially.", "relevant": 0},
+            {"content": "Recurrent neural networks process sequences one step at a time with a hidden state.", "relevant": 0},
+        ],
+    },
+    {
+        "query": "How did operating margin change this quarter?",
+        "passages": [
+            {"content": "Operating margin expanded to 18.2% from 16.5% a year earlier, driven by lower fulfillment costs.", "relevant": 1},
+            {"content": "Operating income grew faster than revenue, lifting operating margin by 170 basis points.", "relevant": 1},
+            {"content": "The company repurchased 2.1 million shares during the quarter.", "relevant": 0},
+            {"content": "Headcount increased by 4% year over year, mainly in engineering.", "relevant": 0},
+            {"content": "The board declared a quarterly dividend of $0.25 per share.", "relevant": 0},
+            {"content": "Margin of error in the customer survey was plus or minus three percent.", "relevant": 0},
+        ],
+    },
+    {
+        "query": "What is the dividend policy?",
+        "passages": [
+            {"content": "The board declared a quarterly dividend of $0.25 per share, payable to shareholders of record on March 1.", "relevant": 1},
+            {"content": "We intend to return roughly half of free cash flow to shareholders through dividends and buybacks.", "relevant": 1},
+            {"content": "Revenue from cloud services rose 28% to $4.1 billion.", "relevant": 0},
+            {"content": "Capital expenditures were $600 million, focused on data center capacity.", "relevant": 0},
+            {"content": "Customer retention remained above 95% across enterprise accounts.", "relevant": 0},
+            {"content": "Liquidity consisted of $3.2 billion in cash and an undrawn revolving credit facility.", "relevant": 0},
+        ],
+    },
+    {
+        "query": "How do HNSW indexes trade recall for speed?",
+        "passages": [
+            {"content": "HNSW search explores ef_search candidates per layer; larger values raise recall at the cost of latency.", "relevant": 1},
+            {"content": "Raising m and ef_construction builds a denser graph with better recall but a slower, larger index build.", "relevant": 1},
+            {"content": "B-tree indexes keep keys sorted and support range scans.", "relevant": 0},
+            {"content": "Full-text search ranks documents by term frequency and document length.", "relevant": 0},
+            {"content": "Vacuum reclaims storage occupied by dead tuples.", "relevant": 0},
+            {"content": "Connection pools reuse database sessions across requests.", "relevant": 0},
+        ],
+    },
+    {
+        "query": "Which regions drove revenue growth?",
+        "passages": [
+            {"content": "Growth was led by Asia Pacific, up 34%, followed by Europe at 19%.", "relevant": 1},
+            {"content": "North America grew 6%, slowing as enterprise customers delayed renewals.", "relevant": 1},
+            {"content": "Adjusted earnings per share were $1.42, ahead of guidance.", "relevant": 0},
+            {"content": "Currency headwinds reduced reported revenue by 2 percentage points.", "relevant": 0},
+            {"content": "The company opened a new office in Lisbon to support hiring.", "relevant": 0},
+            {"content": "Gross margin was flat at 62% as hardware mix offset pricing gains.", "relevant": 0},
+        ],
+    },
+]
+
+
+def load_dataset(path: str) -> List[Dict[str, Any]]:
+    if not path:
+        return BUILTIN_DATASET
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def ndcg_at_k(relevances: List[int], k: int) -> float:
+    """nDCG@k of a ranked list of relevance labels"""
+    def dcg(values: List[int]) -> float:
+        return sum(rel / math.log2(rank + 2) for rank, rel in enumerate(values[:k]))
+
+    ideal = dcg(sorted(relevances, reverse=True))
+    return dcg(relevances) / ideal if ideal > 0 else 0.0
+
+
+def reciprocal_rank(relevances: List[int]) -> float:
+    for rank, rel in enumerate(relevances, 1):
+        if rel > 0:
+            return 1.0 / rank
+    return 0.0
+
+
+def percentile(values: List[float], pct: int) -> float:
+    """Percentile of latencies in milliseconds"""
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100)[pct - 1] * 1000
+
+
+async def evaluate(reranker, dataset: List[Dict[str, Any]], k: int, repeats: int) -> Dict[str, float]:
+    """Average quality over queries; latency over every rerank call"""
+    ndcgs, rrs, latencies = [], [], []
+    for example in dataset:
+        chunks = [
+            {"chunk_id": i, "content": passage["content"], "relevant": passage["relevant"]}
+            for i, passage in enumerate(example["passages"])
+        ]
+
+        if reranker is None:
+            ranked = chunks
+            latencies.append(0.0)
+        else:
+            for _ in range(repeats):
+                result = await reranker.rerank(query=example["query"], chunks=chunks)
+                latencies.append(result.rerank_time)
+            ranked = result.reranked_chunks
+
+        relevances = [chunk["relevant"] for chunk in ranked]
+        ndcgs.append(ndcg_at_k(relevances, k))
+        rrs.append(reciprocal_rank(relevances))
+
+    return {
+        "ndcg": sum(ndcgs) / len(ndcgs),
+        "mrr": sum(rrs) / len(rrs),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Compare reranker quality and latency on a labelled dataset",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--dataset", default=None, help="Labelled JSONL dataset (default: built-in)")
+    parser.add_argument("--k", type=int, default=3, help="Cutoff for nDCG@k")
+    parser.add_argument("--repeats", type=int, default=5, help="Rerank calls per query (latency)")
+    parser.add_argument(
+        "--model", default="cross-encoder/ms-marco-MiniLM-L6-v2", help="Cross-encoder model"
+    )
+    parser.add_argument("--onnx-file", default=None, help="Also run this ONNX (e.g. int8) file")
+    parser.add_argument("--voyage", action="store_true", help="Also run VoyageReranker (network)")
+    args = parser.parse_args()
+
+    dataset = load_dataset(args.dataset)
+    # Retrieval order is simulated by a deterministic shuffle
+    rng = random.Random(7)
+    for example in dataset:
+        rng.shuffle(example["passages"])
+
+    rerankers = {"no rerank": None}
+    rerankers["local torch"] = LocalCrossEncoderReranker(model=args.model)
+    if args.onnx_file:
+        rerankers["local onnx"] = LocalCrossEncoderReranker(
+            model=args.model, backend="onnx", onnx_file_name=args.onnx_file
+        )
+    if args.voyage:
+        from app.rag.reranking.voyage_reranker import VoyageReranker
+
+        rerankers["voyage"] = VoyageReranker()
+
+    print("🚀 RERANKER COMPARISON")
+    print("=" * 60)
+    print(f"📝 {len(dataset)} queries | nDCG@{args.k} | {args.repeats} calls per query\n")
+
+    for label, reranker in rerankers.items():
+        # Warm-up call so model loading / first-call overhead is not measured
+        if reranker is not None:
+            await reranker.rerank(query="warm up", chunks=[{"content": "warm up"}])
+        metrics = await evaluate(reranker, dataset, args.k, args.repeats)
+        print(
+            f"   {label:<12} nDCG@{args.k}: {metrics['ndcg']:.3f} | MRR: {metrics['mrr']:.3f} | "
+            f"p50: {metrics['p50']:8.2f}ms | p95: {metrics['p95']:8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
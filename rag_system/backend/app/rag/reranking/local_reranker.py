@@ -0,0 +1,148 @@
+"""
+Local Cross-Encoder Reranker
+
+This module provides reranking with a small sentence-transformers cross-encoder
+running on the local CPU, as a drop-in alternative to VoyageReranker that has
+no network round trip and no external API to fail.
+"""
+
+import time
+import asyncio
+from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from app.rag.reranking.voyage_reranker import RerankResult
+
+# Optional import - the reranker is unavailable without sentence-transformers
+try:
+    from sentence_transformers import CrossEncoder
+
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+
+class LocalCrossEncoderReranker:
+    """
+    Local cross-encoder reranker with the same interface as VoyageReranker
+
+    Scores (query, chunk) pairs in batches with a sentence-transformers
+    CrossEncoder. Inference runs on a dedicated worker thread so the event
+    loop keeps serving other requests while chunks are scored.
+
+    ONNX int8 example (needs sentence-transformers[onnx]):
+        LocalCrossEncoderReranker(
+            backend="onnx", onnx_file_name="onnx/model_qint8_avx512_vnni.onnx"
+        )
+    """
+
+    def __init__(
+        self,
+        model: str = "cross-encoder/ms-marco-MiniLM-L6-v2",
+        batch_size: int = 32,
+        max_length: int = 512,
+        backend: str = "torch",
+        onnx_file_name: Optional[str] = None,
+        device: Optional[str] = "cpu",
+    ):
+        """
+        Initialize local cross-encoder reranker
+
+        Args:
+            model: Hugging Face cross-encoder model name or local path
+            batch_size: (query, chunk) pairs scored per forward pass
+            max_length: Token limit per pair (longer chunks are truncated)
+            backend: "torch" or "onnx"
+            onnx_file_name: ONNX file inside the model repo, e.g. a quantized int8
+                export (None = default model.onnx)
+            device: Inference device (None = let sentence-transformers choose)
+        """
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            raise ImportError(
+                "sentence-transformers not installed. Run: pip install sentence-transformers"
+            )
+
+        self.model = model
+        self.batch_size = batch_size
+
+        model_kwargs = {"file_name": onnx_file_name} if onnx_file_name else None
+        self.cross_encoder = CrossEncoder(
+            model,
+            max_length=max_length,
+            device=device,
+            backend=backend,
+            model_kwargs=model_kwargs,
+        )
+
+        # One model saturates the CPU, so pairs are scored one batch set at a time
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+
+    def score(self, query: str, documents: List[str]) -> List[float]:
+        """Relevance score per document (blocking)"""
+        scores = self.cross_encoder.predict(
+            [(query, document) for document in documents],
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+        )
+        return [float(score) for score in scores]
+
+    async def rerank(
+        self,
+        query: str,
+        chunks: List[Dict[str, Any]],
+        top_k: Optional[int] = None,
+    ) -> RerankResult:
+        """
+        Rerank chunks based on relevance to query
+
+        Args:
+            query: Search query string
+            chunks: List of chunk dictionaries with 'content' field
+            top_k: Number of top results to return (None = return all)
+
+        Returns:
+            RerankResult with reranked chunks and metadata
+        """
+        if not chunks:
+            return RerankResult(
+                reranked_chunks=[],
+                original_count=0,
+                reranked_count=0,
+                rerank_time=0.0,
+                model=self.model,
+            )
+
+        start_time = time.time()
+
+        # Extract document texts for reranking
+        documents = [chunk.get("content", "") for chunk in chunks]
+
+        try:
+            loop = asyncio.get_running_loop()
+            scores = await loop.run_in_executor(self._executor, self.score, query, documents)
+        except Exception as e:
+            raise RuntimeError(f"Local cross-encoder rerank failed: {e}")
+
+        rerank_time = time.time() - start_time
+
+        # Highest score first; stable, so ties keep the retrieval order
+        order = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)
+        if top_k is not None:
+            order = order[:top_k]
+
+        reranked_chunks = [
+            {
+                **chunks[index],
+                "rerank_score": scores[index],
+                "rerank_index": index,  # Original position
+            }
+            for index in order
+        ]
+
+        return RerankResult(
+            reranked_chunks=reranked_chunks,
+            original_count=len(chunks),
+            reranked_count=len(reranked_chunks),
+            rerank_time=rerank_time,
+            model=self.model,
+        )
@@ -0,0 +1,338 @@
+"""
+Rerank result cache
+
+Caches reranker output keyed by the normalized query text, the reranker model,
+top_k and the ordered list of chunk ids, so a repeated question over the same
+retrieved chunks skips the rerank call:
+- In-process LRU with TTL (default) or Redis (shared by all API workers)
+- Entries referencing a chunk are invalidated when the chunk's content changes
+  or it is deleted (NOTIFY from the V6 triggers, see CachedReranker.listen_for_changes);
+  rankings computed across an invalidation are not stored
+- Hit / miss counters reported on every RerankResult
+"""
+
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import unicodedata
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from app.db.connection import DatabaseService
+from app.rag.embeddings.embedding_cache import CacheStats
+from app.rag.reranking.voyage_reranker import RerankResult
+
+# Optional import - the Redis backend is unavailable without redis
+try:
+    import redis.asyncio as redis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Channel used by the notify_document_chunks_changed trigger (V6 migration)
+CHUNK_CHANGES_CHANNEL = "document_chunks_changed"
+
+# Cached ranking: (position in the input chunk list, rerank score), best first
+Ranking = List[Tuple[int, float]]
+
+
+def normalize_query(query: str) -> str:
+    """Case, Unicode form and whitespace insensitive query text"""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+class InMemoryRerankCache:
+    """
+    LRU cache of rankings with TTL and a chunk id -> keys index for invalidation
+
+    Used from the event loop only, so no locking is needed.
+    """
+
+    def __init__(self, max_entries: int = 1_000, ttl_seconds: Optional[float] = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (ranking, chunk ids, expires_at)
+        self._entries: "OrderedDict[str, Tuple[Ranking, List[int], Optional[float]]]" = (
+            OrderedDict()
+        )
+        self._keys_by_chunk: Dict[int, Set[str]] = {}
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> Optional[Ranking]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        ranking, _, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(key)
+            self.stats.expirations += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return ranking
+
+    async def put(self, key: str, ranking: Ranking, chunk_ids: List[int]) -> None:
+        expires_at = (
+            time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+        )
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (ranking, chunk_ids, expires_at)
+        for chunk_id in chunk_ids:
+            self._keys_by_chunk.setdefault(chunk_id, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    async def invalidate_chunks(self, chunk_ids: List[int]) -> int:
+        """Drop every entry referencing one of the chunks. Returns entries removed."""
+        keys = set()
+        for chunk_id in chunk_ids:
+            keys |= self._keys_by_chunk.get(chunk_id, set())
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_chunk.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        _, chunk_ids, _ = self._entries.pop(key)
+        for chunk_id in chunk_ids:
+            keys = self._keys_by_chunk.get(chunk_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_chunk[chunk_id]
+
+
+class RedisRerankCache:
+    """
+    Redis backed ranking cache shared by several API processes
+
+    Entries expire with the TTL; LRU eviction is left to Redis
+    (maxmemory-policy allkeys-lru). A set per chunk records the keys that
+    reference it, so invalidation works across processes.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl_seconds: Optional[float] = 3600,
+        prefix: str = "rerank",
+    ):
+        if not REDIS_AVAILABLE:
+            raise ImportError("redis not installed. Run: pip install redis")
+
+        self.client = redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.stats = CacheStats()
+
+    def _result_key(self, key: str) -> str:
+        return f"{self.prefix}:result:{key}"
+
+    def _chunk_key(self, chunk_id: int) -> str:
+        return f"{self.prefix}:chunk:{chunk_id}"
+
+    async def get(self, key: str) -> Optional[Ranking]:
+        value = await self.client.get(self._result_key(key))
+        if value is None:
+            return None
+        return [tuple(item) for item in json.loads(value)]
+
+    async def put(self, key: str, ranking: Ranking, chunk_ids: List[int]) -> None:
+        ttl = int(self.ttl_seconds) if self.ttl_seconds is not None else None
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(self._result_key(key), json.dumps(ranking), ex=ttl)
+            for chunk_id in chunk_ids:
+                pipe.sadd(self._chunk_key(chunk_id), key)
+                if ttl is not None:
+                    pipe.expire(self._chunk_key(chunk_id), ttl)
+            await pipe.execute()
+
+    async def invalidate_chunks(self, chunk_ids: List[int]) -> int:
+        """Drop every entry referencing one of the chunks. Returns entries removed."""
+        if not chunk_ids:
+            return 0
+        chunk_keys = [self._chunk_key(chunk_id) for chunk_id in chunk_ids]
+        keys = set()
+        for members in await asyncio.gather(*(self.client.smembers(k) for k in chunk_keys)):
+            keys |= {member.decode() for member in members}
+
+        result_keys = [self._result_key(key) for key in keys]
+        removed = await self.client.delete(*result_keys) if result_keys else 0
+        await self.client.delete(*chunk_keys)
+        return removed
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=f"{self.prefix}:*"):
+            await self.client.delete(key)
+
+
+class CachedReranker:
+    """
+    Cache layer with the same rerank() interface as the wrapped reranker
+
+    Usage:
+        reranker = CachedReranker(VoyageReranker(), ttl_seconds=3600)
+        listener = asyncio.create_task(reranker.listen_for_changes(db_service))
+        result = await reranker.rerank(query, chunks, top_k=5)
+        print(result.cache_hit, result.cache_hit_rate)
+    """
+
+    def __init__(
+        self,
+        reranker,
+        max_entries: int = 1_000,
+        ttl_seconds: Optional[float] = 3600,
+        redis_url: Optional[str] = None,
+    ):
+        """
+        Initialize cached reranker
+
+        Args:
+            reranker: VoyageReranker, LocalCrossEncoderReranker or compatible reranker
+            max_entries: Maximum cached rankings (in-process backend)
+            ttl_seconds: Time-to-live for cached rankings (None = never expire)
+            redis_url: Use a Redis backend at this URL instead of the in-process cache
+        """
+        self.reranker = reranker
+        self.model = reranker.model
+        if redis_url:
+            self.cache = RedisRerankCache(redis_url, ttl_seconds=ttl_seconds)
+        else:
+            self.cache = InMemoryRerankCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        # Bumped by every invalidation; a miss captures it before calling the
+        # reranker and skips put() if it changed while the rerank was in flight
+        self.generation = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.cache.stats
+
+    def cache_key(self, query: str, chunk_ids: List[Any], top_k: Optional[int]) -> str:
+        """Key of a (query, ordered chunk ids) pair for this model and top_k"""
+        raw = json.dumps([self.model, top_k, normalize_query(query), chunk_ids])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def rerank(
+        self,
+        query: str,
+        chunks: List[Dict[str, Any]],
+        top_k: Optional[int] = None,
+    ) -> RerankResult:
+        """
+        Rerank chunks, reusing a cached ranking for the same query and chunk ids
+
+        Chunks without a chunk_id are never cached.
+        """
+        chunk_ids = [chunk.get("chunk_id") for chunk in chunks]
+        if not chunks or None in chunk_ids:
+            return await self.reranker.rerank(query=query, chunks=chunks, top_k=top_k)
+
+        start_time = time.time()
+        key = self.cache_key(query, chunk_ids, top_k)
+        generation = self.generation
+
+        try:
+            ranking = await self.cache.get(key)
+        except Exception as e:
+            # A cache outage must not fail retrieval
+            logger.warning(f"Rerank cache lookup failed: {e}")
+            ranking = None
+
+        if ranking is not None:
+            self.stats.hits += 1
+            reranked_chunks = [
+                {**chunks[index], "rerank_score": score, "rerank_index": index}
+                for index, score in ranking
+            ]
+            return RerankResult(
+                reranked_chunks=reranked_chunks,
+                original_count=len(chunks),
+                reranked_count=len(reranked_chunks),
+                rerank_time=time.time() - start_time,
+                model=self.model,
+                cache_hit=True,
+                cache_hit_rate=self.stats.hit_rate,
+            )
+
+        self.stats.misses += 1
+        result = await self.reranker.rerank(query=query, chunks=chunks, top_k=top_k)
+
+        ranking = [
+            (chunk["rerank_index"], chunk["rerank_score"]) for chunk in result.reranked_chunks
+        ]
+        if generation == self.generation:
+            try:
+                await self.cache.put(key, ranking, chunk_ids)
+            except Exception as e:
+                logger.warning(f"Rerank cache store failed: {e}")
+
+        result.cache_hit = False
+        result.cache_hit_rate = self.stats.hit_rate
+        return result
+
+    async def invalidate_chunks(self, chunk_ids: List[int]) -> int:
+        """Drop cached rankings referencing any of the chunks"""
+        self.generation += 1
+        return await self.cache.invalidate_chunks(chunk_ids)
+
+    async def clear(self) -> None:
+        """Drop all cached rankings"""
+        self.generation += 1
+        await self.cache.clear()
+
+    async def listen_for_changes(
+        self, db_service: DatabaseService, retry_delay: float = 5.0
+    ) -> None:
+        """
+        Invalidate entries on chunk change notifications until cancelled
+
+        Reconnects after retry_delay seconds if the listening connection drops.
+        Chunks changed while disconnected are never notified, so the cache is
+        cleared on every (re)subscribe. Run as a background task for the
+        lifetime of the app.
+        """
+        while True:
+            try:
+                async for payload in db_service.listen(
+                    CHUNK_CHANGES_CHANNEL, on_listen=self.clear
+                ):
+                    chunk_ids = [int(chunk_id) for chunk_id in payload.split(",") if chunk_id]
+                    removed = await self.invalidate_chunks(chunk_ids)
+                    if removed:
+                        logger.info(
+                            f"Invalidated {removed} cached rankings for {len(chunk_ids)} changed chunks"
+                        )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Chunk change listener failed, retrying in {retry_delay}s: {e}")
+            await asyncio.sleep(retry_delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters"""
+        return {
+            "backend": type(self.cache).__name__,
+            "entries": len(self.cache) if isinstance(self.cache, InMemoryRerankCache) else None,
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "evictions": self.stats.evictions,
+            "expirations": self.stats.expirations,
+            "hit_rate": self.stats.hit_rate,
+        }
@@ -20,6 +20,8 @@ class RerankResult:
     reranked_count: int
     rerank_time: float
     model: str
+    cache_hit: bool = False  # Set by CachedReranker
+    cache_hit_rate: Optional[float] = None  # None when no cache is used
 
 
 class VoyageReranker:
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Apply Vector Search Mode
+
+Builds the HNSW indexes a RETRIEVAL_VECTOR_SEARCH_MODE walks and drops the
+opt-in indexes of the other modes, so chunk inserts only maintain the graphs
+that are searched:
+  full       - float32 chunk and summary indexes (created by the V3 migration)
+  halfvec    - halfvec chunk index
+  binary     - binary-quantized chunk index
+  matryoshka - 256-d chunk and summary indexes
+
+Quantized modes re-score their shortlist with the float32 column, not its
+index; --drop-full-indexes also drops the float32 indexes the mode does not walk.
+Run it again with --mode full to go back (recreates the float32 indexes).
+
+Usage:
+  # Build the halfvec index, drop unused opt-in ones
+  python apply_vector_search_mode.py --mode halfvec
+
+  # Matryoshka only, without the float32 graphs
+  python apply_vector_search_mode.py --mode matryoshka --drop-full-indexes
+"""
+
+import os
+import sys
+import time
+import argparse
+import asyncio
+import dotenv
+
+# Load environment variables and override POSTGRES_HOST for Docker
+dotenv.load_dotenv(".env.dev")
+os.environ["POSTGRES_HOST"] = "localhost"
+
+# Add the backend directory to Python path so we can import from app
+# Find the backend directory by looking for the directory containing 'app'
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = script_dir
+while backend_dir != "/" and not os.path.exists(os.path.join(backend_dir, "app")):
+    backend_dir = os.path.dirname(backend_dir)
+
+if os.path.exists(os.path.join(backend_dir, "app")):
+    sys.path.insert(0, backend_dir)
+else:
+    raise ImportError("Could not find backend directory containing 'app' module")
+
+from app.db.connection import DatabaseService
+from app.db.repositories.vector_index_repository import VectorIndexRepository
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Build the HNSW indexes of a vector search mode and drop unused ones",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--mode",
+        default=os.getenv("RETRIEVAL_VECTOR_SEARCH_MODE", "full"),
+        choices=list(VectorIndexRepository.MODE_INDEXES),
+        help="Vector search mode (default: RETRIEVAL_VECTOR_SEARCH_MODE)",
+    )
+    parser.add_argument(
+        "--drop-full-indexes",
+        action="store_true",
+        help="Also drop the float32 indexes the mode does not walk",
+    )
+    parser.add_argument("--m", type=int, default=16, help="HNSW m for new indexes")
+    parser.add_argument(
+        "--ef-construction", type=int, default=64, help="HNSW ef_construction for new indexes"
+    )
+    args = parser.parse_args()
+
+    print(f"🔨 APPLY VECTOR SEARCH MODE: {args.mode}")
+    print("=" * 60)
+
+    db_service = DatabaseService()
+    await db_service.initialize()
+
+    try:
+        async with db_service.get_connection() as conn:
+            index_repo = VectorIndexRepository(conn)
+            before = await index_repo.get_index_sizes()
+
+            start = time.time()
+            changes = await index_repo.apply_vector_search_mode(
+                args.mode, args.drop_full_indexes, args.m, args.ef_construction
+            )
+            after = await index_repo.get_index_sizes()
+    finally:
+        await db_service.close()
+
+    print(f"✅ Done in {time.time() - start:.1f}s")
+    for index_name in changes["created"]:
+        print(f"   ➕ {index_name}: {after[index_name] / (1024 * 1024):.1f} MB")
+    for index_name in changes["dropped"]:
+        print(f"   ➖ {index_name}: {before[index_name] / (1024 * 1024):.1f} MB")
+    if not changes["created"] and not changes["dropped"]:
+        print("   Indexes already match the mode")
+
+    net = sum(after.values()) - sum(before.values())
+    print(f"📦 HNSW indexes: {sum(after.values()) / (1024 * 1024):.1f} MB ({net / (1024 * 1024):+.1f} MB)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
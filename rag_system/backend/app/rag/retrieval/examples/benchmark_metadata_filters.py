@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Metadata Filter Benchmark
+
+Compares two ways of restricting hierarchical retrieval to documents of a
+type / date range / tag:
+1. Pre-filter  - DocumentFilter pushed into the stage 1 SQL (V10 indexes), so
+                 stage 2 only scans chunks of matching documents
+2. Post-filter - unfiltered retrieval, non-matching chunks dropped in Python
+                 (optionally over-fetching by --oversample to make up for them)
+
+Reports p50/p95 latency, average chunks returned (post-filtering often returns
+fewer than k) and recall of the post-filtered chunks against the pre-filtered ones.
+
+Documents need type / date / tags. --assign-synthetic fills them with random
+values for documents that have no type yet (it writes to the database).
+
+Usage:
+  # Give unlabelled documents synthetic metadata, then benchmark
+  python benchmark_metadata_filters.py --assign-synthetic --queries 50
+
+  # Post-filter with 1x and 5x over-fetching
+  python benchmark_metadata_filters.py --oversample 1 5
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import asyncio
+import statistics
+import datetime
+import dotenv
+from typing import List, Dict, Any
+
+# Load environment variables and override POSTGRES_HOST for Docker
+dotenv.load_dotenv(".env.dev")
+os.environ["POSTGRES_HOST"] = "localhost"
+
+# Add the backend directory to Python path so we can import from app
+# Find the backend directory by looking for the directory containing 'app'
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = script_dir
+while backend_dir != "/" and not os.path.exists(os.path.join(backend_dir, "app")):
+    backend_dir = os.path.dirname(backend_dir)
+
+if os.path.exists(os.path.join(backend_dir, "app")):
+    sys.path.insert(0, backend_dir)
+else:
+    raise ImportError("Could not find backend directory containing 'app' module")
+
+from app.db.connection import DatabaseService
+from app.db.repositories.document_repository import DocumentRepository, DocumentFilter
+from app.rag.retrieval.hierarchical_retrieval import HierarchicalRetrieval
+
+SYNTHETIC_TYPES = ["report", "transcript", "filing", "memo", "article"]
+SYNTHETIC_TAGS = ["finance", "product", "legal", "hr", "engineering", "sales"]
+
+
+def percentile(values: List[float], pct: int) -> float:
+    """Percentile of latencies in milliseconds"""
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100)[pct - 1] * 1000
+
+
+def matches(filters: DocumentFilter, document: Dict[str, Any]) -> bool:
+    """Python equivalent of DocumentFilter.to_sql for post-filtering"""
+    if filters.types and document["type"] not in filters.types:
+        return False
+    if filters.date_from and (document["date"] is None or document["date"] < filters.date_from):
+        return False
+    if filters.date_to and (document["date"] is None or document["date"] > filters.date_to):
+        return False
+    if filters.tags and not set(filters.tags) <= set(document["tags"] or []):
+        return False
+    return True
+
+
+async def assign_synthetic_metadata(conn) -> int:
+    """Random type, date (last 3 years) and 1-2 tags for documents without a type"""
+    repo = DocumentRepository(conn)
+    async with conn.cursor() as cur:
+        await cur.execute("SELECT id FROM documents WHERE type IS NULL")
+        document_ids = [row[0] for row in await cur.fetchall()]
+
+    rng = random.Random(42)
+    today = datetime.date.today()
+    for document_id in document_ids:
+        await repo.update_document_metadata(
+            document_id,
+            document_type=rng.choice(SYNTHETIC_TYPES),
+            document_date=today - datetime.timedelta(days=rng.randrange(3 * 365)),
+            tags=rng.sample(SYNTHETIC_TAGS, rng.randint(1, 2)),
+            commit=False,
+        )
+    await conn.commit()
+    return len(document_ids)
+
+
+async def load_document_metadata(conn) -> Dict[int, Dict[str, Any]]:
+    async with conn.cursor() as cur:
+        await cur.execute("SELECT id, type, date, tags FROM documents")
+        rows = await cur.fetchall()
+    await conn.commit()
+    return {row[0]: {"type": row[1], "date": row[2], "tags": row[3]} for row in rows}
+
+
+def build_filters(metadata: Dict[int, Dict[str, Any]]) -> Dict[str, DocumentFilter]:
+    """One filter per predicate kind, using values present in the data"""
+    types = sorted({m["type"] for m in metadata.values() if m["type"]})
+    tags = sorted({tag for m in metadata.values() for tag in (m["tags"] or [])})
+    dates = sorted(m["date"] for m in metadata.values() if m["date"])
+
+    filters = {}
+    if types:
+        filters[f"type={types[0]}"] = DocumentFilter(types=[types[0]])
+    if dates:
+        # Most recent tenth of the date range
+        date_from = dates[-1] - (dates[-1] - dates[0]) / 10
+        filters[f"date>={date_from}"] = DocumentFilter(date_from=date_from)
+    if tags:
+        filters[f"tag={tags[0]}"] = DocumentFilter(tags=[tags[0]])
+    if types and tags:
+        filters[f"type={types[0]}+tag={tags[0]}"] = DocumentFilter(
+            types=[types[0]], tags=[tags[0]]
+        )
+    return filters
+
+
+async def run(engine, queries, k, filters=None, metadata=None, oversample=1) -> Dict[str, Any]:
+    latencies, results = [], []
+    for embedding, text in queries:
+        start = time.perf_counter()
+        if metadata is None:
+            result = await engine.search(embedding, text, filters=filters)
+            chunks = result.chunks
+        else:
+            result = await engine.search(
+                embedding,
+                text,
+                stage1_limit=engine.stage1_limit * oversample,
+                stage2_limit=k * oversample,
+            )
+            chunks = [
+                chunk
+                for chunk in result.chunks
+                if matches(filters, metadata[chunk["document_id"]])
+            ][:k]
+        latencies.append(time.perf_counter() - start)
+        results.append({chunk["chunk_id"] for chunk in chunks})
+    return {"latencies": latencies, "results": results}
+
+
+def print_row(label: str, run_result: Dict[str, Any], reference: List[set] = None) -> None:
+    returned = sum(len(r) for r in run_result["results"]) / len(run_result["results"])
+    line = (
+        f"   {label:<16} p50: {percentile(run_result['latencies'], 50):8.2f}ms | "
+        f"p95: {percentile(run_result['latencies'], 95):8.2f}ms | chunks: {returned:5.1f}"
+    )
+    if reference is not None:
+        recalls = [
+            len(ref & got) / len(ref)
+            for ref, got in zip(reference, run_result["results"])
+            if ref
+        ]
+        line += f" | recall: {sum(recalls) / len(recalls) if recalls else 0.0:.3f}"
+    print(line)
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark SQL metadata pre-filtering against Python post-filtering",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--queries", type=int, default=50, help="Number of sampled queries")
+    parser.add_argument("--k", type=int, default=10, help="Chunks per query")
+    parser.add_argument(
+        "--oversample", type=int, nargs="+", default=[1, 5], help="Post-filter over-fetch factors"
+    )
+    parser.add_argument(
+        "--assign-synthetic",
+        action="store_true",
+        help="Write random metadata to documents without a type",
+    )
+    args = parser.parse_args()
+
+    print("🚀 METADATA FILTER BENCHMARK")
+    print("=" * 60)
+
+    db_service = DatabaseService()
+    await db_service.initialize()
+
+    try:
+        async with db_service.get_connection() as conn:
+            if args.assign_synthetic:
+                assigned = await assign_synthetic_metadata(conn)
+                print(f"🏷️  Assigned synthetic metadata to {assigned} documents")
+
+            metadata = await load_document_metadata(conn)
+            filters = build_filters(metadata)
+            if not filters:
+                print("⚠️  No document metadata found, run with --assign-synthetic")
+                return
+
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    SELECT embedding::real[], left(content, 200)
+                    FROM document_chunks ORDER BY random() LIMIT %s
+                    """,
+                    (args.queries,),
+                )
+                queries = await cur.fetchall()
+            await conn.commit()
+
+            engine = HierarchicalRetrieval(conn, stage2_chunk_limit=args.k, use_reranking=False)
+
+            for label, document_filter in filters.items():
+                selected = sum(matches(document_filter, m) for m in metadata.values())
+                print(
+                    f"\n📊 {label} ({selected}/{len(metadata)} documents, "
+                    f"{len(queries)} queries, k={args.k})"
+                )
+                pre = await run(engine, queries, args.k, filters=document_filter)
+                print_row("pre-filter", pre)
+                for oversample in args.oversample:
+                    post = await run(
+                        engine,
+                        queries,
+                        args.k,
+                        filters=document_filter,
+                        metadata=metadata,
+                        oversample=oversample,
+                    )
+                    print_row(f"post-filter x{oversample}", post, pre["results"])
+    finally:
+        await db_service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Quantized Vector Search Benchmark
+
+Compares the stage 2 vector search modes of HierarchicalRetrieval:
+1. full       - float32 HNSW index (vector_cosine_ops)
+2. halfvec    - halfvec HNSW shortlist, re-scored with the float32 vectors
+3. binary     - binary-quantized (Hamming) HNSW shortlist, re-scored with the float32 vectors
+4. matryoshka - 256-d (leading dimensions) HNSW shortlist, re-scored with the float32 vectors
+
+and stage 1 document search on full summary embeddings against the 256-d
+summary shortlist.
+
+Reports the memory footprint of each representation (embedding heap bytes and
+HNSW index size), the net change in HNSW index memory of switching from "full"
+to each mode (with and without the float32 indexes), and recall@k against the
+exact scan plus p50/p95 latency for every mode and re-score multiplier.
+
+Only the float32 indexes exist by default; modes whose index is missing are
+skipped unless --build-indexes builds every mode's indexes first (drop them
+again with apply_vector_search_mode.py).
+
+Usage:
+  # Default: 50 queries, k=10, re-score multipliers 2/4/10
+  python benchmark_quantized_search.py --build-indexes
+
+  # Custom settings
+  python benchmark_quantized_search.py --queries 100 --k 10 --rescore 4 10 20 --ef-search 100
+"""
+
+import os
+import sys
+import time
+import argparse
+import asyncio
+import statistics
+import dotenv
+from typing import List, Dict, Any
+
+# Load environment variables and override POSTGRES_HOST for Docker
+dotenv.load_dotenv(".env.dev")
+os.environ["POSTGRES_HOST"] = "localhost"
+
+# Add the backend directory to Python path so we can import from app
+# Find the backend directory by looking for the directory containing 'app'
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = script_dir
+while backend_dir != "/" and not os.path.exists(os.path.join(backend_dir, "app")):
+    backend_dir = os.path.dirname(backend_dir)
+
+if os.path.exists(os.path.join(backend_dir, "app")):
+    sys.path.insert(0, backend_dir)
+else:
+    raise ImportError("Could not find backend directory containing 'app' module")
+
+from app.db.connection import DatabaseService
+from app.db.repositories.vector_index_repository import VectorIndexRepository
+from app.rag.retrieval.hierarchical_retrieval import HierarchicalRetrieval
+
+MODE_INDEXES = VectorIndexRepository.MODE_INDEXES
+FULL_INDEXES = VectorIndexRepository.FULL_INDEXES
+
+# Stage 1 keyword text that matches no summary, so only vector search counts
+NO_MATCH_QUERY = "qzxjvbenchmarknomatch"
+
+
+async def sample_queries(conn, count: int) -> List[str]:
+    """Sample stored chunk embeddings to use as queries (kept in text form)"""
+    async with conn.cursor() as cur:
+        await cur.execute(
+            "SELECT embedding::text FROM document_chunks ORDER BY random() LIMIT %s", (count,)
+        )
+        return [row[0] for row in await cur.fetchall()]
+
+
+async def sample_document_queries(conn, count: int) -> List[str]:
+    """Sample stored summary embeddings to use as stage 1 queries"""
+    async with conn.cursor() as cur:
+        await cur.execute(
+            """
+            SELECT summary_embedding::text FROM documents
+            WHERE summary_embedding IS NOT NULL
+            ORDER BY random() LIMIT %s
+            """,
+            (count,),
+        )
+        return [row[0] for row in await cur.fetchall()]
+
+
+async def get_document_ids(conn) -> List[int]:
+    async with conn.cursor() as cur:
+        await cur.execute("SELECT id FROM documents")
+        return [row[0] for row in await cur.fetchall()]
+
+
+async def run_document_queries(
+    engine: HierarchicalRetrieval,
+    queries: List[str],
+    k: int,
+    exact: bool = False,
+    ef_search: int = None,
+) -> Dict[str, Any]:
+    """Run stage 1 document search for every summary embedding"""
+    conn = engine.connection
+    await conn.commit()
+
+    results = []
+    latencies = []
+    for query_embedding in queries:
+        async with conn.transaction():
+            async with conn.cursor() as cur:
+                if exact:
+                    await cur.execute("SET LOCAL enable_indexscan = off")
+                else:
+                    await engine.index_repo.set_search_options(
+                        ef_search=ef_search, iterative_scan=engine.hnsw_iterative_scan
+                    )
+
+            # Threshold -1 admits every document: a pure nearest-neighbour search
+            start = time.perf_counter()
+            documents = await engine._stage1_document_filtering(
+                query_embedding, NO_MATCH_QUERY, -1.0, k
+            )
+            latencies.append(time.perf_counter() - start)
+
+        results.append([document["id"] for document in documents])
+
+    return {"results": results, "latencies": latencies}
+
+
+async def run_queries(
+    engine: HierarchicalRetrieval,
+    queries: List[str],
+    document_ids: List[int],
+    k: int,
+    exact: bool = False,
+    ef_search: int = None,
+) -> Dict[str, Any]:
+    """Run the engine's vector candidate query for every query embedding"""
+    conn = engine.connection
+    await conn.commit()
+
+    results = []
+    latencies = []
+    for query_embedding in queries:
+        sql, params = engine._vector_candidates_query(query_embedding, document_ids, k)
+        async with conn.transaction():
+            async with conn.cursor() as cur:
+                if exact:
+                    # Force the sequential scan so we get exact neighbours
+                    await cur.execute("SET LOCAL enable_indexscan = off")
+                else:
+                    await engine.index_repo.set_search_options(
+                        ef_search=ef_search, iterative_scan=engine.hnsw_iterative_scan
+                    )
+
+                start = time.perf_counter()
+                await cur.execute(sql, params)
+                rows = await cur.fetchall()
+                latencies.append(time.perf_counter() - start)
+
+        results.append([row[0] for row in rows])
+
+    return {"results": results, "latencies": latencies}
+
+
+def recall_at_k(ground_truth: List[List[int]], approximate: List[List[int]]) -> float:
+    """Average fraction of exact neighbours found by the approximate search"""
+    recalls = [
+        len(set(truth) & set(approx)) / len(truth)
+        for truth, approx in zip(ground_truth, approximate)
+        if truth
+    ]
+    return sum(recalls) / len(recalls) if recalls else 0.0
+
+
+def percentile(values: List[float], pct: int) -> float:
+    """Percentile of latencies in milliseconds"""
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100)[pct - 1] * 1000
+
+
+def print_row(label: str, recall: float, latencies: List[float]) -> None:
+    print(
+        f"   {label:<22} recall@k: {recall:6.3f} | "
+        f"p50: {percentile(latencies, 50):8.2f}ms | p95: {percentile(latencies, 95):8.2f}ms"
+    )
+
+
+async def benchmark(args) -> None:
+    db_service = DatabaseService()
+    await db_service.initialize()
+
+    try:
+        async with db_service.get_connection() as conn:
+            index_repo = VectorIndexRepository(conn)
+
+            if args.build_indexes:
+                print("🔨 Building missing HNSW indexes of every mode...")
+                start = time.time()
+                created = await index_repo.create_hnsw_indexes(
+                    [name for names in MODE_INDEXES.values() for name in names]
+                )
+                print(f"✅ Built {len(created)} indexes in {time.time() - start:.1f}s")
+
+            print("\n📦 MEMORY FOOTPRINT")
+            print("=" * 60)
+            storage = await index_repo.get_embedding_storage()
+            index_sizes = await index_repo.get_index_sizes()
+            existing = await index_repo.get_existing_indexes()
+            available_modes = [
+                mode
+                for mode, names in MODE_INDEXES.items()
+                if all(name in existing for name in names)
+            ]
+            for mode, names in MODE_INDEXES.items():
+                chunk_index = names[0]
+                line = f"   {mode:<10} vectors: {storage[mode] / (1024 * 1024):9.1f} MB | "
+                if mode not in available_modes:
+                    print(line + "HNSW index: not built (--build-indexes)")
+                    continue
+                print(line + f"HNSW index: {index_sizes[chunk_index] / (1024 * 1024):9.1f} MB")
+            print("   (halfvec / binary / 256-d vectors are what the table would hold; the re-score")
+            print("    step reads the float32 column, so only the index shrinks in place)")
+
+            if all(name in existing for name in FULL_INDEXES):
+                print("\n📦 NET HNSW INDEX MEMORY vs full (chunk + summary indexes)")
+                print("=" * 60)
+                for mode in available_modes:
+                    if mode == "full":
+                        continue
+                    added = sum(
+                        index_sizes[name] for name in MODE_INDEXES[mode] if name not in FULL_INDEXES
+                    )
+                    droppable = sum(
+                        index_sizes[name] for name in FULL_INDEXES if name not in MODE_INDEXES[mode]
+                    )
+                    print(
+                        f"   {mode:<10} float32 kept: {added / (1024 * 1024):+9.1f} MB | "
+                        f"float32 dropped: {(added - droppable) / (1024 * 1024):+9.1f} MB"
+                    )
+
+            queries = await sample_queries(conn, args.queries)
+            if not queries:
+                print("\n⚠️  No chunks stored, nothing to benchmark")
+                return
+            document_ids = await get_document_ids(conn)
+
+            print(f"\n📊 document_chunks.embedding ({len(queries)} queries, k={args.k})")
+            print("=" * 60)
+
+            exact_engine = HierarchicalRetrieval(conn, use_reranking=False)
+            exact = await run_queries(exact_engine, queries, document_ids, args.k, exact=True)
+            print_row("exact scan", 1.0, exact["latencies"])
+
+            if "full" in available_modes:
+                full_engine = HierarchicalRetrieval(conn, use_reranking=False)
+                full = await run_queries(
+                    full_engine, queries, document_ids, args.k, ef_search=args.ef_search
+                )
+                print_row("full", recall_at_k(exact["results"], full["results"]), full["latencies"])
+
+            for mode in ("halfvec", "binary", "matryoshka"):
+                if mode not in available_modes:
+                    continue
+                for multiplier in args.rescore:
+                    engine = HierarchicalRetrieval(
+                        conn,
+                        use_reranking=False,
+                        vector_search_mode=mode,
+                        rescore_multiplier=multiplier,
+                    )
+                    run = await run_queries(
+                        engine, queries, document_ids, args.k, ef_search=args.ef_search
+                    )
+                    print_row(
+                        f"{mode} x{multiplier} re-score",
+                        recall_at_k(exact["results"], run["results"]),
+                        run["latencies"],
+                    )
+
+            document_queries = await sample_document_queries(conn, args.queries)
+            if not document_queries or "matryoshka" not in available_modes:
+                return
+
+            print(
+                f"\n📊 documents.summary_embedding, stage 1 "
+                f"({len(document_queries)} queries, k={args.k})"
+            )
+            print("=" * 60)
+
+            exact = await run_document_queries(exact_engine, document_queries, args.k, exact=True)
+            print_row("exact scan", 1.0, exact["latencies"])
+
+            for multiplier in args.rescore:
+                engine = HierarchicalRetrieval(
+                    conn,
+                    use_reranking=False,
+                    vector_search_mode="matryoshka",
+                    rescore_multiplier=multiplier,
+                )
+                run = await run_document_queries(
+                    engine, document_queries, args.k, ef_search=args.ef_search
+                )
+                print_row(
+                    f"matryoshka x{multiplier} re-score",
+                    recall_at_k(exact["results"], run["results"]),
+                    run["latencies"],
+                )
+    finally:
+        await db_service.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark quantized HNSW shortlists against full-precision search",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--queries", type=int, default=50, help="Number of sampled queries")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument(
+        "--rescore", type=int, nargs="+", default=[2, 4, 10], help="Re-score multipliers"
+    )
+    parser.add_argument(
+        "--ef-search",
+        type=int,
+        default=100,
+        help="HNSW ef_search (must cover k x re-score multiplier for a full shortlist)",
+    )
+    parser.add_argument(
+        "--build-indexes",
+        action="store_true",
+        help="Build the missing HNSW indexes of every mode before benchmarking",
+    )
+    args = parser.parse_args()
+
+    print("🚀 QUANTIZED VECTOR SEARCH BENCHMARK")
+    print("=" * 60)
+    await benchmark(args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
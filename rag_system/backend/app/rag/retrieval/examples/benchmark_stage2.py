@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Stage 2 Fusion Mode Benchmark
+
+Compares the stage 2 modes of HierarchicalRetrieval on synthetic data:
+1. hybrid     - single CTE query with the 0.7/0.3 weighted score
+2. rrf        - vector and keyword legs on two pooled connections at once, fused with RRF
+3. rrf serial - the same two legs one after the other on one connection
+
+Synthetic documents (random embeddings, text drawn from a large synthetic
+vocabulary so keyword matches stay selective) are seeded once into the
+database, titled "benchmark:stage2:<n>". Each size is benchmarked by passing
+as many of them as needed as stage 1 candidates, so stage 2 searches 10k,
+100k or 1M chunks. Random embeddings are a worst case for HNSW; absolute
+numbers on real embeddings are lower, the comparison between modes holds.
+
+Seeding 1M chunks writes ~7 GB including the HNSW index and takes a while.
+
+Usage:
+  # Default: seed if needed, then 10k / 100k / 1M chunks, 50 queries each
+  python benchmark_stage2.py
+
+  # Smaller run
+  python benchmark_stage2.py --sizes 10000 100000 --queries 20
+
+  # Remove the synthetic documents
+  python benchmark_stage2.py --cleanup
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import asyncio
+import statistics
+import dotenv
+from typing import List, Dict, Any
+
+# Load environment variables and override POSTGRES_HOST for Docker
+dotenv.load_dotenv(".env.dev")
+os.environ["POSTGRES_HOST"] = "localhost"
+
+# Add the backend directory to Python path so we can import from app
+# Find the backend directory by looking for the directory containing 'app'
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = script_dir
+while backend_dir != "/" and not os.path.exists(os.path.join(backend_dir, "app")):
+    backend_dir = os.path.dirname(backend_dir)
+
+if os.path.exists(os.path.join(backend_dir, "app")):
+    sys.path.insert(0, backend_dir)
+else:
+    raise ImportError("Could not find backend directory containing 'app' module")
+
+from app.db.connection import DatabaseService
+from app.rag.retrieval.hierarchical_retrieval import HierarchicalRetrieval
+
+
+TITLE_PREFIX = "benchmark:stage2:"
+VOCABULARY = [f"term{n:04d}" for n in range(5000)]
+WORDS_PER_CHUNK = 60
+
+
+async def get_benchmark_document_ids(conn) -> List[int]:
+    async with conn.cursor() as cur:
+        await cur.execute(
+            "SELECT id FROM documents WHERE title LIKE %s ORDER BY id", (TITLE_PREFIX + "%",)
+        )
+        return [row[0] for row in await cur.fetchall()]
+
+
+async def seed(conn, document_count: int, chunks_per_document: int) -> List[int]:
+    """Insert synthetic documents until document_count exist (generated server-side)"""
+    document_ids = await get_benchmark_document_ids(conn)
+    missing = document_count - len(document_ids)
+    if missing <= 0:
+        return document_ids[:document_count]
+
+    print(f"🌱 Seeding {missing} documents x {chunks_per_document} chunks...")
+    start = time.time()
+    for n in range(len(document_ids), document_count):
+        async with conn.cursor() as cur:
+            # Correlated subqueries (WHERE n/i >= 0) so every row gets fresh random values
+            await cur.execute(
+                """
+                INSERT INTO documents (title, summary, summary_embedding)
+                SELECT %s || n, 'Synthetic benchmark document',
+                       (SELECT array_agg(random() - 0.5)::vector
+                        FROM generate_series(1, 1536) WHERE n >= 0)
+                FROM (SELECT %s::integer AS n) doc
+                RETURNING id
+                """,
+                (TITLE_PREFIX, n),
+            )
+            document_id = (await cur.fetchone())[0]
+
+            await cur.execute(
+                """
+                INSERT INTO document_chunks (content, embedding, document_id, chunk_index)
+                SELECT
+                    (SELECT string_agg((%s::text[])[1 + floor(random() * %s)::int], ' ')
+                     FROM generate_series(1, %s) WHERE i >= 0),
+                    (SELECT array_agg(random() - 0.5)::vector
+                     FROM generate_series(1, 1536) WHERE i >= 0),
+                    %s, i
+                FROM generate_series(0, %s - 1) i
+                """,
+                (VOCABULARY, len(VOCABULARY), WORDS_PER_CHUNK, document_id, chunks_per_document),
+            )
+        await conn.commit()
+        document_ids.append(document_id)
+        print(f"   {len(document_ids)}/{document_count} documents ({time.time() - start:.0f}s)")
+
+    return document_ids
+
+
+async def cleanup(conn) -> None:
+    async with conn.cursor() as cur:
+        await cur.execute("DELETE FROM documents WHERE title LIKE %s", (TITLE_PREFIX + "%",))
+        deleted = cur.rowcount
+    await conn.commit()
+    print(f"🗑️  Deleted {deleted} benchmark documents (chunks cascade)")
+
+
+async def sample_queries(conn, document_ids: List[int], count: int) -> List[Dict[str, Any]]:
+    """Stored chunk embeddings as query vectors, two vocabulary terms as query text"""
+    async with conn.cursor() as cur:
+        await cur.execute(
+            """
+            SELECT embedding::text FROM document_chunks
+            WHERE document_id = ANY(%s)
+            ORDER BY random() LIMIT %s
+            """,
+            (document_ids, count),
+        )
+        rows = await cur.fetchall()
+    await conn.commit()
+
+    rng = random.Random(7)
+    return [
+        {"embedding": row[0], "text": " OR ".join(rng.sample(VOCABULARY, 2))}
+        for row in rows
+    ]
+
+
+async def time_mode(
+    engine: HierarchicalRetrieval,
+    stage2,
+    queries: List[Dict[str, Any]],
+    document_ids: List[int],
+    k: int,
+) -> Dict[str, Any]:
+    """Run stage 2 for every query, each in its own transaction like a request"""
+    results = []
+    latencies = []
+    for query in queries:
+        await engine.connection.commit()
+        start = time.perf_counter()
+        await engine.index_repo.set_search_options(iterative_scan=engine.hnsw_iterative_scan)
+        matches = await stage2(query["embedding"], query["text"], document_ids, k)
+        latencies.append(time.perf_counter() - start)
+        results.append([match["chunk_id"] for match in matches])
+    await engine.connection.commit()
+    return {"results": results, "latencies": latencies}
+
+
+def percentile(values: List[float], pct: int) -> float:
+    """Percentile of latencies in milliseconds"""
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100)[pct - 1] * 1000
+
+
+def overlap(reference: List[List[int]], other: List[List[int]]) -> float:
+    """Average fraction of the reference top-k also returned by the other mode"""
+    fractions = [len(set(a) & set(b)) / len(a) for a, b in zip(reference, other) if a]
+    return sum(fractions) / len(fractions) if fractions else 0.0
+
+
+async def benchmark(args) -> None:
+    db_service = DatabaseService()
+    # Engine connection + one extra for the concurrent keyword leg
+    await db_service.initialize(max_size=3)
+
+    try:
+        async with db_service.get_connection() as conn:
+            if args.cleanup:
+                await cleanup(conn)
+                return
+
+            document_count = -(-max(args.sizes) // args.chunks_per_document)
+            document_ids = await seed(conn, document_count, args.chunks_per_document)
+
+            hybrid = HierarchicalRetrieval(conn, use_reranking=False, stage2_mode="hybrid")
+            concurrent = HierarchicalRetrieval(
+                conn, use_reranking=False, stage2_mode="rrf", db_service=db_service
+            )
+            serial = HierarchicalRetrieval(conn, use_reranking=False, stage2_mode="rrf")
+
+            for size in sorted(args.sizes):
+                candidate_ids = document_ids[: -(-size // args.chunks_per_document)]
+                queries = await sample_queries(conn, candidate_ids, args.queries)
+
+                print(f"\n📊 {size:,} chunks ({len(candidate_ids)} documents, {len(queries)} queries, k={args.k})")
+                print("=" * 60)
+
+                modes = {
+                    "hybrid": (hybrid, hybrid._stage2_chunk_retrieval),
+                    "rrf": (concurrent, concurrent._stage2_chunk_retrieval_rrf),
+                    "rrf serial": (serial, serial._stage2_chunk_retrieval_rrf),
+                }
+                timings = {}
+                for label, (engine, stage2) in modes.items():
+                    timings[label] = await time_mode(engine, stage2, queries, candidate_ids, args.k)
+                    latencies = timings[label]["latencies"]
+                    print(
+                        f"   {label:<12} p50: {percentile(latencies, 50):8.2f}ms | "
+                        f"p95: {percentile(latencies, 95):8.2f}ms"
+                    )
+
+                print(
+                    f"   🔁 top-{args.k} overlap rrf vs hybrid: "
+                    f"{overlap(timings['hybrid']['results'], timings['rrf']['results']):.2f}"
+                )
+    finally:
+        await db_service.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark stage 2 hybrid query against concurrent legs + RRF",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000, 1_000_000],
+        help="Chunks searched in stage 2",
+    )
+    parser.add_argument("--queries", type=int, default=50, help="Queries per size")
+    parser.add_argument("--k", type=int, default=10, help="Chunks returned per query")
+    parser.add_argument(
+        "--chunks-per-document", type=int, default=1000, help="Chunks per synthetic document"
+    )
+    parser.add_argument("--cleanup", action="store_true", help="Delete the synthetic documents")
+    args = parser.parse_args()
+
+    print("🚀 STAGE 2 FUSION MODE BENCHMARK")
+    print("=" * 60)
+    await benchmark(args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
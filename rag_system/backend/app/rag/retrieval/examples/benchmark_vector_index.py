@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+HNSW Vector Index Benchmark
+
+Compares approximate nearest neighbour search (HNSW) against the exact
+sequential scan for document summaries and chunk embeddings:
+1. Samples stored embeddings to use as queries
+2. Runs the exact scan (index scans disabled) to get the ground truth
+3. Runs HNSW search for several ef_search values
+4. Reports recall@k and p50/p95 latency for each configuration
+
+Usage:
+  # Default: 50 queries, k=10, ef_search 20/40/80/160
+  python benchmark_vector_index.py
+
+  # Custom settings
+  python benchmark_vector_index.py --queries 100 --k 20 --ef-search 40 100 200
+
+  # Rebuild the indexes with new build parameters before benchmarking
+  python benchmark_vector_index.py --rebuild --m 24 --ef-construction 128
+"""
+
+import os
+import sys
+import time
+import argparse
+import asyncio
+import statistics
+import dotenv
+from typing import List, Dict, Any
+
+# Load environment variables and override POSTGRES_HOST for Docker
+dotenv.load_dotenv(".env.dev")
+os.environ["POSTGRES_HOST"] = "localhost"
+
+# Add the backend directory to Python path so we can import from app
+# Find the backend directory by looking for the directory containing 'app'
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = script_dir
+while backend_dir != "/" and not os.path.exists(os.path.join(backend_dir, "app")):
+    backend_dir = os.path.dirname(backend_dir)
+
+if os.path.exists(os.path.join(backend_dir, "app")):
+    sys.path.insert(0, backend_dir)
+else:
+    raise ImportError("Could not find backend directory containing 'app' module")
+
+from app.db.connection import DatabaseService
+from app.db.repositories.vector_index_repository import VectorIndexRepository
+
+
+# table -> embedding column benchmarked
+TARGETS = {
+    "documents": "summary_embedding",
+    "document_chunks": "embedding",
+}
+
+
+async def sample_query_embeddings(conn, table: str, column: str, count: int) -> List[str]:
+    """Sample stored embeddings to use as benchmark queries (kept in text form)"""
+    async with conn.cursor() as cur:
+        await cur.execute(
+            f"SELECT {column}::text FROM {table} ORDER BY random() LIMIT %s", (count,)
+        )
+        rows = await cur.fetchall()
+    return [row[0] for row in rows]
+
+
+async def run_queries(
+    conn,
+    table: str,
+    column: str,
+    queries: List[str],
+    k: int,
+    exact: bool,
+    ef_search: int = None,
+) -> Dict[str, Any]:
+    """Run top-k queries and return result ids and per-query latencies"""
+    query = f"SELECT id FROM {table} ORDER BY {column} <=> %s::vector LIMIT %s"
+    index_repo = VectorIndexRepository(conn)
+
+    # End any implicit transaction so each query's SET LOCAL stays scoped to it
+    await conn.commit()
+
+    results = []
+    latencies = []
+    for query_embedding in queries:
+        async with conn.transaction():
+            async with conn.cursor() as cur:
+                if exact:
+                    # Force the sequential scan so we get exact neighbours
+                    await cur.execute("SET LOCAL enable_indexscan = off")
+                else:
+                    await index_repo.set_search_options(ef_search=ef_search)
+
+                start = time.perf_counter()
+                await cur.execute(query, (query_embedding, k))
+                rows = await cur.fetchall()
+                latencies.append(time.perf_counter() - start)
+
+        results.append([row[0] for row in rows])
+
+    return {"results": results, "latencies": latencies}
+
+
+def recall_at_k(ground_truth: List[List[int]], approximate: List[List[int]]) -> float:
+    """Average fraction of exact neighbours found by the approximate search"""
+    recalls = []
+    for truth, approx in zip(ground_truth, approximate):
+        if truth:
+            recalls.append(len(set(truth) & set(approx)) / len(truth))
+    return sum(recalls) / len(recalls) if recalls else 0.0
+
+
+def percentile(values: List[float], pct: int) -> float:
+    """Percentile of latencies in milliseconds"""
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100)[pct - 1] * 1000
+
+
+def print_row(label: str, recall: float, latencies: List[float]) -> None:
+    print(
+        f"   {label:<18} recall@k: {recall:6.3f} | "
+        f"p50: {percentile(latencies, 50):8.2f}ms | p95: {percentile(latencies, 95):8.2f}ms"
+    )
+
+
+async def benchmark(args) -> None:
+    db_service = DatabaseService()
+    await db_service.initialize()
+
+    try:
+        async with db_service.get_connection() as conn:
+            index_repo = VectorIndexRepository(conn)
+
+            if args.rebuild:
+                print(
+                    f"🔨 Rebuilding HNSW indexes (m={args.m}, ef_construction={args.ef_construction})..."
+                )
+                start = time.time()
+                await index_repo.rebuild_hnsw_indexes(args.m, args.ef_construction)
+                print(f"✅ Rebuilt in {time.time() - start:.1f}s")
+
+            print("\n📦 INDEX SIZES")
+            print("=" * 60)
+            for index_name, size in (await index_repo.get_index_sizes()).items():
+                print(f"   {index_name}: {size / (1024 * 1024):.1f} MB")
+
+            for table, column in TARGETS.items():
+                queries = await sample_query_embeddings(conn, table, column, args.queries)
+                if not queries:
+                    print(f"\n⚠️  No rows in {table}, skipping")
+                    continue
+
+                print(f"\n📊 {table}.{column} ({len(queries)} queries, k={args.k})")
+                print("=" * 60)
+
+                exact = await run_queries(conn, table, column, queries, args.k, exact=True)
+                print_row("exact scan", 1.0, exact["latencies"])
+
+                for ef_search in args.ef_search:
+                    approx = await run_queries(
+                        conn, table, column, queries, args.k, exact=False, ef_search=ef_search
+                    )
+                    recall = recall_at_k(exact["results"], approx["results"])
+                    print_row(f"hnsw ef={ef_search}", recall, approx["latencies"])
+    finally:
+        await db_service.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark HNSW vector indexes against exact search",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--queries", type=int, default=50, help="Number of sampled queries")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument(
+        "--ef-search",
+        type=int,
+        nargs="+",
+        default=[20, 40, 80, 160],
+        help="ef_search values to benchmark",
+    )
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild HNSW indexes first")
+    parser.add_argument("--m", type=int, default=16, help="HNSW m used with --rebuild")
+    parser.add_argument(
+        "--ef-construction", type=int, default=64, help="HNSW ef_construction used with --rebuild"
+    )
+    args = parser.parse_args()
+
+    print("🚀 HNSW VECTOR INDEX BENCHMARK")
+    print("=" * 60)
+    await benchmark(args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Memory-Mapped Vector Store Benchmark
+
+Runs the same sampled queries through HierarchicalRetrieval backed by
+Postgres and by an exported MmapVectorStore (no reranking) and reports:
+1. p50/p95 latency of stage 1 + stage 2 for each backend
+2. Overlap@k of the returned chunk ids (the store is vector-only, so keyword
+   matches found by the Postgres hybrid query are the expected difference)
+
+Export the store first with export_vector_store.py.
+
+Usage:
+  python benchmark_vector_store.py --path /var/lib/rag/vectors --queries 100
+"""
+
+import os
+import sys
+import time
+import argparse
+import asyncio
+import statistics
+import dotenv
+from typing import List
+
+# Load environment variables and override POSTGRES_HOST for Docker
+dotenv.load_dotenv(".env.dev")
+os.environ["POSTGRES_HOST"] = "localhost"
+
+# Add the backend directory to Python path so we can import from app
+# Find the backend directory by looking for the directory containing 'app'
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = script_dir
+while backend_dir != "/" and not os.path.exists(os.path.join(backend_dir, "app")):
+    backend_dir = os.path.dirname(backend_dir)
+
+if os.path.exists(os.path.join(backend_dir, "app")):
+    sys.path.insert(0, backend_dir)
+else:
+    raise ImportError("Could not find backend directory containing 'app' module")
+
+from app.db.connection import DatabaseService
+from app.rag.retrieval.hierarchical_retrieval import HierarchicalRetrieval
+from app.rag.retrieval.vector_store import MmapVectorStore
+
+
+def percentile(values: List[float], pct: int) -> float:
+    """Percentile of latencies in milliseconds"""
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100)[pct - 1] * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Compare Postgres and memory-mapped retrieval latency",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--path", default=os.getenv("VECTOR_STORE_PATH", ".cache/vectors"), help="Store directory"
+    )
+    parser.add_argument("--queries", type=int, default=50, help="Number of sampled queries")
+    parser.add_argument("--k", type=int, default=10, help="Chunks per query")
+    args = parser.parse_args()
+
+    print("🚀 MEMORY-MAPPED VECTOR STORE BENCHMARK")
+    print("=" * 60)
+
+    store = MmapVectorStore(args.path)
+    if not store.is_available():
+        print(f"⚠️  No export at {args.path}, run export_vector_store.py first")
+        return
+    stats = store.get_stats()
+    print(
+        f"📁 {stats['segments']} segments | {stats['documents']} documents | "
+        f"{stats['chunks']} chunks | {stats['dtype']}"
+    )
+
+    db_service = DatabaseService()
+    await db_service.initialize()
+
+    try:
+        async with db_service.get_connection() as conn:
+            # Chunk embeddings and texts stand in for user queries
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    SELECT embedding::real[], left(content, 200)
+                    FROM document_chunks ORDER BY random() LIMIT %s
+                    """,
+                    (args.queries,),
+                )
+                queries = await cur.fetchall()
+            await conn.commit()
+
+            engines = {
+                "postgres": HierarchicalRetrieval(
+                    conn, stage2_chunk_limit=args.k, use_reranking=False
+                ),
+                "mmap": HierarchicalRetrieval(
+                    None, stage2_chunk_limit=args.k, use_reranking=False, vector_store=store
+                ),
+            }
+
+            results = {}
+            print(f"\n📊 {len(queries)} queries, k={args.k}")
+            for label, engine in engines.items():
+                latencies, chunk_ids = [], []
+                for embedding, text in queries:
+                    start = time.perf_counter()
+                    result = await engine.search(embedding, text)
+                    latencies.append(time.perf_counter() - start)
+                    chunk_ids.append({chunk["chunk_id"] for chunk in result.chunks})
+                results[label] = chunk_ids
+                print(
+                    f"   {label:<10} p50: {percentile(latencies, 50):8.2f}ms | "
+                    f"p95: {percentile(latencies, 95):8.2f}ms"
+                )
+
+            overlaps = [
+                len(pg & mm) / len(pg)
+                for pg, mm in zip(results["postgres"], results["mmap"])
+                if pg
+            ]
+            if overlaps:
+                print(f"   overlap@{args.k}: {sum(overlaps) / len(overlaps):.3f}")
+    finally:
+        await db_service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
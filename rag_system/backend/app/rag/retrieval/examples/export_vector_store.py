@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Export Vector Store
+
+Exports document summary and chunk embeddings from Postgres into the
+memory-mapped store served by the API when VECTOR_STORE_PATH is set:
+1. Full export (default) - writes one segment and replaces all existing ones
+2. Append (--append)     - exports only rows newer than the last segment
+
+Running API workers pick up the new manifest within their refresh interval.
+Run a full export after updating or deleting documents.
+
+Usage:
+  # Full float16 export
+  python export_vector_store.py --path /var/lib/rag/vectors
+
+  # New documents / chunks only
+  python export_vector_store.py --path /var/lib/rag/vectors --append
+
+  # float32 matrices (twice the size, exact scores)
+  python export_vector_store.py --path /var/lib/rag/vectors --dtype float32
+"""
+
+import os
+import sys
+import time
+import argparse
+import asyncio
+import dotenv
+
+# Load environment variables and override POSTGRES_HOST for Docker
+dotenv.load_dotenv(".env.dev")
+os.environ["POSTGRES_HOST"] = "localhost"
+
+# Add the backend directory to Python path so we can import from app
+# Find the backend directory by looking for the directory containing 'app'
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = script_dir
+while backend_dir != "/" and not os.path.exists(os.path.join(backend_dir, "app")):
+    backend_dir = os.path.dirname(backend_dir)
+
+if os.path.exists(os.path.join(backend_dir, "app")):
+    sys.path.insert(0, backend_dir)
+else:
+    raise ImportError("Could not find backend directory containing 'app' module")
+
+from app.db.connection import DatabaseService
+from app.rag.retrieval.vector_store import MmapVectorStore
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Export embeddings into the memory-mapped vector store",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--path", default=os.getenv("VECTOR_STORE_PATH", ".cache/vectors"), help="Store directory"
+    )
+    parser.add_argument("--dtype", choices=MmapVectorStore.DTYPES, default="float16")
+    parser.add_argument("--append", action="store_true", help="Export new rows as a new segment")
+    args = parser.parse_args()
+
+    print("🚀 VECTOR STORE EXPORT")
+    print("=" * 60)
+    print(f"📁 Path: {args.path} | dtype: {args.dtype} | {'append' if args.append else 'full'}")
+
+    store = MmapVectorStore(args.path, dtype=args.dtype)
+    db_service = DatabaseService()
+    await db_service.initialize()
+
+    try:
+        start = time.perf_counter()
+        async with db_service.get_connection() as conn:
+            segment = await store.export(conn, append=args.append)
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"\n✅ {segment['name']}: {segment['documents']} documents, "
+            f"{segment['chunks']} chunks in {elapsed:.1f}s"
+        )
+        stats = store.get_stats()
+        print(
+            f"📊 Store: {stats['segments']} segments | {stats['documents']} documents | "
+            f"{stats['chunks']} chunks | {stats['vector_bytes'] / (1024 * 1024):.1f} MB of vectors"
+        )
+    finally:
+        await db_service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -80,6 +80,11 @@ class InteractiveRetrieval:
         print(f"📄 Total documents: {stats['total_documents']}")
         print(f"📚 Total chunks: {stats['total_chunks']}")
         print(f"📈 Avg chunks per document: {stats['avg_chunks_per_document']:.1f}")
+        print(
+            f"📏 Chunks per document: min {stats['min_chunks_per_document']}, "
+            f"median {stats['median_chunks_per_document']:.0f}, "
+            f"max {stats['max_chunks_per_document']}"
+        )
         print(f"🎯 Stage 1 threshold: {stats['stage1_threshold']}")
         print(f"📊 Stage 1 doc limit: {stats['stage1_document_limit']}")
         print(f"🔍 Stage 2 chunk limit: {stats['stage2_chunk_limit']}")
@@ -100,6 +105,12 @@ class InteractiveRetrieval:
         print(f"📚 Stage 2 (chunks): {retrieval_result.stage2_time:.3f}s")
         if retrieval_result.reranked:
             print(f"🔄 Stage 3 (rerank): {retrieval_result.rerank_time:.3f}s")
+            if retrieval_result.rerank_cache_hit_rate is not None:
+                cache_status = "hit" if retrieval_result.rerank_cache_hit else "miss"
+                print(
+                    f"💾 Rerank cache: {cache_status} "
+                    f"(hit rate {retrieval_result.rerank_cache_hit_rate:.1%})"
+                )
         print(f"🎯 Total retrieval: {retrieval_result.total_time:.3f}s")
         print(f"⚡ Total end-to-end: {total_time:.3f}s")
         print(f"🧠 Tokens used: {processed_query.tokens_used}")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Multi-Query Search
+
+Expands a query into variations, retrieves for all of them concurrently and
+prints per-variation timings next to the fused chunks, compared with
+single-query retrieval of the original question.
+
+Usage:
+  # Rule-based variations
+  python multi_query_search.py --query "What was revenue in Q3?"
+
+  # LLM rewrites, 4 variations, 1.5s budget
+  python multi_query_search.py --query "Why did margin change?" --variations 4 --budget 1.5 --llm-model gpt-4o-mini
+"""
+
+import os
+import sys
+import argparse
+import asyncio
+import dotenv
+
+# Load environment variables and override POSTGRES_HOST for Docker
+dotenv.load_dotenv(".env.dev")
+os.environ["POSTGRES_HOST"] = "localhost"
+
+# Add the backend directory to Python path so we can import from app
+# Find the backend directory by looking for the directory containing 'app'
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = script_dir
+while backend_dir != "/" and not os.path.exists(os.path.join(backend_dir, "app")):
+    backend_dir = os.path.dirname(backend_dir)
+
+if os.path.exists(os.path.join(backend_dir, "app")):
+    sys.path.insert(0, backend_dir)
+else:
+    raise ImportError("Could not find backend directory containing 'app' module")
+
+from app.db.connection import DatabaseService
+from app.rag.retrieval.hierarchical_retrieval import HierarchicalRetrieval, RetrievalConfig
+from app.rag.retrieval.multi_query import MultiQueryRetrieval
+from app.rag.retrieval.query_processing import QueryProcessor
+
+
+def print_chunks(chunks) -> None:
+    for i, chunk in enumerate(chunks, 1):
+        preview = chunk["content"][:80].replace("\n", " ")
+        print(f"   {i:2d}. [{chunk['chunk_id']}] {chunk['document_title']}: {preview}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Multi-query expansion with concurrent retrieval",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--query", required=True, help="Question to search for")
+    parser.add_argument("--variations", type=int, default=3, help="Variations incl. the original")
+    parser.add_argument("--budget", type=float, default=2.0, help="Latency budget in seconds")
+    parser.add_argument("--llm-model", default=None, help="OpenAI model for query rewrites")
+    parser.add_argument("--k", type=int, default=5, help="Chunks to return")
+    args = parser.parse_args()
+
+    print("🚀 MULTI-QUERY SEARCH")
+    print("=" * 60)
+
+    query_processor = QueryProcessor(expansion_model=args.llm_model)
+    config = RetrievalConfig(
+        stage2_chunk_limit=args.k,
+        use_reranking=False,
+        multi_query_variations=args.variations,
+        multi_query_budget_seconds=args.budget,
+    )
+
+    expansion = await query_processor.expand_query_async(args.query, args.variations)
+    print(f"📝 Variations ({expansion['expansion']}):")
+    for variation in expansion["query_variations"]:
+        print(f"   - {variation}")
+    processed_queries = await query_processor.process_queries_async(
+        expansion["query_variations"]
+    )
+
+    db_service = DatabaseService()
+    await db_service.initialize(max_size=max(5, args.variations + 1))
+
+    try:
+        async with db_service.get_connection() as conn:
+            single = await HierarchicalRetrieval.from_config(conn, config).search(
+                processed_queries[0].embedding, processed_queries[0].cleaned_text
+            )
+        print(f"\n🔍 Single query ({single.total_time * 1000:.1f}ms)")
+        print_chunks(single.chunks)
+
+        multi = await MultiQueryRetrieval(db_service, config).search(processed_queries)
+        print(f"\n🔀 Multi-query fused ({multi.total_time * 1000:.1f}ms)")
+        for timing in multi.query_variations:
+            print(
+                f"   {timing['status']:<9} {timing['time'] * 1000:8.1f}ms "
+                f"{timing['chunks_found']:3d} chunks | {timing['query']}"
+            )
+        print()
+        print_chunks(multi.chunks)
+
+        new_chunks = {c["chunk_id"] for c in multi.chunks} - {c["chunk_id"] for c in single.chunks}
+        print(f"\n📊 {len(new_chunks)} of {len(multi.chunks)} fused chunks not in the single-query result")
+    finally:
+        await db_service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,10 +1,15 @@
-from typing import List, Dict, Any, Optional
+import asyncio
+from typing import List, Dict, Any, Optional, Tuple
 from psycopg import AsyncConnection
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 
-from app.db.repositories.document_repository import DocumentRepository
+from app.db.connection import DatabaseService
+from app.db.repositories.document_repository import DocumentRepository, DocumentFilter
 from app.db.repositories.document_chunks_repository import DocumentChunksRepository
+from app.db.repositories.vector_index_repository import VectorIndexRepository
 from app.rag.reranking.voyage_reranker import VoyageReranker
+from app.rag.retrieval.semantic_cache import SemanticRetrievalCache
+from app.rag.retrieval.vector_store import MmapVectorStore
 
 
 @dataclass
@@ -20,6 +25,58 @@ class RetrievalResult:
     rerank_time: float
     total_time: float
     reranked: bool
+    rerank_cache_hit: bool = False
+    rerank_cache_hit_rate: Optional[float] = None  # None when reranking is not cached
+    semantic_cache_similarity: Optional[float] = None  # Set when served from the semantic cache
+    query_variations: Optional[List[Dict[str, Any]]] = None  # Per-variation timings (multi-query)
+
+
+@dataclass
+class RetrievalConfig:
+    """Configuration shared by HierarchicalRetrieval instances"""
+
+    stage1_similarity_threshold: float = 0.3
+    stage1_document_limit: int = 20
+    stage2_chunk_limit: int = 10
+    use_reranking: bool = True
+    hnsw_ef_search: Optional[int] = None
+    hnsw_iterative_scan: Optional[str] = "relaxed_order"
+    stage2_candidate_multiplier: int = 4
+    stage2_mode: str = "hybrid"
+    rrf_k: int = 60
+    vector_search_mode: str = "full"
+    rescore_multiplier: int = 4
+    # Read by MultiQueryRetrieval, not passed to HierarchicalRetrieval
+    multi_query_variations: int = 1
+    multi_query_budget_seconds: float = 2.0
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[Dict[str, Any]]], k: int = 60, key: str = "chunk_id"
+) -> List[Dict[str, Any]]:
+    """
+    Fuse ranked lists with reciprocal rank fusion: score = sum(1 / (k + rank))
+
+    Only ranks are used, so scores from different retrievers (cosine distance,
+    PGroonga score) never need to be normalized against each other.
+
+    Args:
+        rankings: Ranked result lists, best first
+        k: Rank constant (60 in the original RRF paper); higher values flatten
+            the advantage of top ranks
+        key: Field identifying the same item across lists
+
+    Returns:
+        Items ordered by fused score, with "rrf_score" set. Fields of the first
+        list an item appears in are kept.
+    """
+    fused: Dict[Any, Dict[str, Any]] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, 1):
+            entry = fused.setdefault(item[key], {**item, "rrf_score": 0.0})
+            entry["rrf_score"] += 1.0 / (k + rank)
+
+    return sorted(fused.values(), key=lambda item: item["rrf_score"], reverse=True)
 
 
 @dataclass
@@ -46,8 +103,18 @@ class HierarchicalRetrieval:
     Stage 2: Chunk-level retrieval within candidate documents
     - Search chunks only from candidate documents
     - Returns most relevant chunks with document context
+
+    Stage 2 modes:
+    - "hybrid": one query scoring vector and keyword candidates with a weighted sum
+    - "rrf": vector (HNSW) and keyword (PGroonga) top-N queries run concurrently
+      and fused with reciprocal rank fusion
+
+    With a vector_store, both stages are served in-process from memory-mapped
+    embeddings (vector similarity only) and db_connection may be None.
     """
 
+    STAGE2_MODES = ("hybrid", "rrf")
+
     def __init__(
         self,
         db_connection: AsyncConnection,
@@ -56,6 +123,16 @@ class HierarchicalRetrieval:
         stage2_chunk_limit: int = 10,
         reranker: Optional[VoyageReranker] = None,
         use_reranking: bool = True,
+        hnsw_ef_search: Optional[int] = None,
+        hnsw_iterative_scan: Optional[str] = "relaxed_order",
+        stage2_candidate_multiplier: int = 4,
+        stage2_mode: str = "hybrid",
+        rrf_k: int = 60,
+        db_service: Optional[DatabaseService] = None,
+        semantic_cache: Optional[SemanticRetrievalCache] = None,
+        vector_search_mode: str = "full",
+        rescore_multiplier: int = 4,
+        vector_store: Optional[MmapVectorStore] = None,
     ):
         """
         Initialize hierarchical retrieval system
@@ -65,17 +142,56 @@ class HierarchicalRetrieval:
             stage1_similarity_threshold: Minimum similarity for document candidates
             stage1_document_limit: Max documents to consider in stage 1
             stage2_chunk_limit: Max chunks to return from stage 2
-            reranker: Optional VoyageReranker instance for reranking
+            reranker: Optional reranker instance (VoyageReranker, LocalCrossEncoderReranker
+                or a CachedReranker wrapping either)
             use_reranking: Whether to use reranking (requires reranker or VOYAGE_API_KEY)
+            hnsw_ef_search: HNSW candidate list size per query (None = server default of 40)
+            hnsw_iterative_scan: HNSW iterative scan mode for filtered queries
+                ("relaxed_order", "strict_order", "off"; requires pgvector >= 0.8, None = don't set)
+            stage2_candidate_multiplier: Vector candidates fetched per returned chunk in stage 2
+                (also the per-leg candidate count in "rrf" mode)
+            stage2_mode: "hybrid" (single weighted query) or "rrf" (concurrent legs + RRF)
+            rrf_k: Rank constant for reciprocal rank fusion
+            db_service: Pool used for the keyword leg in "rrf" mode, so both legs run
+                at once (None = legs run one after the other on db_connection)
+            semantic_cache: Shared cache returning earlier results for similar query
+                embeddings (only used when search() is called without overrides)
+            vector_search_mode: Index used for stage 2 vector candidates: "full"
+                (float32 HNSW), "halfvec", "binary" (quantized HNSW shortlist) or
+                "matryoshka" (256-d HNSW shortlist, also used in stage 1), all
+                re-scored with the full-precision vectors
+            rescore_multiplier: Shortlist size per vector candidate in shortlist modes
+            vector_store: Memory-mapped store answering both stages without Postgres
+                (stage mode, vector search mode and HNSW options do not apply)
         """
+        if stage2_mode not in self.STAGE2_MODES:
+            available = ", ".join(self.STAGE2_MODES)
+            raise ValueError(f"Unknown stage2_mode '{stage2_mode}'. Available: {available}")
+        if vector_search_mode not in VectorIndexRepository.VECTOR_SEARCH_MODES:
+            available = ", ".join(VectorIndexRepository.VECTOR_SEARCH_MODES)
+            raise ValueError(
+                f"Unknown vector_search_mode '{vector_search_mode}'. Available: {available}"
+            )
+
         self.doc_repo = DocumentRepository(db_connection)
         self.chunk_repo = DocumentChunksRepository(db_connection)
+        self.index_repo = VectorIndexRepository(db_connection)
         self.connection = db_connection
 
         # Configuration
         self.stage1_threshold = stage1_similarity_threshold
         self.stage1_limit = stage1_document_limit
         self.stage2_limit = stage2_chunk_limit
+        self.hnsw_ef_search = hnsw_ef_search
+        self.hnsw_iterative_scan = hnsw_iterative_scan
+        self.stage2_candidate_multiplier = max(1, stage2_candidate_multiplier)
+        self.stage2_mode = stage2_mode
+        self.rrf_k = rrf_k
+        self.db_service = db_service
+        self.semantic_cache = semantic_cache
+        self.vector_search_mode = vector_search_mode
+        self.rescore_multiplier = max(1, rescore_multiplier)
+        self.vector_store = vector_store
 
         # Reranking setup
         self.use_reranking = use_reranking
@@ -84,6 +200,40 @@ class HierarchicalRetrieval:
         else:
             self.reranker = None
 
+    @classmethod
+    def from_config(
+        cls,
+        db_connection: AsyncConnection,
+        config: RetrievalConfig,
+        reranker: Optional[VoyageReranker] = None,
+        db_service: Optional[DatabaseService] = None,
+        semantic_cache: Optional[SemanticRetrievalCache] = None,
+        vector_store: Optional[MmapVectorStore] = None,
+    ) -> "HierarchicalRetrieval":
+        """
+        Create a retrieval engine for a connection from shared configuration
+
+        Args:
+            db_connection: Active database connection
+            config: Shared retrieval configuration
+            reranker: Shared reranker instance (reranking is disabled if None)
+            db_service: Pool for the concurrent keyword leg in "rrf" mode
+            semantic_cache: Shared semantic retrieval cache
+            vector_store: Shared memory-mapped vector store
+        """
+        options = asdict(config)
+        for option in ("multi_query_variations", "multi_query_budget_seconds"):
+            options.pop(option)
+        options["use_reranking"] = config.use_reranking and reranker is not None
+        return cls(
+            db_connection=db_connection,
+            reranker=reranker,
+            db_service=db_service,
+            semantic_cache=semantic_cache,
+            vector_store=vector_store,
+            **options,
+        )
+
     async def search(
         self,
         query_embedding: List[float],
@@ -91,6 +241,8 @@ class HierarchicalRetrieval:
         stage1_limit: Optional[int] = None,
         stage2_limit: Optional[int] = None,
         similarity_threshold: Optional[float] = None,
+        ef_search: Optional[int] = None,
+        filters: Optional[DocumentFilter] = None,
     ) -> RetrievalResult:
         """
         Perform two-stage hierarchical search
@@ -100,23 +252,51 @@ class HierarchicalRetrieval:
             stage1_limit: Override for document candidate limit
             stage2_limit: Override for final chunk limit
             similarity_threshold: Override for similarity threshold
+            ef_search: Override for HNSW ef_search
+            filters: Document metadata predicates (type, date range, tags). Stage 1
+                applies them in SQL, so stage 2 only scans chunks of matching documents.
 
         Returns:
             RetrievalResult with chunks, timing, and metadata
         """
         import time
 
+        if filters is not None and self.vector_store is not None:
+            raise ValueError("Metadata filters are not supported with a vector_store")
+
         total_start = time.time()
 
+        # Results are cached for the engine's own settings only
+        use_cache = self.semantic_cache is not None and not any(
+            (stage1_limit, stage2_limit, similarity_threshold, ef_search, filters)
+        )
+        if use_cache:
+            cache_generation = self.semantic_cache.generation
+            cached = self.semantic_cache.lookup(query_embedding)
+            if cached is not None:
+                # Both SQL stages and reranking are skipped
+                cached.stage1_time = cached.stage2_time = cached.rerank_time = 0.0
+                cached.total_time = time.time() - total_start
+                return cached
+
         # Use provided limits or defaults
         doc_limit = stage1_limit or self.stage1_limit
         chunk_limit = stage2_limit or self.stage2_limit
         threshold = similarity_threshold or self.stage1_threshold
 
+        # Apply HNSW query-time options for this search
+        ef_search = ef_search or self.hnsw_ef_search
+        if self.vector_store is None and (
+            ef_search is not None or self.hnsw_iterative_scan is not None
+        ):
+            await self.index_repo.set_search_options(
+                ef_search=ef_search, iterative_scan=self.hnsw_iterative_scan
+            )
+
         # Stage 1: Find document candidates
         stage1_start = time.time()
         document_candidates = await self._stage1_document_filtering(
-            query_embedding, query_text, threshold, doc_limit
+            query_embedding, query_text, threshold, doc_limit, filters
         )
         stage1_time = time.time() - stage1_start
 
@@ -136,7 +316,13 @@ class HierarchicalRetrieval:
 
         # Stage 2: Find best chunks from candidate documents
         stage2_start = time.time()
-        chunk_matches = await self._stage2_chunk_retrieval(
+        if self.vector_store is not None:
+            stage2_retrieval = self._stage2_chunk_retrieval_mmap
+        elif self.stage2_mode == "rrf":
+            stage2_retrieval = self._stage2_chunk_retrieval_rrf
+        else:
+            stage2_retrieval = self._stage2_chunk_retrieval
+        chunk_matches = await stage2_retrieval(
             query_embedding,
             query_text,
             [doc["id"] for doc in document_candidates],
@@ -147,6 +333,7 @@ class HierarchicalRetrieval:
         # Stage 3: Rerank chunks
         rerank_time = 0.0
         reranked = False
+        rerank_result = None
         if self.use_reranking and self.reranker and chunk_matches:
             rerank_result = await self.reranker.rerank(
                 query=query_text, chunks=chunk_matches, top_k=chunk_limit
@@ -157,7 +344,7 @@ class HierarchicalRetrieval:
 
         total_time = time.time() - total_start
 
-        return RetrievalResult(
+        result = RetrievalResult(
             chunks=chunk_matches,
             document_candidates=document_candidates,
             total_documents_searched=len(document_candidates),
@@ -167,7 +354,13 @@ class HierarchicalRetrieval:
             rerank_time=rerank_time,
             total_time=total_time,
             reranked=reranked,
+            rerank_cache_hit=rerank_result.cache_hit if rerank_result else False,
+            rerank_cache_hit_rate=rerank_result.cache_hit_rate if rerank_result else None,
         )
+        if use_cache:
+            # Skipped if documents changed while this retrieval was running
+            self.semantic_cache.store(query_embedding, result, generation=cache_generation)
+        return result
 
     async def _stage1_document_filtering(
         self,
@@ -175,6 +368,7 @@ class HierarchicalRetrieval:
         query_text: str,
         threshold: float,
         limit: int,
+        filters: Optional[DocumentFilter] = None,
     ) -> List[Dict[str, Any]]:
         """
         Stage 1: Filter documents by summary similarity OR full-text search
@@ -182,9 +376,27 @@ class HierarchicalRetrieval:
 
         Returns list of candidate documents with similarity scores
         """
+        if self.vector_store is not None:
+            # Scored off the event loop; NumPy releases the GIL in the products
+            return await asyncio.to_thread(
+                self.vector_store.search_documents, query_embedding, limit, threshold
+            )
+
+        # Only documents have a 256-d index; quantized modes are chunk-only
+        shortlist_size = (
+            limit * self.rescore_multiplier
+            if self.vector_search_mode == "matryoshka"
+            else None
+        )
+
         # Use hybrid search that combines embedding similarity and full-text search
         similar_docs = await self.doc_repo.search_documents_hybrid(
-            query_embedding, query_text, threshold, limit
+            query_embedding,
+            query_text,
+            threshold,
+            limit,
+            shortlist_size=shortlist_size,
+            filters=filters,
         )
 
         # Format results for consistency
@@ -227,18 +439,17 @@ class HierarchicalRetrieval:
             return []
 
         # Search chunks across all candidate documents using hybrid approach
-        # Combines semantic similarity (embedding) with keyword matching (PGroonga)
+        # Combines semantic similarity (embedding) with keyword matching (PGroonga).
+        # The vector leg is an ORDER BY distance LIMIT query so it can be served by
+        # the HNSW index; hybrid scores are only computed for the union of vector
+        # candidates and keyword matches. Chunks outside both sets cannot outrank
+        # the vector candidates, so the top results match a full scan.
+        vector_candidates_query, vector_candidates_params = self._vector_candidates_query(
+            query_embedding, document_ids, limit * self.stage2_candidate_multiplier
+        )
         query = """
-            WITH all_chunks AS (
-                SELECT
-                    dc.id, dc.content, dc.document_id,
-                    d.title, d.summary,
-                    -- Semantic score using embedding similarity
-                    (1 - (dc.embedding <=> %s::vector)) AS semantic_score,
-                    (dc.embedding <=> %s::vector) as distance
-                FROM document_chunks dc
-                JOIN documents d ON dc.document_id = d.id
-                WHERE dc.document_id = ANY(%s)
+            WITH vector_candidates AS (
+                """ + vector_candidates_query + """
             ),
             matching_chunks AS (
                 SELECT
@@ -247,6 +458,23 @@ class HierarchicalRetrieval:
                 FROM document_chunks dc
                 WHERE dc.content &@~ %s
                   AND dc.document_id = ANY(%s)
+            ),
+            candidates AS (
+                SELECT id FROM vector_candidates
+                UNION
+                SELECT id FROM matching_chunks
+            ),
+            all_chunks AS (
+                SELECT
+                    dc.id, dc.content, dc.document_id,
+                    d.title, d.summary,
+                    -- Semantic score using embedding similarity
+                    (1 - (dc.embedding <=> %s::vector)) AS semantic_score,
+                    (dc.embedding <=> %s::vector) as distance,
+                    dc.chunk_index
+                FROM candidates c
+                JOIN document_chunks dc ON dc.id = c.id
+                JOIN documents d ON dc.document_id = d.id
             )
             SELECT
                 ac.id, ac.content, ac.document_id, ac.title, ac.summary,
@@ -254,7 +482,8 @@ class HierarchicalRetrieval:
                 COALESCE(mc.keyword_score, 0) AS keyword_score,
                 ac.distance,
                 -- Combined hybrid score (weighted average)
-                (0.7 * ac.semantic_score + 0.3 * LEAST(COALESCE(mc.keyword_score, 0) / 10.0, 1.0)) AS hybrid_score
+                (0.7 * ac.semantic_score + 0.3 * LEAST(COALESCE(mc.keyword_score, 0) / 10.0, 1.0)) AS hybrid_score,
+                ac.chunk_index
             FROM all_chunks ac
             LEFT JOIN matching_chunks mc ON ac.id = mc.id
             ORDER BY hybrid_score DESC
@@ -265,11 +494,11 @@ class HierarchicalRetrieval:
             await cur.execute(
                 query,
                 (
-                    query_embedding,
-                    query_embedding,
-                    document_ids,
+                    *vector_candidates_params,
                     query_text,
                     document_ids,
+                    query_embedding,
+                    query_embedding,
                     limit,
                 ),
             )
@@ -290,11 +519,218 @@ class HierarchicalRetrieval:
                     "distance": result[7],
                     "hybrid_score": result[8],
                     "similarity_score": result[5],  # Keep for backward compatibility
+                    "chunk_index": result[9],
                 }
             )
 
         return chunk_matches
 
+    async def _stage2_chunk_retrieval_rrf(
+        self,
+        query_embedding: List[float],
+        query_text: str,
+        document_ids: List[int],
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Stage 2 with separate vector and keyword legs fused by reciprocal rank fusion
+
+        Each leg is a plain top-N query its index can serve on its own (HNSW
+        ORDER BY distance LIMIT, PGroonga &@~ ORDER BY score LIMIT). With a
+        db_service the keyword leg runs on a second pooled connection while the
+        vector leg runs on this engine's connection (where the HNSW search
+        options are set).
+
+        Args:
+            query_embedding: Query vector
+            query_text: Query text for keyword matching
+            document_ids: List of candidate document IDs from stage 1
+            limit: Maximum chunks to return
+
+        Returns:
+            List of chunk matches ordered by RRF score (also exposed as hybrid_score)
+        """
+        if not document_ids:
+            return []
+
+        candidate_limit = limit * self.stage2_candidate_multiplier
+
+        if self.db_service is not None:
+            async def keyword_leg() -> List[Dict[str, Any]]:
+                async with self.db_service.get_connection() as conn:
+                    return await self._keyword_leg(
+                        conn, query_embedding, query_text, document_ids, candidate_limit
+                    )
+
+            vector_matches, keyword_matches = await asyncio.gather(
+                self._vector_leg(query_embedding, document_ids, candidate_limit),
+                keyword_leg(),
+            )
+        else:
+            vector_matches = await self._vector_leg(
+                query_embedding, document_ids, candidate_limit
+            )
+            keyword_matches = await self._keyword_leg(
+                self.connection, query_embedding, query_text, document_ids, candidate_limit
+            )
+
+        fused = reciprocal_rank_fusion([vector_matches, keyword_matches], k=self.rrf_k)
+
+        # Chunks that matched both legs carry the keyword score from the keyword leg
+        keyword_scores = {match["chunk_id"]: match["keyword_score"] for match in keyword_matches}
+        for match in fused:
+            match["keyword_score"] = keyword_scores.get(match["chunk_id"], 0)
+            match["hybrid_score"] = match["rrf_score"]
+
+        return fused[:limit]
+
+    async def _stage2_chunk_retrieval_mmap(
+        self,
+        query_embedding: List[float],
+        query_text: str,
+        document_ids: List[int],
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Stage 2 from the memory-mapped store: top chunks of the candidate
+        documents by cosine similarity (query_text is not used)
+        """
+        if not document_ids:
+            return []
+
+        return await asyncio.to_thread(
+            self.vector_store.search_chunks, query_embedding, document_ids, limit
+        )
+
+    async def _vector_leg(
+        self, query_embedding: List[float], document_ids: List[int], limit: int
+    ) -> List[Dict[str, Any]]:
+        """Top-N chunks by cosine distance (HNSW), best first"""
+        vector_candidates_query, vector_candidates_params = self._vector_candidates_query(
+            query_embedding, document_ids, limit
+        )
+        query = """
+            WITH vector_candidates AS (
+                """ + vector_candidates_query + """
+            )
+            SELECT
+                dc.id, dc.content, dc.document_id, d.title, d.summary,
+                dc.embedding <=> %s::vector AS distance,
+                dc.chunk_index
+            FROM vector_candidates vc
+            JOIN document_chunks dc ON dc.id = vc.id
+            JOIN documents d ON dc.document_id = d.id
+            ORDER BY distance
+        """
+
+        async with self.connection.cursor() as cur:
+            await cur.execute(query, (*vector_candidates_params, query_embedding))
+            results = await cur.fetchall()
+
+        return [
+            self._format_leg_match(result, keyword_score=0) for result in results
+        ]
+
+    def _vector_candidates_query(
+        self, query_embedding: List[float], document_ids: List[int], limit: int
+    ) -> Tuple[str, List[Any]]:
+        """
+        SQL selecting the ids of the `limit` nearest chunks, and its parameters
+
+        "full" orders by float32 cosine distance (vector_cosine_ops HNSW index).
+        Shortlist modes take limit * rescore_multiplier chunks from the
+        halfvec / binary / 256-d index and re-rank them by full-precision
+        distance, so only the shortlist reads the float32 vectors.
+        """
+        if self.vector_search_mode == "full":
+            query = """
+                SELECT dc.id
+                FROM document_chunks dc
+                WHERE dc.document_id = ANY(%s)
+                ORDER BY dc.embedding <=> %s::vector
+                LIMIT %s
+            """
+            return query, [document_ids, query_embedding, limit]
+
+        shortlist_distance = VectorIndexRepository.SHORTLIST_DISTANCES[
+            self.vector_search_mode
+        ].format(column="dc.embedding")
+        query = """
+            SELECT shortlist.id
+            FROM (
+                SELECT dc.id, dc.embedding
+                FROM document_chunks dc
+                WHERE dc.document_id = ANY(%s)
+                ORDER BY """ + shortlist_distance + """
+                LIMIT %s
+            ) shortlist
+            ORDER BY shortlist.embedding <=> %s::vector
+            LIMIT %s
+        """
+        return query, [
+            document_ids,
+            query_embedding,
+            limit * self.rescore_multiplier,
+            query_embedding,
+            limit,
+        ]
+
+    async def _keyword_leg(
+        self,
+        conn: AsyncConnection,
+        query_embedding: List[float],
+        query_text: str,
+        document_ids: List[int],
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """Top-N chunks by PGroonga score, best first"""
+        # Distance is only computed for the returned rows, so keyword-only
+        # matches still carry a semantic score
+        query = """
+            WITH keyword_matches AS (
+                SELECT
+                    dc.id,
+                    pgroonga_score(dc.tableoid, dc.ctid) AS keyword_score
+                FROM document_chunks dc
+                WHERE dc.content &@~ %s
+                  AND dc.document_id = ANY(%s)
+                ORDER BY keyword_score DESC
+                LIMIT %s
+            )
+            SELECT
+                dc.id, dc.content, dc.document_id, d.title, d.summary,
+                dc.embedding <=> %s::vector AS distance,
+                dc.chunk_index,
+                km.keyword_score
+            FROM keyword_matches km
+            JOIN document_chunks dc ON dc.id = km.id
+            JOIN documents d ON dc.document_id = d.id
+            ORDER BY km.keyword_score DESC
+        """
+
+        async with conn.cursor() as cur:
+            await cur.execute(query, (query_text, document_ids, limit, query_embedding))
+            results = await cur.fetchall()
+
+        return [
+            self._format_leg_match(result, keyword_score=result[7]) for result in results
+        ]
+
+    @staticmethod
+    def _format_leg_match(result: tuple, keyword_score: float) -> Dict[str, Any]:
+        return {
+            "chunk_id": result[0],
+            "content": result[1],
+            "document_id": result[2],
+            "document_title": result[3],
+            "document_summary": result[4],
+            "semantic_score": 1 - result[5],
+            "keyword_score": keyword_score,
+            "distance": result[5],
+            "similarity_score": 1 - result[5],  # Keep for backward compatibility
+            "chunk_index": result[6],
+        }
+
     async def search_with_context(
         self,
         query_embedding: List[float],
@@ -320,78 +756,86 @@ class HierarchicalRetrieval:
         if not result.chunks or context_window <= 0:
             return result
 
+        # Fetch the context windows of all hits in one query
+        windows = self._merge_context_windows(result.chunks, context_window)
+        window_chunks = await self.chunk_repo.get_chunk_windows(windows)
+
+        chunks_by_position = {
+            (chunk["document_id"], chunk["chunk_index"]): chunk
+            for chunk in window_chunks
+        }
+
         # Expand each chunk with context
         expanded_chunks = []
         for chunk in result.chunks:
-            expanded_chunk = await self._get_chunk_with_context(
-                chunk["chunk_id"], chunk["document_id"], context_window
+            position = chunk.get("chunk_index")
+            if position is None:
+                # Fallback: no position recorded, return just the chunk
+                context_chunks = [chunk]
+            else:
+                context_chunks = [
+                    chunks_by_position[(chunk["document_id"], index)]
+                    for index in range(position - context_window, position + context_window + 1)
+                    if (chunk["document_id"], index) in chunks_by_position
+                ]
+
+            expanded_chunks.append(
+                {
+                    "main_chunk": chunk,
+                    "context_chunks": context_chunks,
+                    "context_window_size": context_window,
+                    "total_context_chunks": len(context_chunks),
+                }
             )
-            expanded_chunks.append(expanded_chunk)
 
         # Update result with expanded chunks
         result.chunks = expanded_chunks
         return result
 
-    async def _get_chunk_with_context(
-        self, chunk_id: int, document_id: int, context_window: int
-    ) -> Dict[str, Any]:
+    @staticmethod
+    def _merge_context_windows(
+        chunks: List[Dict[str, Any]], context_window: int
+    ) -> List[tuple]:
         """
-        Get a chunk with surrounding context chunks
+        Build (document_id, start_index, end_index) ranges around each hit,
+        merging overlapping or adjacent ranges within a document
 
         Args:
-            chunk_id: ID of the main chunk
-            document_id: Document ID
+            chunks: Chunk matches with document_id and chunk_index
             context_window: Number of chunks on each side
 
         Returns:
-            Dict with main chunk and context
+            Disjoint inclusive ranges, sorted by document and start index
         """
-        # Get all chunks for the document, ordered by ID (which approximates order)
-        all_chunks = await self.chunk_repo.get_chunks_by_document_id(document_id)
-
-        # Find the index of our target chunk
-        target_idx = None
-        for i, chunk in enumerate(all_chunks):
-            if chunk["id"] == chunk_id:
-                target_idx = i
-                break
-
-        if target_idx is None:
-            # Fallback: return just the chunk
-            return await self.chunk_repo.get_chunk_by_id(chunk_id)
-
-        # Get context window
-        start_idx = max(0, target_idx - context_window)
-        end_idx = min(len(all_chunks), target_idx + context_window + 1)
-        context_chunks = all_chunks[start_idx:end_idx]
+        ranges = sorted(
+            (
+                chunk["document_id"],
+                max(0, chunk["chunk_index"] - context_window),
+                chunk["chunk_index"] + context_window,
+            )
+            for chunk in chunks
+            if chunk.get("chunk_index") is not None
+        )
 
-        # Mark the target chunk
-        target_chunk = all_chunks[target_idx]
+        merged: List[tuple] = []
+        for document_id, start, end in ranges:
+            if merged and merged[-1][0] == document_id and start <= merged[-1][2] + 1:
+                last_document_id, last_start, last_end = merged[-1]
+                merged[-1] = (last_document_id, last_start, max(last_end, end))
+            else:
+                merged.append((document_id, start, end))
 
-        return {
-            "main_chunk": target_chunk,
-            "context_chunks": context_chunks,
-            "context_window_size": context_window,
-            "total_context_chunks": len(context_chunks),
-        }
+        return merged
 
     async def get_retrieval_stats(self) -> Dict[str, Any]:
         """Get statistics about the retrieval system"""
-        # Get document and chunk counts
-        sample_docs = await self.doc_repo.get_all_documents(limit=1000)
-        total_docs = len(sample_docs)
-
-        total_chunks = 0
-        for doc in sample_docs:
-            chunk_count = await self.chunk_repo.get_chunk_count_by_document_id(
-                doc["id"]
-            )
-            total_chunks += chunk_count
+        # Totals and chunks-per-document histogram in one aggregate query
+        stats = await self.chunk_repo.get_chunk_statistics()
+        total_docs = stats["total_documents"]
 
         return {
-            "total_documents": total_docs,
-            "total_chunks": total_chunks,
-            "avg_chunks_per_document": total_chunks / total_docs
+            **stats,
+            "avg_chunks_per_document": stats["total_chunks"] / total_docs
             if total_docs > 0
             else 0,
             "stage1_threshold": self.stage1_threshold,
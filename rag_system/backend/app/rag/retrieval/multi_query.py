@@ -0,0 +1,198 @@
+"""
+Multi-query retrieval
+
+Runs hierarchical retrieval for several variations of a query (see
+QueryProcessor.expand_query_async) and fuses the results:
+- Each variation runs on its own pooled connection, all concurrently
+- Variations still running when the latency budget expires are cancelled;
+  the first variation (the user's own query) is always awaited
+- Chunk lists are fused with reciprocal rank fusion, deduplicated by chunk id,
+  and reranked once against the original query
+"""
+
+import time
+import asyncio
+import logging
+from contextlib import nullcontext
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Optional
+
+from app.db.connection import DatabaseService
+from app.rag.retrieval.hierarchical_retrieval import (
+    HierarchicalRetrieval,
+    RetrievalConfig,
+    RetrievalResult,
+    reciprocal_rank_fusion,
+)
+from app.rag.retrieval.query_processing import ProcessedQuery
+from app.rag.retrieval.semantic_cache import SemanticRetrievalCache
+from app.rag.retrieval.vector_store import MmapVectorStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class VariationTiming:
+    """Outcome of one query variation"""
+
+    query: str
+    status: str  # "completed", "cancelled" or "failed"
+    time: float
+    chunks_found: int = 0
+    error: Optional[str] = None
+
+
+class MultiQueryRetrieval:
+    """
+    Concurrent retrieval over query variations with fused results
+
+    Usage:
+        expansion = await query_processor.expand_query_async(question, 3)
+        queries = await query_processor.process_queries_async(expansion["query_variations"])
+        result = await MultiQueryRetrieval(db_service, config, reranker).search(queries)
+        print(result.query_variations)
+    """
+
+    def __init__(
+        self,
+        db_service: DatabaseService,
+        config: RetrievalConfig,
+        reranker=None,
+        semantic_cache: Optional[SemanticRetrievalCache] = None,
+        vector_store: Optional[MmapVectorStore] = None,
+        latency_budget: Optional[float] = None,
+    ):
+        """
+        Initialize multi-query retrieval
+
+        Args:
+            db_service: Pool providing one connection per running variation
+            config: Retrieval configuration for every variation
+            reranker: Reranker applied once to the fused chunks (None = no reranking)
+            semantic_cache: Shared semantic retrieval cache (used per variation)
+            vector_store: Memory-mapped store serving the variations without connections
+            latency_budget: Seconds before unfinished variations are cancelled
+                (defaults to config.multi_query_budget_seconds)
+        """
+        self.db_service = db_service
+        self.config = config
+        self.reranker = reranker if config.use_reranking else None
+        self.semantic_cache = semantic_cache
+        self.vector_store = vector_store
+        self.latency_budget = (
+            latency_budget if latency_budget is not None else config.multi_query_budget_seconds
+        )
+
+    async def search(self, queries: List[ProcessedQuery]) -> RetrievalResult:
+        """
+        Retrieve for every query variation concurrently and fuse the chunks
+
+        Args:
+            queries: Processed variations; the first one is the original query,
+                used for reranking and never cancelled
+
+        Returns:
+            Fused RetrievalResult with per-variation timings in query_variations
+        """
+        total_start = time.time()
+        if not queries:
+            raise ValueError("At least one query is required")
+
+        tasks = [asyncio.create_task(self._run_variation(query)) for query in queries]
+        finished_at: Dict[int, float] = {}
+        for index, task in enumerate(tasks):
+            task.add_done_callback(
+                lambda _, index=index: finished_at.setdefault(index, time.time() - total_start)
+            )
+        try:
+            _, pending = await asyncio.wait(tasks, timeout=self.latency_budget)
+
+            # Over budget: drop the extra variations, but keep waiting for the original
+            for task in pending:
+                if task is not tasks[0]:
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        except asyncio.CancelledError:
+            # Request cancelled: release every variation's connection
+            for task in tasks:
+                task.cancel()
+            raise
+
+        results: List[RetrievalResult] = []
+        timings: List[VariationTiming] = []
+        for index, (query, task) in enumerate(zip(queries, tasks)):
+            elapsed = finished_at.get(index, time.time() - total_start)
+            if task.cancelled():
+                timings.append(VariationTiming(query.cleaned_text, "cancelled", elapsed))
+            elif task.exception() is not None:
+                logger.warning(f"Variation '{query.cleaned_text}' failed: {task.exception()}")
+                timings.append(
+                    VariationTiming(
+                        query.cleaned_text, "failed", elapsed, error=str(task.exception())
+                    )
+                )
+            else:
+                result = task.result()
+                results.append(result)
+                timings.append(
+                    VariationTiming(
+                        query.cleaned_text, "completed", result.total_time, len(result.chunks)
+                    )
+                )
+
+        # Same failure behaviour as single-query retrieval: the original query's error
+        tasks[0].result()
+
+        fused = reciprocal_rank_fusion(
+            [result.chunks for result in results], k=self.config.rrf_k
+        )
+        chunk_limit = self.config.stage2_chunk_limit
+
+        rerank_time = 0.0
+        rerank_result = None
+        if self.reranker and fused:
+            rerank_result = await self.reranker.rerank(
+                query=queries[0].cleaned_text, chunks=fused, top_k=chunk_limit
+            )
+            chunks = rerank_result.reranked_chunks
+            rerank_time = rerank_result.rerank_time
+        else:
+            chunks = fused[:chunk_limit]
+
+        document_candidates: Dict[int, Dict[str, Any]] = {}
+        for result in results:
+            for document in result.document_candidates:
+                document_candidates.setdefault(document["id"], document)
+
+        return RetrievalResult(
+            chunks=chunks,
+            document_candidates=list(document_candidates.values()),
+            total_documents_searched=len(document_candidates),
+            total_chunks_found=len(chunks),
+            # Variations overlap, so stage times are those of the slowest variation
+            stage1_time=max(result.stage1_time for result in results),
+            stage2_time=max(result.stage2_time for result in results),
+            rerank_time=rerank_time,
+            total_time=time.time() - total_start,
+            reranked=rerank_result is not None,
+            rerank_cache_hit=rerank_result.cache_hit if rerank_result else False,
+            rerank_cache_hit_rate=rerank_result.cache_hit_rate if rerank_result else None,
+            semantic_cache_similarity=results[0].semantic_cache_similarity,
+            query_variations=[asdict(timing) for timing in timings],
+        )
+
+    async def _run_variation(self, query: ProcessedQuery) -> RetrievalResult:
+        """Unreranked retrieval for one variation on its own pooled connection"""
+        connection = (
+            nullcontext() if self.vector_store is not None else self.db_service.get_connection()
+        )
+        async with connection as conn:
+            engine = HierarchicalRetrieval.from_config(
+                conn,
+                self.config,
+                reranker=None,
+                db_service=self.db_service,
+                semantic_cache=self.semantic_cache,
+                vector_store=self.vector_store,
+            )
+            return await engine.search(query.embedding, query.cleaned_text)
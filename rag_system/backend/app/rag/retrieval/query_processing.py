@@ -1,7 +1,30 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 import re
+import asyncio
+import logging
 from app.rag.embeddings.embedding_generator import EmbeddingGenerator
+from app.rag.embeddings.embedding_batcher import EmbeddingMicroBatcher
+
+logger = logging.getLogger(__name__)
+
+# Words dropped from the keyword variation of a query
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "could", "did", "do",
+    "does", "for", "from", "how", "i", "in", "is", "it", "me", "much", "many",
+    "of", "on", "or", "our", "please", "show", "tell", "that", "the", "their",
+    "there", "this", "to", "was", "we", "were", "what", "when", "where", "which",
+    "who", "why", "will", "with", "would", "you", "your",
+}
+
+# Question openings rewritten into the phrasing a document would use
+QUESTION_REWRITES = [
+    (re.compile(r"^(what|who) (is|are|was|were) (.+)$", re.I), r"\3"),
+    (re.compile(r"^how (do|does|did|can|could|is|are) (.+)$", re.I), r"\2"),
+    (re.compile(r"^why (do|does|did|is|are|was|were) (.+)$", re.I), r"reasons for \2"),
+    (re.compile(r"^when (is|are|was|were|did|does|do) (.+)$", re.I), r"date \2"),
+    (re.compile(r"^where (is|are|was|were|did|does|do) (.+)$", re.I), r"location \2"),
+]
 
 
 @dataclass
@@ -22,13 +45,23 @@ class QueryProcessor:
     Handles:
     - Query text cleaning and preprocessing
     - Embedding generation
-    - Query expansion (future)
+    - Query expansion into variations (rule-based, or LLM rewrites)
     """
 
+    EXPANSION_PROMPT = """Rewrite the search query below into {count} different search queries for retrieving passages from a document collection. Vary the wording: use synonyms, expand abbreviations, and phrase some as statements a document would contain. Keep every rewrite specific to the original intent.
+
+Return only the rewrites, one per line, without numbering.
+
+Query: {query}"""
+
     def __init__(
         self,
         embedding_provider: str = "openai",
         embedding_api_key: Optional[str] = None,
+        expansion_model: Optional[str] = None,
+        expansion_timeout: float = 2.0,
+        batch_max_wait_ms: float = 0.0,
+        batch_max_size: int = 32,
     ):
         """
         Initialize query processor
@@ -36,10 +69,34 @@ class QueryProcessor:
         Args:
             embedding_provider: Provider for embeddings ("openai", "jina", "local")
             embedding_api_key: API key for external providers (if needed)
+            expansion_model: OpenAI model that rewrites queries in expand_query_async
+                (None = rule-based variations only)
+            expansion_timeout: Seconds to wait for LLM rewrites before falling back
+                to rule-based variations
+            batch_max_wait_ms: Coalesce concurrent process_query_async embeddings
+                into batches, waiting at most this long (0 = embed each query alone)
+            batch_max_size: Queries per embedding batch
         """
         self.embedder = EmbeddingGenerator(
             provider=embedding_provider, api_key=embedding_api_key
         )
+        self.expansion_model = expansion_model
+        self.expansion_timeout = expansion_timeout
+        self.expansion_client = None
+        if expansion_model:
+            # openai is only needed for LLM rewrites, so import it on demand
+            try:
+                from openai import AsyncOpenAI
+            except ImportError:
+                raise ImportError("OpenAI package not installed. Run: pip install openai")
+            self.expansion_client = AsyncOpenAI()
+        self.embedding_batcher = (
+            EmbeddingMicroBatcher(
+                self.embedder, max_batch_size=batch_max_size, max_wait_ms=batch_max_wait_ms
+            )
+            if batch_max_wait_ms > 0
+            else None
+        )
 
     def process_query(self, query_text: str) -> ProcessedQuery:
         """
@@ -71,6 +128,39 @@ class QueryProcessor:
             processing_time=processing_time,
         )
 
+    async def process_query_async(self, query_text: str) -> ProcessedQuery:
+        """
+        Process a user query for retrieval without blocking the event loop
+
+        Args:
+            query_text: Raw user query text
+
+        Returns:
+            ProcessedQuery with embedding and metadata
+        """
+        import time
+
+        start_time = time.time()
+
+        # Clean the query text
+        cleaned_text = self._clean_query_text(query_text)
+
+        # Generate embedding, batched with concurrent queries when enabled
+        if self.embedding_batcher:
+            embedding_result = await self.embedding_batcher.embed(cleaned_text)
+        else:
+            embedding_result = await self.embedder.embed_async(cleaned_text)
+
+        processing_time = time.time() - start_time
+
+        return ProcessedQuery(
+            original_text=query_text,
+            cleaned_text=cleaned_text,
+            embedding=embedding_result.embedding,
+            tokens_used=embedding_result.tokens_used,
+            processing_time=processing_time,
+        )
+
     def _clean_query_text(self, text: str) -> str:
         """
         Clean and preprocess query text
@@ -103,31 +193,143 @@ class QueryProcessor:
 
         return cleaned
 
-    def expand_query(self, query_text: str) -> Dict[str, Any]:
+    def expand_query(self, query_text: str, num_variations: int = 3) -> Dict[str, Any]:
         """
-        Basic query expansion (placeholder for future enhancement)
+        Rule-based query expansion
+
+        Variations, in order: the cleaned query, its keywords (stopwords and
+        question words removed) and a declarative rewrite of a question.
+        Duplicates are dropped, so fewer than num_variations may be returned.
 
         Args:
             query_text: Original query text
+            num_variations: Maximum variations, including the cleaned query
 
         Returns:
             Dict with original and expanded queries
         """
-        # For now, just return the original query
-        # In the future, this could:
-        # - Add synonyms
-        # - Generate related terms
-        # - Create multiple query variations
-
         cleaned = self._clean_query_text(query_text)
 
+        words = re.findall(r"[\w'-]+", cleaned)
+        keywords = [word for word in words if word.lower() not in STOPWORDS]
+
+        candidates = [cleaned, " ".join(keywords), self._declarative_rewrite(cleaned)]
+
         return {
             "original": query_text,
             "cleaned": cleaned,
-            "expanded_terms": [],  # Future: add synonyms, related terms
-            "query_variations": [cleaned],  # Future: add multiple variations
+            "expanded_terms": keywords,
+            "query_variations": self._unique_variations(candidates, num_variations),
         }
 
+    async def expand_query_async(
+        self, query_text: str, num_variations: int = 3
+    ) -> Dict[str, Any]:
+        """
+        Query expansion with LLM rewrites when an expansion_model is configured
+
+        The cleaned query is always the first variation. Falls back to the
+        rule-based variations of expand_query if the LLM call fails or takes
+        longer than expansion_timeout.
+
+        Args:
+            query_text: Original query text
+            num_variations: Maximum variations, including the cleaned query
+
+        Returns:
+            Dict with original and expanded queries, and the "expansion" method used
+        """
+        expansion = self.expand_query(query_text, num_variations)
+        expansion["expansion"] = "rules"
+        if self.expansion_client is None or num_variations <= 1:
+            return expansion
+
+        try:
+            rewrites = await asyncio.wait_for(
+                self._llm_rewrites(expansion["cleaned"], num_variations - 1),
+                timeout=self.expansion_timeout,
+            )
+        except Exception as e:
+            logger.warning(f"LLM query expansion failed, using rule-based variations: {e}")
+            return expansion
+
+        expansion["query_variations"] = self._unique_variations(
+            [expansion["cleaned"], *rewrites, *expansion["query_variations"]],
+            num_variations,
+        )
+        expansion["expansion"] = "llm"
+        return expansion
+
+    async def _llm_rewrites(self, query: str, count: int) -> List[str]:
+        # No temperature or max_output_tokens: reasoning models reject the former
+        # and spend the latter on reasoning; expansion_timeout bounds the call
+        response = await self.expansion_client.responses.create(
+            model=self.expansion_model,
+            input=self.EXPANSION_PROMPT.format(count=count, query=query),
+        )
+        # output_text joins the message outputs, skipping reasoning items
+        lines = response.output_text.splitlines()
+        rewrites = [self._clean_query_text(line.lstrip("-*0123456789. ")) for line in lines]
+        rewrites = [rewrite for rewrite in rewrites if rewrite]
+        if not rewrites:
+            raise ValueError(f"No rewrites in response (status: {response.status})")
+        return rewrites
+
+    @staticmethod
+    def _declarative_rewrite(query: str) -> str:
+        """'What is X?' -> 'X', 'Why did X?' -> 'reasons for X', ..."""
+        stripped = query.rstrip("?").strip()
+        for pattern, replacement in QUESTION_REWRITES:
+            if pattern.match(stripped):
+                return pattern.sub(replacement, stripped)
+        return stripped
+
+    @staticmethod
+    def _unique_variations(candidates: List[str], limit: int) -> List[str]:
+        """Non-empty candidates, first occurrence of each (case-insensitive), up to limit"""
+        variations: List[str] = []
+        seen = set()
+        for candidate in candidates:
+            key = candidate.lower().rstrip("?. ")
+            if candidate and key and key not in seen:
+                seen.add(key)
+                variations.append(candidate)
+        return variations[: max(1, limit)]
+
+    async def process_queries_async(self, queries: List[str]) -> List[ProcessedQuery]:
+        """
+        Process several query texts (e.g. expansion variations) with one batch
+        embedding call
+
+        Args:
+            queries: Query texts
+
+        Returns:
+            ProcessedQuery per query, in input order
+        """
+        import time
+
+        if not queries:
+            return []
+
+        start_time = time.time()
+        cleaned_queries = [self._clean_query_text(q) for q in queries]
+        batch_result = await self.embedder.embed_batch_async(cleaned_queries)
+        processing_time = time.time() - start_time
+
+        return [
+            ProcessedQuery(
+                original_text=original,
+                cleaned_text=cleaned,
+                embedding=result.embedding,
+                tokens_used=result.tokens_used,
+                processing_time=processing_time,
+            )
+            for original, cleaned, result in zip(
+                queries, cleaned_queries, batch_result.individual_results
+            )
+        ]
+
     def analyze_query_intent(self, query_text: str) -> Dict[str, Any]:
         """
         Analyze query intent and characteristics
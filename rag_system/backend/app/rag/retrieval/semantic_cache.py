@@ -0,0 +1,250 @@
+"""
+Semantic retrieval cache
+
+Caches RetrievalResults by query embedding so paraphrased questions
+("Q3 revenue?" / "what was revenue in Q3") reuse an earlier retrieval:
+- Query embeddings are kept as unit rows of a preallocated float32 matrix;
+  a lookup is one matrix-vector product and an argmax (cosine top-1)
+- A hit needs cosine similarity >= similarity_threshold
+- LRU eviction when full, optional TTL per entry
+- Cleared when documents or chunks change (NOTIFY from the V7 triggers,
+  see SemanticRetrievalCache.listen_for_changes); results computed before a
+  clear are not stored (see SemanticRetrievalCache.generation)
+"""
+
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, replace
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
+
+import numpy as np
+
+from app.db.connection import DatabaseService
+
+if TYPE_CHECKING:
+    from app.rag.retrieval.hierarchical_retrieval import RetrievalResult
+
+logger = logging.getLogger(__name__)
+
+# Channel used by the notify_documents_changed trigger (V7 migration)
+DOCUMENT_CHANGES_CHANNEL = "documents_changed"
+
+
+@dataclass
+class SemanticCacheStats:
+    """Counters for semantic cache activity"""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+class SemanticRetrievalCache:
+    """
+    In-memory cache of retrieval results looked up by query embedding similarity
+
+    Used from the event loop only, so no locking is needed.
+
+    Usage:
+        cache = SemanticRetrievalCache(similarity_threshold=0.95)
+        retrieval = HierarchicalRetrieval(conn, semantic_cache=cache)
+        listener = asyncio.create_task(cache.listen_for_changes(db_service))
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        max_entries: int = 1_000,
+        ttl_seconds: Optional[float] = 3600,
+    ):
+        """
+        Initialize semantic cache
+
+        Args:
+            similarity_threshold: Minimum cosine similarity between query embeddings
+                for a hit. Questions that differ only in a number or date ("Q3" vs
+                "Q4") can score above 0.9, so keep this high.
+            max_entries: Maximum cached results (rows of the embedding matrix)
+            ttl_seconds: Time-to-live for entries (None = never expire)
+        """
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        # Allocated on first store, once the embedding dimension is known
+        self._matrix: Optional[np.ndarray] = None
+        self._occupied = np.zeros(max_entries, dtype=bool)
+        self._expires_at = np.full(max_entries, np.inf)
+        self._last_used = np.zeros(max_entries)
+        self._results: List[Optional["RetrievalResult"]] = [None] * max_entries
+        self.stats = SemanticCacheStats()
+        # Bumped by clear(); a retrieval captures it before lookup() and passes it
+        # to store(), so a result computed across an invalidation is not cached
+        self.generation = 0
+
+    def lookup(self, query_embedding: List[float]) -> Optional["RetrievalResult"]:
+        """
+        Find the cached result of the most similar earlier query
+
+        Returns:
+            A copy of the cached RetrievalResult with semantic_cache_similarity set,
+            or None on a miss
+        """
+        if self._matrix is None or not self._occupied.any():
+            self.stats.misses += 1
+            return None
+
+        query = self._normalize(query_embedding)
+        if query is None or query.shape[0] != self._matrix.shape[1]:
+            self.stats.misses += 1
+            return None
+
+        similarities = self._matrix @ query
+        similarities[~self._occupied] = -np.inf
+        slot = int(np.argmax(similarities))
+        similarity = float(similarities[slot])
+
+        if similarity < self.similarity_threshold:
+            self.stats.misses += 1
+            return None
+
+        now = time.monotonic()
+        if self._expires_at[slot] <= now:
+            self._remove(slot)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+
+        self._last_used[slot] = now
+        self.stats.hits += 1
+        return replace(
+            self._results[slot],
+            chunks=list(self._results[slot].chunks),
+            document_candidates=list(self._results[slot].document_candidates),
+            semantic_cache_similarity=similarity,
+        )
+
+    def store(
+        self,
+        query_embedding: List[float],
+        result: "RetrievalResult",
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Cache a result, evicting the least recently used entry if full
+
+        Args:
+            query_embedding: Embedding of the query the result answers
+            result: Retrieval result to cache
+            generation: self.generation read before the retrieval started; the
+                result is dropped if the cache was cleared since
+        """
+        if generation is not None and generation != self.generation:
+            return
+
+        query = self._normalize(query_embedding)
+        if query is None:
+            return
+
+        if self._matrix is None or self._matrix.shape[1] != query.shape[0]:
+            # First entry, or the embedding model changed: start over
+            self._matrix = np.zeros((self.max_entries, query.shape[0]), dtype=np.float32)
+            self.clear()
+
+        free_slots = np.flatnonzero(~self._occupied)
+        if free_slots.size:
+            slot = int(free_slots[0])
+        else:
+            slot = int(np.argmin(self._last_used))
+            self.stats.evictions += 1
+
+        now = time.monotonic()
+        self._matrix[slot] = query
+        self._occupied[slot] = True
+        self._expires_at[slot] = now + self.ttl_seconds if self.ttl_seconds is not None else np.inf
+        self._last_used[slot] = now
+        # Shallow copy: callers (e.g. search_with_context) replace result.chunks
+        self._results[slot] = replace(
+            result,
+            chunks=list(result.chunks),
+            document_candidates=list(result.document_candidates),
+        )
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept) and invalidate in-flight retrievals"""
+        self.generation += 1
+        self._occupied[:] = False
+        self._expires_at[:] = np.inf
+        self._last_used[:] = 0
+        self._results = [None] * self.max_entries
+
+    def __len__(self) -> int:
+        return int(self._occupied.sum())
+
+    async def listen_for_changes(
+        self, db_service: DatabaseService, retry_delay: float = 5.0
+    ) -> None:
+        """
+        Clear the cache on document / chunk change notifications until cancelled
+
+        Any insert can make a new document the best answer to a cached question,
+        so every change clears all entries rather than only those referencing
+        the changed documents. Reconnects after retry_delay seconds if the
+        listening connection drops; changes made while disconnected are never
+        notified, so the cache is cleared on every (re)subscribe as well.
+        """
+        while True:
+            try:
+                async for table in db_service.listen(
+                    DOCUMENT_CHANGES_CHANNEL, on_listen=self.invalidate
+                ):
+                    if len(self):
+                        logger.info(f"{table} changed, clearing {len(self)} cached retrievals")
+                    self.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Document change listener failed, retrying in {retry_delay}s: {e}")
+            await asyncio.sleep(retry_delay)
+
+    def invalidate(self) -> None:
+        """Clear entries after a (possible) document change"""
+        self.clear()
+        self.stats.invalidations += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters and usage"""
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "similarity_threshold": self.similarity_threshold,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "evictions": self.stats.evictions,
+            "expirations": self.stats.expirations,
+            "invalidations": self.stats.invalidations,
+            "hit_rate": self.stats.hit_rate,
+        }
+
+    def _remove(self, slot: int) -> None:
+        self._occupied[slot] = False
+        self._expires_at[slot] = np.inf
+        self._last_used[slot] = 0
+        self._results[slot] = None
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
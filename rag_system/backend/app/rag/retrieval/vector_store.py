@@ -0,0 +1,519 @@
+"""
+Memory-mapped vector store
+
+In-process alternative to the Postgres vector search of HierarchicalRetrieval
+for read-heavy deployments:
+- Document summary and chunk embeddings are exported once into .npy matrices
+  (float16 or float32, rows L2-normalized so a dot product is the cosine
+  similarity) with sidecars for ids, document ids, chunk positions and text
+- Files are opened with np.load(mmap_mode="r"), so every uvicorn worker maps
+  the same page-cache pages instead of holding its own copy
+- Chunk rows are sorted by document id within a segment, so the chunks of the
+  stage 1 candidates are contiguous row ranges found with np.searchsorted
+- Top-k is a blocked matrix-vector product followed by np.argpartition
+- New documents and chunks are exported as append segments; workers pick up
+  the new manifest on their next search (see MmapVectorStore.refresh)
+
+Layout:
+    <path>/manifest.json
+    <path>/segment-00000/documents.vectors.npy, documents.ids.npy,
+        documents.title.bin/.offsets.npy, documents.summary.bin/.offsets.npy
+    <path>/segment-00000/chunks.vectors.npy, chunks.ids.npy, chunks.document_ids.npy,
+        chunks.chunk_index.npy, chunks.content.bin/.offsets.npy
+
+Segments are append-only: updated or deleted rows are only reflected after a
+full export (export(conn) without append), which replaces all segments.
+"""
+
+import os
+import json
+import time
+import shutil
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from psycopg import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+
+
+class TextColumn:
+    """Variable-length UTF-8 strings stored as one byte blob plus row offsets"""
+
+    def __init__(self, directory: str, name: str):
+        self.offsets = np.load(os.path.join(directory, f"{name}.offsets.npy"), mmap_mode="r")
+        blob_path = os.path.join(directory, f"{name}.bin")
+        # np.memmap cannot map an empty file
+        if os.path.getsize(blob_path) > 0:
+            self.blob = np.memmap(blob_path, dtype=np.uint8, mode="r")
+        else:
+            self.blob = np.zeros(0, dtype=np.uint8)
+
+    def __getitem__(self, row: int) -> str:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return self.blob[start:end].tobytes().decode("utf-8")
+
+
+class TextColumnWriter:
+    """Streams strings to a TextColumn's blob and collects their offsets"""
+
+    def __init__(self, directory: str, name: str):
+        self.directory = directory
+        self.name = name
+        self._file = open(os.path.join(directory, f"{name}.bin"), "wb")
+        self._offsets = [0]
+
+    def append(self, text: Optional[str]) -> None:
+        data = (text or "").encode("utf-8")
+        self._file.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+
+    def close(self) -> None:
+        self._file.close()
+        np.save(
+            os.path.join(self.directory, f"{self.name}.offsets.npy"),
+            np.asarray(self._offsets, dtype=np.int64),
+        )
+
+
+class Segment:
+    """One exported segment, memory-mapped read-only"""
+
+    def __init__(self, directory: str, info: Dict[str, Any]):
+        self.name = info["name"]
+        documents, chunks = info["documents"], info["chunks"]
+
+        def load(file_name: str, rows: int) -> np.ndarray:
+            # Rows beyond the exported count (rows deleted during export) are unused
+            return np.load(os.path.join(directory, file_name), mmap_mode="r")[:rows]
+
+        self.document_vectors = load("documents.vectors.npy", documents)
+        self.document_ids = load("documents.ids.npy", documents)
+        self.titles = TextColumn(directory, "documents.title")
+        self.summaries = TextColumn(directory, "documents.summary")
+
+        self.chunk_vectors = load("chunks.vectors.npy", chunks)
+        self.chunk_ids = load("chunks.ids.npy", chunks)
+        self.chunk_document_ids = load("chunks.document_ids.npy", chunks)
+        self.chunk_indexes = load("chunks.chunk_index.npy", chunks)
+        self.contents = TextColumn(directory, "chunks.content")
+
+    def document_rows(self, document_ids: np.ndarray) -> np.ndarray:
+        """Rows of the chunks belonging to the documents (contiguous range per document)"""
+        starts = np.searchsorted(self.chunk_document_ids, document_ids, side="left")
+        ends = np.searchsorted(self.chunk_document_ids, document_ids, side="right")
+        ranges = [np.arange(start, end) for start, end in zip(starts, ends) if end > start]
+        return np.concatenate(ranges) if ranges else np.zeros(0, dtype=np.int64)
+
+
+class MmapVectorStore:
+    """
+    Read-only memory-mapped embedding matrices answering stage 1 and stage 2
+    vector search in-process
+
+    Usage:
+        store = MmapVectorStore("/var/lib/rag/vectors")
+        async with db_service.get_connection() as conn:
+            await store.export(conn)               # full export
+            await store.export(conn, append=True)  # new rows only
+        retrieval = HierarchicalRetrieval(conn, vector_store=store)
+    """
+
+    DTYPES = ("float16", "float32")
+
+    def __init__(
+        self,
+        path: str,
+        dtype: str = "float16",
+        block_size: int = 16_384,
+        refresh_interval: float = 5.0,
+    ):
+        """
+        Initialize the store (segments are mapped if the manifest exists)
+
+        Args:
+            path: Directory holding the manifest and segment directories
+            dtype: Element type of exported matrices: "float16" (half the page
+                cache, scores to ~3 decimal places) or "float32"
+            block_size: Rows converted to float32 and scored per matrix-vector product
+            refresh_interval: Seconds between checks for a new manifest (appends)
+        """
+        if dtype not in self.DTYPES:
+            available = ", ".join(self.DTYPES)
+            raise ValueError(f"Unknown dtype '{dtype}'. Available: {available}")
+
+        self.path = path
+        self.dtype = dtype
+        self.block_size = block_size
+        self.refresh_interval = refresh_interval
+
+        self.segments: List[Segment] = []
+        self.mapped_dtype: Optional[str] = None
+        self._manifest_version: Optional[Tuple[int, int]] = None
+        self._last_refresh = 0.0
+        self.refresh(force=True)
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.path, MANIFEST_FILE)
+
+    def is_available(self) -> bool:
+        return bool(self.segments)
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Map the segments of the current manifest if it changed since the last check
+
+        Returns:
+            True if the segment list was reloaded
+        """
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.refresh_interval:
+            return False
+        self._last_refresh = now
+
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return False
+        # os.replace gives every new manifest a new inode
+        version = (stat.st_ino, stat.st_mtime_ns)
+        if version == self._manifest_version:
+            return False
+
+        manifest = self._read_manifest()
+        # Previous segments stay mapped by in-flight searches until released
+        self.segments = [
+            Segment(os.path.join(self.path, info["name"]), info)
+            for info in manifest["segments"]
+        ]
+        self.mapped_dtype = manifest["dtype"]
+        self._manifest_version = version
+        logger.info(
+            f"Mapped {len(self.segments)} vector store segments from {self.path}"
+        )
+        return True
+
+    def search_documents(
+        self, query_embedding: List[float], limit: int, similarity_threshold: float
+    ) -> List[Dict[str, Any]]:
+        """
+        Stage 1: top documents by summary similarity (vector only, no keyword match)
+
+        Returns:
+            Candidates in the format of HierarchicalRetrieval stage 1
+        """
+        self.refresh()
+        query = self._normalize(query_embedding)
+
+        candidates: List[Tuple[float, Segment, int]] = []
+        for segment in self.segments:
+            rows = np.arange(segment.document_vectors.shape[0])
+            for score, row in self._top_k(segment.document_vectors, rows, query, limit):
+                if score >= similarity_threshold:
+                    candidates.append((score, segment, row))
+
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        return [
+            {
+                "id": int(segment.document_ids[row]),
+                "title": segment.titles[row],
+                "summary": segment.summaries[row],
+                "similarity_score": score,
+                "distance": 1 - score,
+            }
+            for score, segment, row in candidates[:limit]
+        ]
+
+    def search_chunks(
+        self, query_embedding: List[float], document_ids: List[int], limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Stage 2: top chunks of the candidate documents by embedding similarity
+
+        Returns:
+            Chunk matches in the format of HierarchicalRetrieval stage 2
+            (keyword_score 0, hybrid_score = semantic_score)
+        """
+        self.refresh()
+        query = self._normalize(query_embedding)
+        candidate_ids = np.unique(np.asarray(document_ids, dtype=np.int64))
+
+        matches: List[Tuple[float, Segment, int]] = []
+        for segment in self.segments:
+            rows = segment.document_rows(candidate_ids)
+            for score, row in self._top_k(segment.chunk_vectors, rows, query, limit):
+                matches.append((score, segment, row))
+
+        matches.sort(key=lambda match: match[0], reverse=True)
+        matches = matches[:limit]
+
+        documents = self._documents_by_id(
+            {int(segment.chunk_document_ids[row]) for _, segment, row in matches}
+        )
+
+        chunk_matches = []
+        for score, segment, row in matches:
+            document_id = int(segment.chunk_document_ids[row])
+            title, summary = documents.get(document_id, ("", ""))
+            chunk_index = int(segment.chunk_indexes[row])
+            chunk_matches.append(
+                {
+                    "chunk_id": int(segment.chunk_ids[row]),
+                    "content": segment.contents[row],
+                    "document_id": document_id,
+                    "document_title": title,
+                    "document_summary": summary,
+                    "semantic_score": score,
+                    "keyword_score": 0,
+                    "distance": 1 - score,
+                    "hybrid_score": score,
+                    "similarity_score": score,  # Keep for backward compatibility
+                    "chunk_index": chunk_index if chunk_index >= 0 else None,
+                }
+            )
+
+        return chunk_matches
+
+    def _top_k(
+        self, vectors: np.ndarray, rows: np.ndarray, query: np.ndarray, k: int
+    ) -> List[Tuple[float, int]]:
+        """Best k (score, row) pairs among rows, scored block by block"""
+        if rows.size == 0 or k <= 0:
+            return []
+
+        scores = np.empty(rows.size, dtype=np.float32)
+        contiguous = rows[-1] - rows[0] + 1 == rows.size
+        for start in range(0, rows.size, self.block_size):
+            end = min(start + self.block_size, rows.size)
+            # Slices of a contiguous range stay views of the mapping; otherwise
+            # fancy indexing reads only the candidate rows
+            if contiguous:
+                block = vectors[rows[start]:rows[start] + (end - start)]
+            else:
+                block = vectors[rows[start:end]]
+            scores[start:end] = block.astype(np.float32, copy=False) @ query
+
+        if k < scores.size:
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(scores.size)
+        best = best[np.argsort(-scores[best])]
+        return [(float(scores[i]), int(rows[i])) for i in best]
+
+    def _documents_by_id(self, document_ids: set) -> Dict[int, Tuple[str, str]]:
+        """(title, summary) of documents, looked up in the id-sorted document sidecars"""
+        documents = {}
+        wanted = np.asarray(sorted(document_ids), dtype=np.int64)
+        for segment in self.segments:
+            if wanted.size == 0 or segment.document_ids.size == 0:
+                continue
+            rows = np.searchsorted(segment.document_ids, wanted)
+            for document_id, row in zip(wanted, rows):
+                if row < segment.document_ids.size and segment.document_ids[row] == document_id:
+                    documents[int(document_id)] = (segment.titles[row], segment.summaries[row])
+        return documents
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    # --- Export -------------------------------------------------------------
+
+    async def export(self, conn: AsyncConnection, append: bool = False) -> Dict[str, Any]:
+        """
+        Export embeddings from Postgres into a new segment
+
+        Args:
+            conn: Database connection (rows are streamed with a server-side cursor)
+            append: Only export documents and chunks with ids above those of the
+                existing segments; otherwise replace all segments
+
+        Returns:
+            Manifest entry of the new segment
+        """
+        os.makedirs(self.path, exist_ok=True)
+        manifest = self._read_manifest() if append else None
+        if manifest is not None and manifest["dtype"] != self.dtype:
+            raise ValueError(
+                f"Cannot append {self.dtype} segment to a {manifest['dtype']} store"
+            )
+        segments = manifest["segments"] if manifest else []
+
+        since_document_id = max((s["max_document_id"] for s in segments), default=0)
+        since_chunk_id = max((s["max_chunk_id"] for s in segments), default=0)
+
+        existing = self._existing_segments()
+        number = max((int(existing_name.split("-")[1]) for existing_name in existing), default=-1)
+        name = f"segment-{number + 1:05d}"
+        directory = os.path.join(self.path, name)
+        os.makedirs(directory)
+
+        try:
+            documents, max_document_id = await self._export_documents(
+                conn, directory, since_document_id
+            )
+            chunks, max_chunk_id = await self._export_chunks(conn, directory, since_chunk_id)
+            await conn.commit()
+        except Exception:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+
+        info = {
+            "name": name,
+            "documents": documents,
+            "chunks": chunks,
+            "max_document_id": max(max_document_id, since_document_id),
+            "max_chunk_id": max(max_chunk_id, since_chunk_id),
+        }
+        replaced = [] if append else existing
+        self._write_manifest({"dtype": self.dtype, "segments": segments + [info]})
+
+        # Workers still mapping old segments keep their pages until they refresh
+        for old_name in replaced:
+            shutil.rmtree(os.path.join(self.path, old_name), ignore_errors=True)
+
+        self.refresh(force=True)
+        return info
+
+    async def _export_documents(
+        self, conn: AsyncConnection, directory: str, since_id: int
+    ) -> Tuple[int, int]:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT COUNT(*), COALESCE(MAX(id), 0) FROM documents
+                WHERE id > %s AND summary_embedding IS NOT NULL
+                """,
+                (since_id,),
+            )
+            count, max_id = await cur.fetchone()
+
+        query = """
+            SELECT id, title, summary, summary_embedding::real[]
+            FROM documents
+            WHERE id > %s AND id <= %s AND summary_embedding IS NOT NULL
+            ORDER BY id
+        """
+        vectors, ids = self._open_matrices(directory, "documents", count)
+        titles = TextColumnWriter(directory, "documents.title")
+        summaries = TextColumnWriter(directory, "documents.summary")
+
+        row = 0
+        async with conn.cursor(name="vector_store_documents") as cur:
+            await cur.execute(query, (since_id, max_id))
+            async for document_id, title, summary, embedding in cur:
+                if row == count:
+                    break
+                vectors[row] = self._normalize(embedding)
+                ids[row] = document_id
+                titles.append(title)
+                summaries.append(summary)
+                row += 1
+
+        vectors.flush()
+        ids.flush()
+        titles.close()
+        summaries.close()
+        return row, max_id
+
+    async def _export_chunks(
+        self, conn: AsyncConnection, directory: str, since_id: int
+    ) -> Tuple[int, int]:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM document_chunks WHERE id > %s",
+                (since_id,),
+            )
+            count, max_id = await cur.fetchone()
+
+        # Sorted by document so each document's chunks are one row range
+        query = """
+            SELECT id, document_id, chunk_index, content, embedding::real[]
+            FROM document_chunks
+            WHERE id > %s AND id <= %s
+            ORDER BY document_id, chunk_index, id
+        """
+        vectors, ids = self._open_matrices(directory, "chunks", count)
+        document_ids = np.lib.format.open_memmap(
+            os.path.join(directory, "chunks.document_ids.npy"),
+            mode="w+", dtype=np.int64, shape=(count,),
+        )
+        chunk_indexes = np.lib.format.open_memmap(
+            os.path.join(directory, "chunks.chunk_index.npy"),
+            mode="w+", dtype=np.int64, shape=(count,),
+        )
+        contents = TextColumnWriter(directory, "chunks.content")
+
+        row = 0
+        async with conn.cursor(name="vector_store_chunks") as cur:
+            await cur.execute(query, (since_id, max_id))
+            async for chunk_id, document_id, chunk_index, content, embedding in cur:
+                if row == count:
+                    break
+                vectors[row] = self._normalize(embedding)
+                ids[row] = chunk_id
+                document_ids[row] = document_id
+                chunk_indexes[row] = chunk_index if chunk_index is not None else -1
+                contents.append(content)
+                row += 1
+
+        for array in (vectors, ids, document_ids, chunk_indexes):
+            array.flush()
+        contents.close()
+        return row, max_id
+
+    def _open_matrices(
+        self, directory: str, table: str, count: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # Written through a mapping so the export never holds the matrix in memory
+        vectors = np.lib.format.open_memmap(
+            os.path.join(directory, f"{table}.vectors.npy"),
+            mode="w+", dtype=self.dtype, shape=(count, 1536),
+        )
+        ids = np.lib.format.open_memmap(
+            os.path.join(directory, f"{table}.ids.npy"),
+            mode="w+", dtype=np.int64, shape=(count,),
+        )
+        return vectors, ids
+
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        # Atomic replace: readers see either the old or the new manifest
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _existing_segments(self) -> List[str]:
+        return sorted(
+            name
+            for name in os.listdir(self.path)
+            if name.startswith("segment-") and os.path.isdir(os.path.join(self.path, name))
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get segment counts and mapped sizes"""
+        documents = sum(s.document_vectors.shape[0] for s in self.segments)
+        chunks = sum(s.chunk_vectors.shape[0] for s in self.segments)
+        return {
+            "path": self.path,
+            "dtype": self.mapped_dtype,
+            "segments": len(self.segments),
+            "documents": documents,
+            "chunks": chunks,
+            "vector_bytes": sum(
+                s.document_vectors.nbytes + s.chunk_vectors.nbytes for s in self.segments
+            ),
+        }
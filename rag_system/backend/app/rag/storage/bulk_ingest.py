@@ -0,0 +1,431 @@
+"""
+Multi-core bulk ingestion of document directories
+
+Pipeline:
+1. Parse (PDF -> markdown) and chunk in a process pool sized to the CPU count
+2. Hand parsed documents to async writers through a bounded queue, so parsing
+   pauses when embedding / inserting falls behind
+3. Writers summarize, embed and insert each document via DocumentStore, each on
+   its own pooled connection
+4. Every document is recorded in a JSONL manifest (with its document id
+   before the insert commits, and again once stored), so a crashed or
+   interrupted run resumes where it stopped; files edited since they were
+   ingested, or stored just before a crash, update their existing document
+   instead of adding a second one
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+from pathlib import Path
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Union
+
+from app.db.connection import DatabaseService
+from app.rag.chunking.markdown_chunker import GFMContextPathChunker, ChunkerOptions
+from app.rag.embeddings.embedding_generator import EmbeddingGenerator
+from app.rag.storage.document_store import DocumentStore
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = (".md", ".pdf")
+
+
+@dataclass
+class ParsedDocument:
+    """Output of the parse + chunk stage for one file"""
+
+    path: str
+    title: str
+    content_hash: str
+    content: str
+    chunk_texts: List[str]
+    parse_time: float
+
+
+@dataclass
+class BulkIngestResult:
+    """Summary of a bulk ingestion run"""
+
+    total_files: int
+    ingested: int
+    skipped: int
+    failed: int
+    total_chunks: int
+    elapsed_time: float
+    updated: int = 0  # of ingested, files that replaced their previous document
+    failures: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def documents_per_minute(self) -> float:
+        return self.ingested / self.elapsed_time * 60 if self.elapsed_time > 0 else 0.0
+
+
+class IngestManifest:
+    """
+    Append-only JSONL log of files already ingested, keyed by path
+
+    Entries store the file's content hash, so a file edited since it was
+    ingested is picked up again on the next run, and the id of the document it
+    was stored as, which that run updates.
+
+    record() appends one line, so writing N entries costs O(N) bytes. The log
+    is replayed on load (the last line per path wins) and compacted when most
+    of its lines are superseded or a crash left a partial line.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            self._replay()
+
+    def is_done(self, file_path: str, content_hash: str) -> bool:
+        entry = self.entries.get(file_path)
+        return (
+            entry is not None
+            and entry.get("status") == "done"
+            and entry.get("content_hash") == content_hash
+        )
+
+    def get_document_id(self, file_path: str) -> Optional[int]:
+        """Document id a file was last stored as (None if never stored)"""
+        entry = self.entries.get(file_path)
+        return entry.get("document_id") if entry else None
+
+    def record(self, file_path: str, **entry: Any) -> None:
+        """Record a file's outcome and append it to the log"""
+        self.entries[file_path] = {**entry, "updated_at": time.time()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"path": file_path, **self.entries[file_path]}) + "\n")
+
+    def compact(self) -> None:
+        """Rewrite the log with one line per path"""
+        # Write to a temp file and rename so a crash never leaves a truncated manifest
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for file_path, entry in self.entries.items():
+                f.write(json.dumps({"path": file_path, **entry}) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def _replay(self) -> None:
+        lines = 0
+        damaged = False
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                lines += 1
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Partial line from a crash mid-append
+                    damaged = True
+                    continue
+                self.entries[entry.pop("path")] = entry
+
+        if damaged or lines > 2 * len(self.entries):
+            self.compact()
+
+
+def hash_file(path: Union[str, Path]) -> str:
+    """sha256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def title_from_path(path: Union[str, Path]) -> str:
+    """Use filename without extension as title (same as the store_document example)"""
+    return Path(path).stem.replace("_", " ").replace("-", " ").title()
+
+
+# Per-process chunker, created once by the pool initializer
+_worker_chunker: Optional[GFMContextPathChunker] = None
+
+
+def _init_worker(chunker_options: ChunkerOptions) -> None:
+    global _worker_chunker
+    _worker_chunker = GFMContextPathChunker(chunker_options)
+
+
+def parse_and_chunk(path: str, content_hash: str) -> ParsedDocument:
+    """
+    Parse a file to markdown and chunk it (runs in a worker process)
+
+    Args:
+        path: Markdown or PDF file path
+        content_hash: Hash of the file, passed through to the manifest
+    """
+    start_time = time.time()
+    title = title_from_path(path)
+
+    if path.lower().endswith(".pdf"):
+        # pymupdf4llm is only needed (and imported) for PDFs
+        from app.rag.parsers.pdf_parser import PDFParser
+
+        content = PDFParser().parse_to_markdown(path)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+
+    chunk_texts = _worker_chunker.chunk(content, title)
+
+    return ParsedDocument(
+        path=path,
+        title=title,
+        content_hash=content_hash,
+        content=content,
+        chunk_texts=chunk_texts,
+        parse_time=time.time() - start_time,
+    )
+
+
+class BulkIngestor:
+    """
+    Ingest every supported file in a directory using all available cores
+
+    Usage:
+        ingestor = BulkIngestor(db_service, manifest_path=".cache/ingest_manifest.jsonl")
+        result = await ingestor.ingest_directory("app/rag/documents")
+        print(result.documents_per_minute)
+    """
+
+    def __init__(
+        self,
+        db_service: DatabaseService,
+        manifest_path: Union[str, Path] = ".cache/ingest_manifest.jsonl",
+        embedding_provider: str = "openai",
+        embedding_store_path: Optional[str] = None,
+        max_chunk_tokens: int = 512,
+        max_chunk_words: int = 200,
+        use_llm_summary: bool = True,
+        llm_model: str = "gpt-4o-mini",
+        parse_workers: Optional[int] = None,
+        writer_count: int = 4,
+        queue_size: int = 8,
+        extensions: tuple = SUPPORTED_EXTENSIONS,
+    ):
+        """
+        Initialize bulk ingestor
+
+        Args:
+            db_service: Initialized DatabaseService (pool max_size should be >= writer_count)
+            manifest_path: JSONL manifest used to skip already ingested files
+            embedding_provider: Provider for embeddings ("openai", "jina", "local")
+            embedding_store_path: Optional SQLite path of the persistent embedding store
+            max_chunk_tokens: Maximum tokens per chunk
+            max_chunk_words: Maximum words per chunk
+            use_llm_summary: Whether to use LLM for summary generation
+            llm_model: OpenAI model for summary generation
+            parse_workers: Parse/chunk processes (default: CPU count)
+            writer_count: Concurrent summarize/embed/insert writers
+            queue_size: Parsed documents buffered ahead of the writers
+            extensions: File extensions to ingest
+        """
+        self.db_service = db_service
+        self.manifest = IngestManifest(manifest_path)
+        self.chunker_options = ChunkerOptions(
+            max_tokens_per_chunk=max_chunk_tokens, max_words_per_chunk=max_chunk_words
+        )
+        self.max_chunk_tokens = max_chunk_tokens
+        self.max_chunk_words = max_chunk_words
+        self.use_llm_summary = use_llm_summary
+        self.llm_model = llm_model
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.writer_count = writer_count
+        self.queue_size = queue_size
+        self.extensions = tuple(ext.lower() for ext in extensions)
+
+        # One embedder shared by all writers (one provider client, one cache)
+        self.embedder = EmbeddingGenerator(
+            provider=embedding_provider, store_path=embedding_store_path
+        )
+
+    def find_files(self, directory: Union[str, Path]) -> List[Path]:
+        """Find supported files in a directory (recursively)"""
+        directory = Path(directory)
+        return sorted(
+            path
+            for path in directory.rglob("*")
+            if path.is_file() and path.suffix.lower() in self.extensions
+        )
+
+    async def ingest_directory(self, directory: Union[str, Path]) -> BulkIngestResult:
+        """
+        Ingest all supported files in a directory, skipping ones in the manifest
+
+        Returns:
+            BulkIngestResult with counts and throughput
+        """
+        start_time = time.time()
+        files = self.find_files(directory)
+
+        pending = []
+        for path in files:
+            content_hash = hash_file(path)
+            if self.manifest.is_done(str(path), content_hash):
+                continue
+            pending.append((str(path), content_hash))
+
+        result = BulkIngestResult(
+            total_files=len(files),
+            ingested=0,
+            skipped=len(files) - len(pending),
+            failed=0,
+            total_chunks=0,
+            elapsed_time=0.0,
+        )
+        logger.info(
+            f"Bulk ingest: {len(pending)} pending, {result.skipped} already in manifest"
+        )
+
+        if pending:
+            queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+            # spawn: forking a process that holds pool threads and sockets is unsafe
+            with ProcessPoolExecutor(
+                max_workers=min(self.parse_workers, len(pending)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.chunker_options,),
+            ) as executor:
+                writers = [
+                    asyncio.create_task(self._writer(queue, result))
+                    for _ in range(self.writer_count)
+                ]
+                producer = asyncio.create_task(
+                    self._produce(executor, pending, queue, result, len(writers))
+                )
+                tasks = [producer, *writers]
+                try:
+                    # A writer that dies stops draining the queue; failing the whole
+                    # gather cancels the producer instead of leaving it blocked on put
+                    await asyncio.gather(*tasks)
+                except BaseException:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    raise
+
+        result.elapsed_time = time.time() - start_time
+        return result
+
+    async def _produce(
+        self,
+        executor: ProcessPoolExecutor,
+        pending: List[tuple],
+        queue: asyncio.Queue,
+        result: BulkIngestResult,
+        writer_count: int,
+    ) -> None:
+        """Parse and chunk files in the process pool and feed the queue, then stop the writers"""
+        loop = asyncio.get_running_loop()
+        # A slot is held until the parsed document is queued, so a full queue
+        # stops new parse jobs from being submitted (backpressure)
+        slots = asyncio.Semaphore(self.parse_workers)
+
+        async def parse_one(path: str, content_hash: str) -> None:
+            async with slots:
+                try:
+                    parsed = await loop.run_in_executor(
+                        executor, parse_and_chunk, path, content_hash
+                    )
+                except Exception as e:
+                    logger.error(f"Parsing {path} failed: {e}")
+                    self._record_failure(result, path, content_hash, e)
+                    return
+                await queue.put(parsed)
+
+        await asyncio.gather(
+            *(parse_one(path, content_hash) for path, content_hash in pending)
+        )
+        for _ in range(writer_count):
+            await queue.put(None)
+
+    async def _writer(self, queue: asyncio.Queue, result: BulkIngestResult) -> None:
+        """Summarize, embed and insert parsed documents until a None sentinel"""
+        async with self.db_service.get_connection() as conn:
+            store = DocumentStore(
+                db_connection=conn,
+                max_chunk_tokens=self.max_chunk_tokens,
+                max_chunk_words=self.max_chunk_words,
+                llm_model=self.llm_model,
+                use_llm_summary=self.use_llm_summary,
+                embedder=self.embedder,
+            )
+
+            while True:
+                parsed = await queue.get()
+                if parsed is None:
+                    return
+
+                # An edited file replaces the document it was stored as before
+                document_id = self.manifest.get_document_id(parsed.path)
+                try:
+                    if document_id is not None and await store.doc_repo.get_document_by_id(
+                        document_id
+                    ):
+                        update_result = await store.update_document(
+                            document_id, parsed.content, chunk_texts=parsed.chunk_texts
+                        )
+                        total_chunks = len(update_result.chunk_ids)
+                        processing_time = update_result.processing_time
+                        result.updated += 1
+                    else:
+                        # Record the id before the insert commits: a crash between the
+                        # commit and the "done" entry then resumes as an update
+                        storage_result = await store.store_document(
+                            parsed.title,
+                            parsed.content,
+                            chunk_texts=parsed.chunk_texts,
+                            before_commit=lambda new_id, parsed=parsed: self.manifest.record(
+                                parsed.path,
+                                status="pending",
+                                content_hash=parsed.content_hash,
+                                document_id=new_id,
+                            ),
+                        )
+                        document_id = storage_result.document_id
+                        total_chunks = storage_result.total_chunks
+                        processing_time = storage_result.processing_time
+                except Exception as e:
+                    logger.error(f"Storing {parsed.path} failed: {e}")
+                    await conn.rollback()
+                    self._record_failure(result, parsed.path, parsed.content_hash, e)
+                    continue
+
+                self.manifest.record(
+                    parsed.path,
+                    status="done",
+                    content_hash=parsed.content_hash,
+                    document_id=document_id,
+                    total_chunks=total_chunks,
+                )
+                result.ingested += 1
+                result.total_chunks += total_chunks
+                logger.info(
+                    f"Stored {parsed.path}: {total_chunks} chunks "
+                    f"(parse {parsed.parse_time:.2f}s, store {processing_time:.2f}s)"
+                )
+
+    def _record_failure(
+        self, result: BulkIngestResult, path: str, content_hash: str, error: Exception
+    ) -> None:
+        # Failed files are retried on the next run; keep the document id so a
+        # retry still updates the previously stored document
+        self.manifest.record(
+            path,
+            status="failed",
+            content_hash=content_hash,
+            document_id=self.manifest.get_document_id(path),
+            error=str(error),
+        )
+        result.failed += 1
+        result.failures[path] = str(error)
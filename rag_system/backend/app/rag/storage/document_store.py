@@ -1,6 +1,12 @@
-from typing import List, Dict, Any, Optional
+import time
+import asyncio
+import datetime
+import hashlib
+import itertools
+from collections import defaultdict, deque
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
 from psycopg import AsyncConnection
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from app.db.repositories.document_repository import DocumentRepository
 from app.db.repositories.document_chunks_repository import DocumentChunksRepository
@@ -20,6 +26,49 @@ class StorageResult:
     total_chunks: int
     total_tokens: int
     processing_time: float
+    # Seconds per ingestion stage; summary and chunk stages overlap, so they
+    # can add up to more than processing_time
+    stage_timings: Dict[str, float] = field(default_factory=dict)
+
+
+class _StreamHead:
+    """Line iterator that keeps the first max_chars characters for the summary"""
+
+    def __init__(self, lines: Iterable[str], max_chars: int):
+        self._lines = lines
+        self._max_chars = max_chars
+        self._parts: List[str] = []
+        self._size = 0
+        self.complete = False
+
+    def __iter__(self) -> Iterator[str]:
+        for line in self._lines:
+            if not self.complete:
+                self._parts.append(line)
+                self._size += len(line)
+                self.complete = self._size >= self._max_chars
+            yield line
+        self.complete = True
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)[: self._max_chars]
+
+
+@dataclass
+class UpdateResult:
+    """Result of an incremental document update"""
+
+    document_id: int
+    chunk_ids: List[int]  # In chunk_index order
+    kept_chunks: int
+    added_chunks: int
+    removed_chunks: int
+    reindexed_chunks: int
+    changed_fraction: float
+    summary_regenerated: bool
+    total_tokens: int
+    processing_time: float
 
 
 @dataclass
@@ -51,6 +100,8 @@ class DocumentStore:
         max_chunk_words: int = 200,
         llm_model: str = "gpt-4o-mini",
         use_llm_summary: bool = True,
+        embedding_store_path: Optional[str] = None,
+        embedder: Optional[EmbeddingGenerator] = None,
     ):
         """
         Initialize DocumentStore with database connection and configuration
@@ -63,8 +114,13 @@ class DocumentStore:
             max_chunk_words: Maximum words per chunk
             llm_model: OpenAI model for summary generation ("gpt-4o-mini", "gpt-4o", etc.)
             use_llm_summary: Whether to use LLM for summary generation (True) or simple extraction (False)
+            embedding_store_path: Optional SQLite path of the persistent embedding store, so
+                re-ingesting unchanged chunks does not call the embedding provider again
+            embedder: Optional shared EmbeddingGenerator (e.g. across bulk ingestion
+                workers); when given, embedding_provider and embedding_store_path are ignored
         """
         # Database repositories
+        self.connection = db_connection
         self.doc_repo = DocumentRepository(db_connection)
         self.chunk_repo = DocumentChunksRepository(db_connection)
 
@@ -73,7 +129,9 @@ class DocumentStore:
             max_tokens_per_chunk=max_chunk_tokens, max_words_per_chunk=max_chunk_words
         )
         self.chunker = GFMContextPathChunker(chunker_options)
-        self.embedder = EmbeddingGenerator(provider=embedding_provider)
+        self.embedder = embedder or EmbeddingGenerator(
+            provider=embedding_provider, store_path=embedding_store_path
+        )
 
         # LLM summarizer (optional)
         self.use_llm_summary = use_llm_summary
@@ -81,74 +139,238 @@ class DocumentStore:
             self.summarizer = LLMSummarizer(model=llm_model)
 
     async def store_document(
-        self, title: str, content: str, generate_summary: bool = True
+        self,
+        title: str,
+        content: str,
+        generate_summary: bool = True,
+        chunk_texts: Optional[List[str]] = None,
+        document_type: Optional[str] = None,
+        document_date: Optional[datetime.date] = None,
+        tags: Optional[List[str]] = None,
+        before_commit: Optional[Callable[[int], None]] = None,
     ) -> StorageResult:
         """
         Store a document with automatic chunking and embedding generation
 
+        The summary (LLM call + summary embedding) runs concurrently with chunking
+        and chunk embedding, since neither depends on the other. The document row
+        and its chunks are then written in a single transaction.
+
         Args:
             title: Document title
             content: Document content (markdown format)
             generate_summary: Whether to auto-generate summary from content
+            chunk_texts: Chunks already produced by this store's chunker settings
+                (e.g. in a bulk ingestion worker process); skips chunking
+            document_type: Document type metadata used by retrieval filters
+            document_date: Document date metadata used by retrieval filters
+            tags: Tag metadata used by retrieval filters
+            before_commit: Called with the new document id once the rows are
+                written, before the transaction commits (e.g. to record the id
+                somewhere a crash right after the commit cannot lose it)
 
         Returns:
-            StorageResult with document_id, chunk_ids, and processing stats
+            StorageResult with document_id, chunk_ids, processing stats and stage timings
         """
-        import time
-
         start_time = time.time()
+        stage_timings: Dict[str, float] = {}
 
-        # Step 1: Generate or use provided summary
-        if generate_summary:
-            if self.use_llm_summary and hasattr(self, "summarizer"):
-                summary_result = self.summarizer.generate_summary(content, title)
-                if not summary_result.success:
-                    raise ValueError(
-                        f"LLM summary generation failed: {summary_result.error_message}"
-                    )
-                summary = summary_result.summary
-        else:
-            # Use first 200 characters as fallback summary
-            summary = content[:200].strip() + ("..." if len(content) > 200 else "")
+        # Steps 1-2 (summary) and 3-4 (chunks) run side by side
+        summary_task = asyncio.create_task(
+            self._summarize(title, content, generate_summary, stage_timings)
+        )
+        chunks_task = asyncio.create_task(
+            self._chunk_and_embed(title, content, stage_timings, chunk_texts)
+        )
+        try:
+            (summary, summary_embedding_result), (
+                chunk_texts,
+                batch_embedding_result,
+            ) = await asyncio.gather(summary_task, chunks_task)
+        except Exception:
+            summary_task.cancel()
+            chunks_task.cancel()
+            raise
+
+        # Step 5: Store document and chunks in one transaction
+        stage_start = time.time()
+        try:
+            document_id = await self.doc_repo.create_document(
+                title=title,
+                summary=summary,
+                summary_embedding=summary_embedding_result.embedding,
+                document_type=document_type,
+                document_date=document_date,
+                tags=tags,
+                commit=False,
+            )
 
-        # Step 2: Generate embedding for document summary
-        summary_embedding_result = self.embedder.embed(summary)
+            chunk_data = [
+                {
+                    "content": chunk_text,
+                    "embedding": batch_embedding_result.embeddings[i],
+                    "document_id": document_id,
+                    "chunk_index": i,
+                }
+                for i, chunk_text in enumerate(chunk_texts)
+            ]
+            chunk_ids = await self.chunk_repo.create_chunks_batch(
+                chunk_data, commit=False
+            )
+
+            if before_commit:
+                before_commit(document_id)
+            await self.connection.commit()
+        except Exception:
+            await self.connection.rollback()
+            raise
+        stage_timings["database_write"] = time.time() - stage_start
 
-        # Step 3: Store document in database
-        document_id = await self.doc_repo.create_document(
+        total_tokens = summary_embedding_result.tokens_used
+        if batch_embedding_result is not None:
+            total_tokens += batch_embedding_result.total_tokens
+
+        processing_time = time.time() - start_time
+
+        return StorageResult(
+            document_id=document_id,
             title=title,
             summary=summary,
-            summary_embedding=summary_embedding_result.embedding,
+            chunk_ids=chunk_ids,
+            total_chunks=len(chunk_ids),
+            total_tokens=total_tokens,
+            processing_time=processing_time,
+            stage_timings=stage_timings,
         )
 
-        # Step 4: Chunk the document content
-        chunk_texts = self.chunker.chunk(content, title)
+    async def store_document_stream(
+        self,
+        title: str,
+        stream: Iterable[str],
+        generate_summary: bool = True,
+        chunk_batch_size: int = 256,
+        summary_input_chars: int = 400_000,
+        document_type: Optional[str] = None,
+        document_date: Optional[datetime.date] = None,
+        tags: Optional[List[str]] = None,
+    ) -> StorageResult:
+        """
+        Store a very large markdown document from a stream with bounded memory
 
-        # Step 5: Generate embeddings for all chunks
-        if chunk_texts:
-            batch_embedding_result = self.embedder.embed_batch(chunk_texts)
-
-            # Step 6: Store chunks with embeddings
-            chunk_data = []
-            for i, chunk_text in enumerate(chunk_texts):
-                chunk_data.append(
-                    {
-                        "content": chunk_text,
-                        "embedding": batch_embedding_result.embeddings[i],
-                        "document_id": document_id,
-                    }
-                )
+        Chunks come from GFMContextPathChunker.iter_chunks and are embedded and
+        inserted in batches of chunk_batch_size. The summary is generated from the
+        first summary_input_chars characters (the LLM input is truncated at roughly
+        that size anyway) while later batches are embedded. Everything is written
+        in one transaction.
 
-            chunk_ids = await self.chunk_repo.create_chunks_batch(chunk_data)
-            total_tokens = (
-                batch_embedding_result.total_tokens
-                + summary_embedding_result.tokens_used
+        Args:
+            title: Document title
+            stream: Text file object or iterable of markdown lines
+            generate_summary: Whether to auto-generate summary from content
+            chunk_batch_size: Chunks embedded and inserted per batch
+            summary_input_chars: Leading characters kept for the summary
+            document_type: Document type metadata used by retrieval filters
+            document_date: Document date metadata used by retrieval filters
+            tags: Tag metadata used by retrieval filters
+
+        Returns:
+            StorageResult with document_id, chunk_ids, processing stats and stage timings
+        """
+        start_time = time.time()
+        stage_timings: Dict[str, float] = defaultdict(float)
+
+        head = _StreamHead(stream, summary_input_chars)
+        chunk_iter = self.chunker.iter_chunks(head, title)
+
+        summary_task: Optional[asyncio.Task] = None
+        summary = ""
+        document_id: Optional[int] = None
+        # Embedded chunks waiting for the document row (only until the summary is ready)
+        pending: List[Tuple[str, List[float]]] = []
+        chunk_ids: List[int] = []
+        total_tokens = 0
+
+        async def insert_document() -> int:
+            nonlocal summary, total_tokens
+            summary, summary_embedding_result = await summary_task
+            total_tokens += summary_embedding_result.tokens_used
+
+            stage_start = time.time()
+            new_document_id = await self.doc_repo.create_document(
+                title=title,
+                summary=summary,
+                summary_embedding=summary_embedding_result.embedding,
+                document_type=document_type,
+                document_date=document_date,
+                tags=tags,
+                commit=False,
             )
-        else:
-            chunk_ids = []
-            total_tokens = summary_embedding_result.tokens_used
+            stage_timings["database_write"] += time.time() - stage_start
+            return new_document_id
+
+        async def flush_pending() -> None:
+            stage_start = time.time()
+            chunk_ids.extend(
+                await self.chunk_repo.create_chunks_batch(
+                    [
+                        {
+                            "content": chunk_text,
+                            "embedding": embedding,
+                            "document_id": document_id,
+                            "chunk_index": len(chunk_ids) + i,
+                        }
+                        for i, (chunk_text, embedding) in enumerate(pending)
+                    ],
+                    commit=False,
+                )
+            )
+            pending.clear()
+            stage_timings["database_write"] += time.time() - stage_start
+
+        try:
+            while True:
+                # Step 1: Pull the next batch of chunks (parsing is CPU-bound)
+                stage_start = time.time()
+                batch = await asyncio.to_thread(
+                    lambda: list(itertools.islice(chunk_iter, chunk_batch_size))
+                )
+                stage_timings["chunking"] += time.time() - stage_start
 
-        processing_time = time.time() - start_time
+                # Step 2: Start the summary as soon as its input has been read
+                if summary_task is None and (head.complete or not batch):
+                    summary_task = asyncio.create_task(
+                        self._summarize(title, head.text, generate_summary, stage_timings)
+                    )
+
+                if not batch:
+                    break
+
+                # Step 3: Embed the batch
+                stage_start = time.time()
+                batch_embedding_result = await self.embedder.embed_batch_async(batch)
+                stage_timings["chunk_embedding"] += time.time() - stage_start
+                total_tokens += batch_embedding_result.total_tokens
+                pending.extend(zip(batch, batch_embedding_result.embeddings))
+
+                # Step 4: Insert once the document row exists; wait for the
+                # summary rather than buffering more than a few batches
+                if document_id is None and summary_task is not None and (
+                    summary_task.done() or len(pending) >= 4 * chunk_batch_size
+                ):
+                    document_id = await insert_document()
+                if document_id is not None:
+                    await flush_pending()
+
+            if document_id is None:
+                document_id = await insert_document()
+            await flush_pending()
+
+            await self.connection.commit()
+        except BaseException:
+            if summary_task is not None:
+                summary_task.cancel()
+            await self.connection.rollback()
+            raise
 
         return StorageResult(
             document_id=document_id,
@@ -157,7 +379,203 @@ class DocumentStore:
             chunk_ids=chunk_ids,
             total_chunks=len(chunk_ids),
             total_tokens=total_tokens,
-            processing_time=processing_time,
+            processing_time=time.time() - start_time,
+            stage_timings=dict(stage_timings),
+        )
+
+    async def _summarize(
+        self,
+        title: str,
+        content: str,
+        generate_summary: bool,
+        stage_timings: Dict[str, float],
+    ) -> Tuple[str, Any]:
+        """Generate the document summary and its embedding"""
+        # Step 1: Generate or use provided summary
+        stage_start = time.time()
+        if generate_summary and self.use_llm_summary and hasattr(self, "summarizer"):
+            # The OpenAI summarizer is synchronous; keep it off the event loop
+            summary_result = await asyncio.to_thread(
+                self.summarizer.generate_summary, content, title
+            )
+            if not summary_result.success:
+                raise ValueError(
+                    f"LLM summary generation failed: {summary_result.error_message}"
+                )
+            summary = summary_result.summary
+        else:
+            # Use first 200 characters as fallback summary
+            summary = content[:200].strip() + ("..." if len(content) > 200 else "")
+        stage_timings["summary"] = time.time() - stage_start
+
+        # Step 2: Generate embedding for document summary
+        stage_start = time.time()
+        summary_embedding_result = await self.embedder.embed_async(summary)
+        stage_timings["summary_embedding"] = time.time() - stage_start
+
+        return summary, summary_embedding_result
+
+    async def _chunk_and_embed(
+        self,
+        title: str,
+        content: str,
+        stage_timings: Dict[str, float],
+        chunk_texts: Optional[List[str]] = None,
+    ) -> Tuple[List[str], Any]:
+        """Chunk the document content (unless pre-chunked) and embed all chunks"""
+        # Step 3: Chunk the document content (CPU-bound, run in a worker thread)
+        if chunk_texts is None:
+            stage_start = time.time()
+            chunk_texts = await asyncio.to_thread(self.chunker.chunk, content, title)
+            stage_timings["chunking"] = time.time() - stage_start
+
+        # Step 4: Generate embeddings for all chunks
+        stage_start = time.time()
+        batch_embedding_result = None
+        if chunk_texts:
+            batch_embedding_result = await self.embedder.embed_batch_async(chunk_texts)
+        stage_timings["chunk_embedding"] = time.time() - stage_start
+
+        return chunk_texts, batch_embedding_result
+
+    async def update_document(
+        self,
+        document_id: int,
+        new_content: str,
+        summary_change_threshold: float = 0.3,
+        chunk_texts: Optional[List[str]] = None,
+    ) -> UpdateResult:
+        """
+        Update a document's content, re-embedding only chunks that changed
+
+        The new content is re-chunked and each chunk is matched to an existing
+        chunk with identical content (by sha256). Matched chunks keep their id and
+        embedding and only get their chunk_index updated; unmatched new chunks are
+        embedded and inserted, and existing chunks without a match are deleted.
+
+        Args:
+            document_id: ID of document to update
+            new_content: New document content (markdown format)
+            summary_change_threshold: Regenerate the summary when more than this
+                fraction of chunks changed
+            chunk_texts: Chunks of new_content already produced by this store's chunker settings
+
+        Returns:
+            UpdateResult with chunk diff counts and processing stats
+        """
+        start_time = time.time()
+
+        document = await self.doc_repo.get_document_by_id(document_id)
+        if not document:
+            raise ValueError(f"Document {document_id} not found")
+
+        if chunk_texts is None:
+            chunk_texts = await asyncio.to_thread(
+                self.chunker.chunk, new_content, document["title"]
+            )
+        existing_chunks = await self.chunk_repo.get_chunk_hashes_by_document_id(
+            document_id
+        )
+
+        # Multiset match: duplicated chunk texts are matched one-to-one, in order
+        available_ids: Dict[str, deque] = defaultdict(deque)
+        for chunk in existing_chunks:
+            available_ids[chunk["content_hash"]].append(chunk["id"])
+
+        kept_indexes: Dict[int, int] = {}  # chunk id -> new chunk_index
+        new_positions: List[int] = []
+        for i, chunk_text in enumerate(chunk_texts):
+            content_hash = hashlib.sha256(chunk_text.encode("utf-8")).hexdigest()
+            if available_ids[content_hash]:
+                kept_indexes[available_ids[content_hash].popleft()] = i
+            else:
+                new_positions.append(i)
+
+        removed_ids = [chunk_id for ids in available_ids.values() for chunk_id in ids]
+
+        total = max(len(existing_chunks), len(chunk_texts))
+        changed_fraction = 1 - len(kept_indexes) / total if total > 0 else 0.0
+        regenerate_summary = changed_fraction > summary_change_threshold
+
+        # Only new chunks are embedded; the summary (if needed) runs alongside
+        summary_result = None
+        batch_embedding_result = None
+        stage_timings: Dict[str, float] = {}
+        tasks = []
+        if new_positions:
+            tasks.append(
+                self.embedder.embed_batch_async(
+                    [chunk_texts[i] for i in new_positions]
+                )
+            )
+        if regenerate_summary:
+            tasks.append(
+                self._summarize(document["title"], new_content, True, stage_timings)
+            )
+        results = await asyncio.gather(*tasks)
+        if new_positions:
+            batch_embedding_result = results[0]
+        if regenerate_summary:
+            summary_result = results[-1]
+
+        try:
+            await self.chunk_repo.delete_chunks_by_ids(removed_ids, commit=False)
+            reindexed = await self.chunk_repo.update_chunk_indexes(
+                kept_indexes, commit=False
+            )
+
+            new_chunk_ids: List[int] = []
+            if new_positions:
+                new_chunk_ids = await self.chunk_repo.create_chunks_batch(
+                    [
+                        {
+                            "content": chunk_texts[position],
+                            "embedding": batch_embedding_result.embeddings[j],
+                            "document_id": document_id,
+                            "chunk_index": position,
+                        }
+                        for j, position in enumerate(new_positions)
+                    ],
+                    commit=False,
+                )
+
+            if summary_result is not None:
+                summary, summary_embedding_result = summary_result
+                await self.doc_repo.update_document_summary(
+                    document_id,
+                    summary,
+                    summary_embedding_result.embedding,
+                    commit=False,
+                )
+
+            await self.connection.commit()
+        except Exception:
+            await self.connection.rollback()
+            raise
+
+        chunk_ids: List[Optional[int]] = [None] * len(chunk_texts)
+        for chunk_id, position in kept_indexes.items():
+            chunk_ids[position] = chunk_id
+        for chunk_id, position in zip(new_chunk_ids, new_positions):
+            chunk_ids[position] = chunk_id
+
+        total_tokens = 0
+        if batch_embedding_result is not None:
+            total_tokens += batch_embedding_result.total_tokens
+        if summary_result is not None:
+            total_tokens += summary_result[1].tokens_used
+
+        return UpdateResult(
+            document_id=document_id,
+            chunk_ids=chunk_ids,
+            kept_chunks=len(kept_indexes),
+            added_chunks=len(new_positions),
+            removed_chunks=len(removed_ids),
+            reindexed_chunks=reindexed,
+            changed_fraction=changed_fraction,
+            summary_regenerated=summary_result is not None,
+            total_tokens=total_tokens,
+            processing_time=time.time() - start_time,
         )
 
     async def get_document_with_chunks(
@@ -206,23 +624,13 @@ class DocumentStore:
         Returns:
             Dictionary with storage statistics
         """
-        # Get sample of documents to count
-        documents = await self.doc_repo.get_all_documents(limit=1000)
-        total_documents = len(documents)
-
-        # Count total chunks across all documents
-        total_chunks = 0
-        if documents:
-            for doc in documents:
-                chunk_count = await self.chunk_repo.get_chunk_count_by_document_id(
-                    doc["id"]
-                )
-                total_chunks += chunk_count
+        # Totals and chunks-per-document histogram in one aggregate query
+        stats = await self.chunk_repo.get_chunk_statistics()
+        total_documents = stats["total_documents"]
 
         return {
-            "total_documents": total_documents,
-            "total_chunks": total_chunks,
-            "avg_chunks_per_document": total_chunks / total_documents
+            **stats,
+            "avg_chunks_per_document": stats["total_chunks"] / total_documents
             if total_documents > 0
             else 0,
             "embedding_provider": self.embedder.provider.name,
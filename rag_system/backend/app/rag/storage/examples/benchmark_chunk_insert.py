@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Chunk Insert Benchmark
+
+Compares the legacy one-INSERT-per-chunk loop against the bulk
+DocumentChunksRepository.create_chunks_batch path:
+1. Creates a throwaway document
+2. Inserts synthetic chunks with random 1536-d embeddings using both paths
+3. Reports wall time and rows/sec for each
+4. Deletes the throwaway document (chunks are removed by ON DELETE CASCADE)
+
+Usage:
+  # Default: 1000 chunks
+  python benchmark_chunk_insert.py
+
+  # Custom size
+  python benchmark_chunk_insert.py --chunks 5000 --dimensions 1536
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import asyncio
+import dotenv
+from typing import List, Dict, Any
+
+# Load environment variables and override POSTGRES_HOST for Docker
+dotenv.load_dotenv(".env.dev")
+os.environ["POSTGRES_HOST"] = "localhost"
+
+# Add the backend directory to Python path so we can import from app
+# Find the backend directory by looking for the directory containing 'app'
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = script_dir
+while backend_dir != "/" and not os.path.exists(os.path.join(backend_dir, "app")):
+    backend_dir = os.path.dirname(backend_dir)
+
+if os.path.exists(os.path.join(backend_dir, "app")):
+    sys.path.insert(0, backend_dir)
+else:
+    raise ImportError("Could not find backend directory containing 'app' module")
+
+from app.db.connection import DatabaseService
+from app.db.repositories.document_repository import DocumentRepository
+from app.db.repositories.document_chunks_repository import DocumentChunksRepository
+
+
+def make_chunks(document_id: int, count: int, dimensions: int) -> List[Dict[str, Any]]:
+    """Generate synthetic chunks with random embeddings"""
+    return [
+        {
+            "content": f"Benchmark chunk {i} " + "lorem ipsum " * 50,
+            "embedding": [random.uniform(-1.0, 1.0) for _ in range(dimensions)],
+            "document_id": document_id,
+            "chunk_index": i,
+        }
+        for i in range(count)
+    ]
+
+
+async def insert_row_by_row(conn, chunks: List[Dict[str, Any]]) -> List[int]:
+    """Previous create_chunks_batch implementation: one round trip per chunk"""
+    query = """
+        INSERT INTO document_chunks
+        (content, embedding, document_id, chunk_index)
+        VALUES (%s, %s, %s, %s)
+        RETURNING id
+    """
+
+    chunk_ids = []
+    async with conn.cursor() as cur:
+        for chunk in chunks:
+            await cur.execute(
+                query,
+                (
+                    chunk["content"],
+                    chunk["embedding"],
+                    chunk["document_id"],
+                    chunk["chunk_index"],
+                ),
+            )
+            result = await cur.fetchone()
+            chunk_ids.append(result[0])
+
+        await conn.commit()
+
+    return chunk_ids
+
+
+def print_row(label: str, rows: int, elapsed: float) -> None:
+    print(f"   {label:<14} {elapsed:8.2f}s | {rows / elapsed:10.1f} rows/sec")
+
+
+async def benchmark(args) -> None:
+    db_service = DatabaseService()
+    await db_service.initialize()
+
+    try:
+        async with db_service.get_connection() as conn:
+            document_repo = DocumentRepository(conn)
+            chunks_repo = DocumentChunksRepository(conn)
+
+            document_id = await document_repo.create_document(
+                "Chunk insert benchmark",
+                "Temporary document created by benchmark_chunk_insert.py",
+                [0.0] * args.dimensions,
+            )
+
+            try:
+                print(f"\n📊 Inserting {args.chunks} chunks ({args.dimensions}-d embeddings)")
+                print("=" * 60)
+
+                chunks = make_chunks(document_id, args.chunks, args.dimensions)
+
+                start = time.perf_counter()
+                await insert_row_by_row(conn, chunks)
+                row_by_row = time.perf_counter() - start
+                print_row("row-by-row", args.chunks, row_by_row)
+
+                await chunks_repo.delete_chunks_by_document_id(document_id)
+
+                start = time.perf_counter()
+                chunk_ids = await chunks_repo.create_chunks_batch(chunks)
+                bulk = time.perf_counter() - start
+                print_row("bulk", args.chunks, bulk)
+
+                # Ids come back in input order, so positions must line up
+                stored = await chunks_repo.get_chunks_by_document_id(document_id)
+                index_by_id = {chunk["id"]: chunk["chunk_index"] for chunk in stored}
+                in_order = all(
+                    index_by_id.get(chunk_id) == i for i, chunk_id in enumerate(chunk_ids)
+                )
+
+                print(f"\n⚡ Speedup: {row_by_row / bulk:.1f}x")
+                print(f"{'✅' if in_order else '❌'} Returned ids match input order")
+            finally:
+                await document_repo.delete_document(document_id)
+    finally:
+        await db_service.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark row-by-row vs bulk chunk inserts",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--chunks", type=int, default=1000, help="Number of chunks to insert")
+    parser.add_argument("--dimensions", type=int, default=1536, help="Embedding dimensions")
+    args = parser.parse_args()
+
+    print("🚀 CHUNK INSERT BENCHMARK")
+    print("=" * 60)
+    await benchmark(args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
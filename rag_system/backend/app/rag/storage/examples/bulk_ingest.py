@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Bulk Ingestion
+
+Ingests every markdown and PDF file in a directory using all CPU cores:
+1. Parses and chunks files in a process pool
+2. Summarizes, embeds and stores them with concurrent async writers
+3. Records finished files in a manifest so an interrupted run can be resumed
+
+Usage:
+  # Ingest app/rag/documents (resumes from the manifest if present)
+  python bulk_ingest.py
+
+  # Custom directory and concurrency
+  python bulk_ingest.py --dir /data/docs --workers 16 --writers 8 --queue-size 32
+
+  # Only markdown, without LLM summaries
+  python bulk_ingest.py --ext .md --no-llm-summary
+"""
+
+import os
+import sys
+import argparse
+import asyncio
+import logging
+import dotenv
+from pathlib import Path
+
+# Load environment variables and override POSTGRES_HOST for Docker
+dotenv.load_dotenv(".env.dev")
+os.environ["POSTGRES_HOST"] = "localhost"
+
+# Add the backend directory to Python path so we can import from app
+# Find the backend directory by looking for the directory containing 'app'
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = script_dir
+while backend_dir != "/" and not os.path.exists(os.path.join(backend_dir, "app")):
+    backend_dir = os.path.dirname(backend_dir)
+
+if os.path.exists(os.path.join(backend_dir, "app")):
+    sys.path.insert(0, backend_dir)
+else:
+    raise ImportError("Could not find backend directory containing 'app' module")
+
+from app.db.connection import DatabaseService
+from app.rag.storage.bulk_ingest import BulkIngestor, SUPPORTED_EXTENSIONS
+
+# Persistent embedding store: re-running ingestion only embeds changed chunks
+EMBEDDING_STORE_PATH = os.getenv("EMBEDDING_STORE_PATH", ".cache/embeddings.sqlite3")
+DEFAULT_DOCUMENTS_DIR = Path(__file__).parent.parent.parent / "documents"
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk ingest a directory of markdown and PDF documents",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--dir", default=str(DEFAULT_DOCUMENTS_DIR), help="Directory to ingest")
+    parser.add_argument(
+        "--manifest", default=".cache/ingest_manifest.jsonl", help="Resume manifest path"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Parse/chunk processes (default: CPU count)"
+    )
+    parser.add_argument("--writers", type=int, default=4, help="Concurrent embed/insert writers")
+    parser.add_argument("--queue-size", type=int, default=8, help="Parsed documents buffered")
+    parser.add_argument(
+        "--ext", nargs="+", default=list(SUPPORTED_EXTENSIONS), help="File extensions to ingest"
+    )
+    parser.add_argument("--provider", default="openai", help="Embedding provider")
+    parser.add_argument("--no-llm-summary", action="store_true", help="Skip LLM summaries")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    print("🚀 BULK INGESTION")
+    print("=" * 60)
+    print(f"📁 Directory: {args.dir}")
+    print(f"📒 Manifest: {args.manifest}")
+
+    db_service = DatabaseService()
+    # One connection per writer
+    await db_service.initialize(max_size=args.writers + 1)
+
+    try:
+        ingestor = BulkIngestor(
+            db_service,
+            manifest_path=args.manifest,
+            embedding_provider=args.provider,
+            embedding_store_path=EMBEDDING_STORE_PATH,
+            use_llm_summary=not args.no_llm_summary,
+            parse_workers=args.workers,
+            writer_count=args.writers,
+            queue_size=args.queue_size,
+            extensions=tuple(args.ext),
+        )
+        print(f"⚙️  {ingestor.parse_workers} parse workers, {args.writers} writers\n")
+
+        result = await ingestor.ingest_directory(args.dir)
+    finally:
+        await db_service.close()
+
+    print(f"\n📊 BULK INGESTION SUMMARY")
+    print("=" * 60)
+    print(f"📄 Files found: {result.total_files}")
+    print(f"✅ Ingested: {result.ingested} ({result.updated} updated in place)")
+    print(f"⏭️  Skipped (already in manifest): {result.skipped}")
+    print(f"❌ Failed: {result.failed}")
+    print(f"🔢 Chunks stored: {result.total_chunks}")
+    print(f"⏱️  Elapsed: {result.elapsed_time:.1f}s")
+    print(f"⚡ Throughput: {result.documents_per_minute:.1f} documents/minute")
+
+    if result.failures:
+        print(f"\n⚠️  Failed files (retried on next run):")
+        for path, error in result.failures.items():
+            print(f"   • {path}: {error}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -19,6 +19,12 @@ Usage:
 
   # Store document with custom title
   python store_document.py --file transformers.md --title "Custom Title"
+
+  # Update an already stored document (only changed chunks are re-embedded)
+  python store_document.py --file transformers.md --update 12
+
+  # Stream a very large document (bounded memory, chunks stored in batches)
+  python store_document.py --file export.md --stream
 """
 
 import os
@@ -48,6 +54,9 @@ else:
 from app.rag.storage.document_store import DocumentStore
 from app.db.connection import DatabaseService
 
+# Persistent embedding store: re-running ingestion only embeds changed chunks
+EMBEDDING_STORE_PATH = os.getenv("EMBEDDING_STORE_PATH", ".cache/embeddings.sqlite3")
+
 
 class DocumentStoreInterface:
     """
@@ -139,6 +148,93 @@ class DocumentStoreInterface:
             for filename, error in failed_files:
                 print(f"   • {filename}: {error}")
 
+    async def update_document(self, file_path: Path, document_id: int) -> None:
+        """
+        Update a stored document from a markdown file, re-embedding only changed chunks
+
+        Args:
+            file_path: Path to the markdown file with the new content
+            document_id: ID of the stored document to update
+        """
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = f.read()
+
+        print(f"📖 Updating document {document_id} from: {file_path.name}")
+
+        db_service = DatabaseService()
+        await db_service.initialize()
+
+        try:
+            async with db_service.get_connection() as conn:
+                store = DocumentStore(
+                    db_connection=conn,
+                    embedding_provider="openai",
+                    max_chunk_tokens=512,
+                    max_chunk_words=200,
+                    use_llm_summary=True,
+                    llm_model="gpt-4o-mini",
+                    embedding_store_path=EMBEDDING_STORE_PATH,
+                )
+                result = await store.update_document(document_id, content)
+
+            print(f"\n🎉 Document updated successfully!")
+            print("=" * 60)
+            print(f"♻️  Kept chunks: {result.kept_chunks} ({result.reindexed_chunks} reindexed)")
+            print(f"➕ Added chunks: {result.added_chunks}")
+            print(f"➖ Removed chunks: {result.removed_chunks}")
+            print(f"📈 Changed fraction: {result.changed_fraction:.1%}")
+            print(f"📄 Summary regenerated: {'yes' if result.summary_regenerated else 'no'}")
+            print(f"📊 Total tokens: {result.total_tokens}")
+            print(f"⏱️  Processing time: {result.processing_time:.3f}s")
+        except Exception as e:
+            print(f"❌ Update failed: {e}")
+        finally:
+            await db_service.close()
+
+    async def store_document_streaming(
+        self, file_path: Path, custom_title: str = None
+    ) -> None:
+        """
+        Store a large document by streaming it from disk instead of reading it whole
+
+        Args:
+            file_path: Path to the markdown file
+            custom_title: Optional custom title (uses filename if not provided)
+        """
+        title = custom_title or file_path.stem.replace("_", " ").replace("-", " ").title()
+        print(f"📖 Streaming document: {file_path.name} ({file_path.stat().st_size / 1024 / 1024:.1f} MB)")
+        print(f"📝 Title: {title}")
+
+        db_service = DatabaseService()
+        await db_service.initialize()
+
+        try:
+            async with db_service.get_connection() as conn:
+                store = DocumentStore(
+                    db_connection=conn,
+                    embedding_provider="openai",
+                    max_chunk_tokens=512,
+                    max_chunk_words=200,
+                    use_llm_summary=True,
+                    llm_model="gpt-4o-mini",
+                    embedding_store_path=EMBEDDING_STORE_PATH,
+                )
+                with open(file_path, "r", encoding="utf-8") as f:
+                    result = await store.store_document_stream(title, f)
+
+            print(f"\n🎉 Document stored successfully!")
+            print("=" * 60)
+            print(f"📄 Document ID: {result.document_id}")
+            print(f"🔢 Total chunks: {result.total_chunks}")
+            print(f"📊 Total tokens: {result.total_tokens}")
+            print(f"⏱️  Processing time: {result.processing_time:.3f}s")
+            for stage, seconds in result.stage_timings.items():
+                print(f"   • {stage}: {seconds:.3f}s")
+        except Exception as e:
+            print(f"❌ Storage failed: {e}")
+        finally:
+            await db_service.close()
+
     async def store_document(self, file_path: Path, custom_title: str = None) -> None:
         """
         Store a document in the database with chunking and embeddings
@@ -193,6 +289,7 @@ class DocumentStoreInterface:
                     max_chunk_words=200,
                     use_llm_summary=True,
                     llm_model="gpt-4o-mini",
+                    embedding_store_path=EMBEDDING_STORE_PATH,
                 )
                 store_init_time = time.time() - store_start
                 print(f"✅ Initialized DocumentStore ({store_init_time:.3f}s)")
@@ -218,6 +315,12 @@ class DocumentStoreInterface:
                 )
                 print(f"🔢 Total chunks: {result.total_chunks}")
                 print(f"📊 Total tokens: {result.total_tokens}")
+                store_stats = store.embedder.get_cache_stats().get("persistent_store")
+                if store_stats:
+                    print(
+                        f"💾 Embedding store: {store_stats['hits']} reused, "
+                        f"{store_stats['misses']} embedded"
+                    )
                 print(
                     f"🆔 Chunk IDs: {result.chunk_ids[:3]}{'...' if len(result.chunk_ids) > 3 else ''}"
                 )
@@ -225,6 +328,8 @@ class DocumentStoreInterface:
                 print(f"\n⏱️  TIMING")
                 print("=" * 40)
                 print(f"📝 Chunking + Embeddings + Storage: {process_time:.3f}s")
+                for stage, seconds in result.stage_timings.items():
+                    print(f"   • {stage}: {seconds:.3f}s")
                 print(f"🕒 Total time: {total_time:.3f}s")
 
                 # Get storage stats
@@ -236,7 +341,16 @@ class DocumentStoreInterface:
                 print(
                     f"📈 Avg chunks per document: {stats['avg_chunks_per_document']:.1f}"
                 )
+                print(
+                    f"📏 Chunks per document: min {stats['min_chunks_per_document']}, "
+                    f"median {stats['median_chunks_per_document']:.0f}, "
+                    f"max {stats['max_chunks_per_document']}"
+                )
                 print(f"🤖 Embedding provider: {stats['embedding_provider']}")
+                print(f"📊 Chunks per document histogram:")
+                for bucket, documents in stats["chunk_count_histogram"].items():
+                    if documents:
+                        print(f"   {bucket:>10}: {documents}")
 
             await db_service.close()
 
@@ -267,6 +381,12 @@ Examples:
 
   # Store with custom title
   python store_document.py --file transformers.md --title "Attention Mechanism Paper"
+
+  # Update stored document 12 with the file's current content
+  python store_document.py --file transformers.md --update 12
+
+  # Stream a very large document instead of reading it into memory
+  python store_document.py --file export.md --stream
         """,
     )
 
@@ -280,6 +400,21 @@ Examples:
         "--title", "-t", help="Custom title for the document (optional)"
     )
 
+    parser.add_argument(
+        "--update",
+        "-u",
+        type=int,
+        metavar="DOCUMENT_ID",
+        help="Update this stored document with the file's content instead of storing a new one",
+    )
+
+    parser.add_argument(
+        "--stream",
+        "-s",
+        action="store_true",
+        help="Stream the file section by section (for very large documents)",
+    )
+
     parser.add_argument(
         "--list",
         "-l",
@@ -324,8 +459,17 @@ Examples:
             print(f"💡 Looked in: {store_interface.documents_dir}")
             return
 
+        if args.update is not None:
+            print(f"🚀 DOCUMENT UPDATE")
+            print("=" * 60)
+            await store_interface.update_document(file_path, args.update)
+            return
+
         print(f"🚀 DOCUMENT STORAGE")
         print("=" * 60)
+        if args.stream:
+            await store_interface.store_document_streaming(file_path, args.title)
+            return
         await store_interface.store_document(file_path, args.title)
     else:
         # Default to listing if no specific action
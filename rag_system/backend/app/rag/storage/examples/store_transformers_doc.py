@@ -22,6 +22,9 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
 from app.rag.storage.document_store import DocumentStore
 from app.db.connection import DatabaseService
 
+# Persistent embedding store: re-running ingestion only embeds changed chunks
+EMBEDDING_STORE_PATH = os.getenv("EMBEDDING_STORE_PATH", ".cache/embeddings.sqlite3")
+
 
 async def store_transformers_document():
     """Store the transformers.md document in the database"""
@@ -56,6 +59,7 @@ async def store_transformers_document():
                 max_chunk_words=200,
                 llm_model="gpt-4o-mini",  # OpenAI model for summary
                 use_llm_summary=True,  # Enable LLM-based summary
+                embedding_store_path=EMBEDDING_STORE_PATH,  # Reuse unchanged chunk embeddings
             )
 
             print(
@@ -77,6 +81,8 @@ async def store_transformers_document():
             print(f"   🔢 Total chunks: {result.total_chunks}")
             print(f"   📊 Total tokens: {result.total_tokens}")
             print(f"   ⏱️  Processing time: {result.processing_time:.3f}s")
+            for stage, seconds in result.stage_timings.items():
+                print(f"      • {stage}: {seconds:.3f}s")
             print(
                 f"   🆔 Chunk IDs: {result.chunk_ids[:5]}{'...' if len(result.chunk_ids) > 5 else ''}"
             )
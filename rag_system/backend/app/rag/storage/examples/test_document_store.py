@@ -110,6 +110,8 @@ The future of machine learning includes:
         print(f"   🔢 Total chunks: {result.total_chunks}")
         print(f"   📊 Total tokens: {result.total_tokens}")
         print(f"   ⏱️ Processing time: {result.processing_time:.3f}s")
+        for stage, seconds in result.stage_timings.items():
+            print(f"      • {stage}: {seconds:.3f}s")
         print(f"   🆔 Chunk IDs: {result.chunk_ids}")
 
         return result.document_id
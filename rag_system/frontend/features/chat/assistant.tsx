@@ -8,9 +8,46 @@ import {
 import { Thread } from "@/components/assistant-ui/thread";
 import { ThreadList } from "@/components/assistant-ui/thread-list";
 
+type ServerSentEvent = {
+  event: string;
+  data: string;
+};
+
+// parse a Server-Sent Events response body into events as they arrive
+async function* readEvents(
+  body: ReadableStream<Uint8Array>,
+): AsyncGenerator<ServerSentEvent> {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // events are separated by a blank line
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = "message";
+      let data = "";
+      for (const line of rawEvent.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      yield { event, data };
+
+      boundary = buffer.indexOf("\n\n");
+    }
+  }
+}
+
 const MyModelAdapter: ChatModelAdapter = {
-  async run({ messages, abortSignal }) {
-    const result = await fetch("http://localhost:8080/chat", {
+  async *run({ messages, abortSignal }) {
+    const result = await fetch("http://localhost:8080/chat/stream", {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
@@ -23,15 +60,28 @@ const MyModelAdapter: ChatModelAdapter = {
       signal: abortSignal,
     });
 
-    const data = await result.json();
-    return {
-      content: [
-        {
-          type: "text",
-          text: data.message,
-        },
-      ],
-    };
+    if (!result.ok || !result.body) {
+      throw new Error(`Chat request failed with status ${result.status}`);
+    }
+
+    // render the reply incrementally as tokens arrive; the closing "done"
+    // event only carries server timings, so the stream just ends there
+    let text = "";
+    for await (const { event, data } of readEvents(result.body)) {
+      if (event === "token") {
+        text += JSON.parse(data).delta;
+        yield {
+          content: [
+            {
+              type: "text",
+              text,
+            },
+          ],
+        };
+      } else if (event === "error") {
+        throw new Error(JSON.parse(data).detail);
+      }
+    }
   },
 };
 